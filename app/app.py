@@ -1,3 +1,5 @@
+import os
+
 import reflex as rx
 from app.states.state import AppState
 from app.states.agent_state import AgentState
@@ -7,6 +9,11 @@ from app.components.new_project import new_project_page
 from app.components.projects import projects_page
 from app.components.settings import settings_page
 from app.components.project_details import project_details_page
+from app.services.job_runner import run_job_workers
+from app.services.ollama_client import warm_orchestrator_models
+
+# Fast start skips preloading models at boot; they load on first request.
+FAST_START = os.getenv("HYDROGEN_AGENT_FAST_START", "") not in ("", "0")
 
 
 def index() -> rx.Component:
@@ -42,4 +49,7 @@ app = rx.App(
         ),
     ],
 )
-app.add_page(index)
\ No newline at end of file
+app.register_lifespan_task(run_job_workers)
+if not FAST_START:
+    app.register_lifespan_task(warm_orchestrator_models)
+app.add_page(index)
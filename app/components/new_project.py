@@ -4,18 +4,24 @@ from app.states.agent_state import AgentState, WorkflowStage
 
 
 def _form_field(
-    label: str, placeholder: str, name: str, field_type: str = "input"
+    label: str,
+    placeholder: str,
+    name: str,
+    field_type: str = "input",
+    required: bool = False,
 ) -> rx.Component:
     if field_type == "textarea":
         control = rx.el.textarea(
             name=name,
             placeholder=placeholder,
+            required=required,
             class_name="w-full px-3 py-2 border rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500 min-h-[120px]",
         )
     else:
         control = rx.el.input(
             name=name,
             placeholder=placeholder,
+            required=required,
             class_name="w-full px-3 py-2 border rounded-md focus:outline-none focus:ring-2 focus:ring-blue-500",
         )
     return rx.el.div(
@@ -33,7 +39,10 @@ def new_project_page() -> rx.Component:
         rx.el.form(
             rx.el.div(
                 _form_field(
-                    "Project Name", "e.g., Acme Apparel Fall Collection", "project_name"
+                    "Project Name",
+                    "e.g., Acme Apparel Fall Collection",
+                    "project_name",
+                    required=True,
                 ),
                 _form_field(
                     "Store Description",
@@ -53,7 +62,10 @@ def new_project_page() -> rx.Component:
                         class_name="text-lg font-semibold text-gray-800 mb-4",
                     ),
                     _form_field(
-                        "Shopify Domain", "your-store.myshopify.com", "shopify_domain"
+                        "Shopify Domain",
+                        "your-store.myshopify.com",
+                        "shopify_domain",
+                        required=True,
                     ),
                     _form_field(
                         "Storefront API Token",
@@ -70,7 +82,7 @@ def new_project_page() -> rx.Component:
                 class_name="flex flex-col gap-6",
             ),
             on_submit=AppState.add_project_and_start_spec_extraction,
-            reset_on_submit=True,
+            reset_on_submit=False,
             class_name="w-full max-w-2xl mx-auto",
         ),
         class_name="p-6",
@@ -1,18 +1,232 @@
 import reflex as rx
 from app.states.state import AppState
+from app.states.agent_state import (
+    AgentState,
+    AgentLog,
+    AgentType,
+    ModelHealth,
+    OllamaModelStats,
+    StreamPreview,
+)
 
 
-def spec_viewer(spec_json: str) -> rx.Component:
+def spec_viewer() -> rx.Component:
     return rx.el.div(
-        rx.el.h3("Store Specification (JSON)", class_name="font-semibold text-lg mb-2"),
-        rx.el.pre(
-            rx.el.code(spec_json, class_name="language-json"),
-            class_name="bg-gray-800 text-white p-4 rounded-lg overflow-x-auto text-sm",
+        rx.el.div(
+            rx.el.h3("Store Specification (JSON)", class_name="font-semibold text-lg"),
+            rx.el.button(
+                rx.cond(AppState.spec_open, "Hide", "Show"),
+                on_click=AppState.toggle_spec,
+                class_name="text-sm text-blue-600 hover:underline",
+            ),
+            class_name="flex items-center justify-between mb-2",
+        ),
+        rx.cond(
+            AppState.spec_open,
+            rx.el.form(
+                rx.el.textarea(
+                    default_value=AppState.spec_text,
+                    name="spec_json",
+                    key=AppState.spec_hash,
+                    class_name="w-full min-h-[400px] bg-gray-800 text-white p-4 rounded-lg font-mono text-sm",
+                ),
+                rx.el.button(
+                    "Save and Rebuild",
+                    type="submit",
+                    class_name="mt-2 bg-blue-600 text-white px-4 py-2 rounded-lg hover:bg-blue-700 transition-colors font-medium",
+                ),
+                on_submit=AppState.update_project_spec,
+            ),
         ),
         class_name="mt-6",
     )
 
 
+def log_row(entry: AgentLog) -> rx.Component:
+    return rx.el.div(
+        rx.el.span(entry["agent"], class_name="font-medium text-gray-800 w-32 shrink-0"),
+        rx.el.span(
+            entry["message"],
+            class_name=rx.cond(
+                entry["severity"] == "error",
+                "text-red-600",
+                rx.cond(entry["severity"] == "warning", "text-amber-600", "text-gray-600"),
+            ),
+        ),
+        class_name="flex gap-3 text-sm py-1 border-b last:border-b-0",
+    )
+
+
+def stream_preview(preview: StreamPreview) -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.span(preview["path"], class_name="font-medium text-gray-800"),
+            rx.el.span(preview["chars"], " chars", class_name="text-gray-500"),
+            class_name="flex justify-between text-sm",
+        ),
+        rx.el.pre(
+            preview["text"],
+            class_name="mt-1 p-2 bg-gray-800 text-gray-100 rounded text-xs whitespace-pre-wrap max-h-32 overflow-y-auto",
+        ),
+        class_name="py-2 border-b",
+    )
+
+
+def agent_log_panel() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.h3("Agent Activity", class_name="font-semibold text-lg"),
+            rx.el.div(
+                rx.el.select(
+                    rx.el.option("All"),
+                    *[rx.el.option(agent.value) for agent in AgentType],
+                    on_change=AgentState.set_log_agent_filter,
+                    class_name="border rounded-md px-2 py-1 text-sm",
+                ),
+                rx.el.select(
+                    rx.el.option("All"),
+                    rx.el.option("info"),
+                    rx.el.option("warning"),
+                    rx.el.option("error"),
+                    on_change=AgentState.set_log_severity_filter,
+                    class_name="border rounded-md px-2 py-1 text-sm",
+                ),
+                rx.el.button(
+                    "Full history",
+                    on_click=AgentState.load_log_history,
+                    class_name="px-3 py-1 border rounded-md text-sm bg-white",
+                ),
+                class_name="flex gap-2",
+            ),
+            class_name="flex items-center justify-between mb-2",
+        ),
+        rx.foreach(AgentState.stream_previews, stream_preview),
+        rx.cond(
+            AgentState.log_history.length() > 0,
+            rx.el.div(
+                rx.foreach(AgentState.log_history, log_row),
+                rx.el.div(
+                    rx.cond(
+                        AgentState.log_has_newer,
+                        rx.el.button(
+                            "Newer",
+                            on_click=AgentState.load_newer_logs,
+                            class_name="px-3 py-1 border rounded-md text-sm bg-white",
+                        ),
+                    ),
+                    rx.cond(
+                        AgentState.log_cursor,
+                        rx.el.button(
+                            "Older",
+                            on_click=AgentState.load_older_logs,
+                            class_name="px-3 py-1 border rounded-md text-sm bg-white",
+                        ),
+                    ),
+                    class_name="flex gap-2 mt-2",
+                ),
+            ),
+            rx.el.div(rx.foreach(AgentState.agent_logs, log_row)),
+        ),
+        class_name="mt-6 p-4 bg-white border rounded-lg max-h-96 overflow-y-auto",
+    )
+
+
+def model_row(stats: ModelHealth) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(stats["model"], class_name="py-1 pr-3 font-medium text-gray-800"),
+        rx.el.td(
+            rx.cond(stats["healthy"], "healthy", "unhealthy"),
+            class_name=rx.cond(
+                stats["healthy"], "py-1 pr-3 text-green-700", "py-1 pr-3 text-red-600"
+            ),
+        ),
+        rx.el.td(stats["samples"], class_name="py-1 pr-3"),
+        rx.el.td(stats["p50"], "s", class_name="py-1 pr-3"),
+        rx.el.td(stats["p95"], "s", class_name="py-1 pr-3"),
+        rx.el.td(stats["error_rate"], class_name="py-1 pr-3"),
+        rx.el.td(stats["tokens_per_sec"], class_name="py-1"),
+        class_name="border-b last:border-b-0",
+    )
+
+
+def ollama_row(stats: OllamaModelStats) -> rx.Component:
+    return rx.el.tr(
+        rx.el.td(stats["model"], class_name="py-1 pr-3 font-medium text-gray-800"),
+        rx.el.td(
+            rx.cond(stats["loaded"], "loaded", "not loaded"), class_name="py-1 pr-3"
+        ),
+        rx.el.td(stats["active"], class_name="py-1 pr-3"),
+        rx.el.td(stats["queue_depth"], class_name="py-1 pr-3"),
+        rx.el.td(stats["requests"], class_name="py-1 pr-3"),
+        rx.el.td(stats["loads"], class_name="py-1 pr-3"),
+        rx.el.td(
+            rx.cond(stats["avg_load_time"], stats["avg_load_time"], "-"),
+            class_name="py-1",
+        ),
+        class_name="border-b last:border-b-0",
+    )
+
+
+def stats_table(titles: list[str], rows: rx.Var, row) -> rx.Component:
+    return rx.el.table(
+        rx.el.thead(
+            rx.el.tr(
+                *[
+                    rx.el.th(title, class_name="py-1 pr-3 text-left")
+                    for title in titles
+                ],
+                class_name="border-b text-gray-500",
+            )
+        ),
+        rx.el.tbody(rx.foreach(rows, row)),
+        class_name="w-full text-sm",
+    )
+
+
+def model_stats_panel() -> rx.Component:
+    return rx.el.div(
+        rx.el.div(
+            rx.el.h3("Model Health", class_name="font-semibold text-lg"),
+            rx.el.button(
+                "Refresh",
+                on_click=AgentState.refresh_model_stats,
+                class_name="px-3 py-1 border rounded-md text-sm bg-white",
+            ),
+            class_name="flex items-center justify-between mb-2",
+        ),
+        rx.cond(
+            AgentState.model_stats.length() > 0,
+            stats_table(
+                ["Model", "Status", "Calls", "p50", "p95", "Errors", "Tokens/s"],
+                AgentState.model_stats,
+                model_row,
+            ),
+            rx.el.p("No model calls yet.", class_name="text-sm text-gray-500"),
+        ),
+        rx.cond(
+            AgentState.ollama_stats.length() > 0,
+            rx.el.div(
+                rx.el.h4("Local models (Ollama)", class_name="font-medium mt-4 mb-1"),
+                stats_table(
+                    [
+                        "Model",
+                        "State",
+                        "Active",
+                        "Queued",
+                        "Requests",
+                        "Loads",
+                        "Avg load (s)",
+                    ],
+                    AgentState.ollama_stats,
+                    ollama_row,
+                ),
+            ),
+        ),
+        on_mount=AgentState.refresh_model_stats,
+        class_name="mt-6 p-4 bg-white border rounded-lg",
+    )
+
+
 def project_details_page() -> rx.Component:
     return rx.el.div(
         rx.cond(
@@ -24,8 +238,19 @@ def project_details_page() -> rx.Component:
                         class_name="text-3xl font-bold text-gray-800",
                     ),
                     rx.el.div(
-                        AppState.current_project.get("status", ""),
-                        class_name="px-3 py-1 text-sm font-medium rounded-full bg-blue-100 text-blue-800 w-fit",
+                        rx.cond(
+                            AgentState.queue_position,
+                            rx.el.div(
+                                "Queue position ",
+                                AgentState.queue_position,
+                                class_name="px-3 py-1 text-sm font-medium rounded-full bg-amber-100 text-amber-800 w-fit",
+                            ),
+                        ),
+                        rx.el.div(
+                            AppState.current_project.get("status", ""),
+                            class_name="px-3 py-1 text-sm font-medium rounded-full bg-blue-100 text-blue-800 w-fit",
+                        ),
+                        class_name="flex items-center gap-2",
                     ),
                     class_name="flex items-center justify-between mb-4",
                 ),
@@ -50,11 +275,21 @@ def project_details_page() -> rx.Component:
                             f"Domain: {AppState.current_project.get('shopify_domain', '')}",
                             class_name="text-sm text-gray-600 mt-1",
                         ),
+                        rx.el.p(
+                            rx.cond(
+                                AppState.current_project.get("has_token", False),
+                                "Storefront token: configured",
+                                "Storefront token: missing",
+                            ),
+                            class_name="text-sm text-gray-600",
+                        ),
                         class_name="p-4 bg-white border rounded-lg",
                     ),
                     class_name="grid grid-cols-1 md:grid-cols-2 gap-6 mt-6",
                 ),
-                spec_viewer(AppState.current_project.get("spec_json", "{}")),
+                agent_log_panel(),
+                model_stats_panel(),
+                spec_viewer(),
                 class_name="p-6",
             ),
             rx.el.div(
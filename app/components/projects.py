@@ -1,8 +1,8 @@
 import reflex as rx
-from app.states.state import AppState, Project
+from app.states.state import AppState, ProjectSummary
 
 
-def project_card(project: Project) -> rx.Component:
+def project_card(project: ProjectSummary) -> rx.Component:
     return rx.el.div(
         rx.el.div(
             rx.el.h3(project["name"], class_name="font-semibold text-lg"),
@@ -23,14 +23,39 @@ def project_card(project: Project) -> rx.Component:
     )
 
 
+def pagination() -> rx.Component:
+    return rx.el.div(
+        rx.el.button(
+            "Previous",
+            on_click=AppState.set_projects_page(AppState.projects_page - 1),
+            disabled=AppState.projects_page == 0,
+            class_name="px-3 py-1 border rounded-md bg-white disabled:opacity-50",
+        ),
+        rx.el.span(
+            f"Page {AppState.projects_page + 1} of {AppState.projects_page_count}",
+            class_name="text-sm text-gray-600",
+        ),
+        rx.el.button(
+            "Next",
+            on_click=AppState.set_projects_page(AppState.projects_page + 1),
+            disabled=AppState.projects_page + 1 >= AppState.projects_page_count,
+            class_name="px-3 py-1 border rounded-md bg-white disabled:opacity-50",
+        ),
+        class_name="flex items-center justify-center gap-4 mt-6",
+    )
+
+
 def projects_page() -> rx.Component:
     return rx.el.div(
         rx.el.h1("Projects", class_name="text-3xl font-bold text-gray-800 mb-6"),
         rx.cond(
             AppState.projects.length() > 0,
             rx.el.div(
-                rx.foreach(AppState.projects, project_card),
-                class_name="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6",
+                rx.el.div(
+                    rx.foreach(AppState.projects, project_card),
+                    class_name="grid grid-cols-1 md:grid-cols-2 lg:grid-cols-3 gap-6",
+                ),
+                pagination(),
             ),
             rx.el.div(
                 rx.el.p("No projects yet. Click 'New Project' to get started."),
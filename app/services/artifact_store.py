@@ -0,0 +1,390 @@
+import hashlib
+import io
+import json
+import mmap
+import os
+import posixpath
+import tarfile
+import threading
+import time
+import zipfile
+import zlib
+from collections.abc import Iterator, Mapping
+from typing import BinaryIO, TypedDict
+
+from app.services.storage import data_path, prune_workspace
+
+CHUNK_SIZE = 64 * 1024
+EXPORT_FORMATS = ("tar.gz", "tar", "zip")
+MANIFEST_NAME = "manifest.json"
+
+
+class ManifestEntry(TypedDict):
+    hash: str
+    size: int
+
+
+class Manifest(TypedDict):
+    project_id: str
+    revision: int
+    parent: int | None
+    created_at: float
+    meta: dict
+    files: dict[str, ManifestEntry]
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _safe_path(name: str) -> str | None:
+    path = posixpath.normpath(name.replace("\\", "/")).lstrip("/")
+    if path in ("", ".") or path.startswith("../") or path == "..":
+        return None
+    return path
+
+
+class _BlobReader(io.RawIOBase):
+    """Streams a blob's decompressed bytes straight from its mapped file."""
+
+    def __init__(self, chunks: Iterator[bytes]):
+        self._chunks = chunks
+        self._buffer = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, target) -> int:
+        while not self._buffer:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                return 0
+            self._buffer = chunk
+        size = min(len(target), len(self._buffer))
+        target[:size] = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return size
+
+
+class RevisionFiles(Mapping):
+    """Read-only path → text view of a revision; blobs are read on access."""
+
+    def __init__(self, store: "ArtifactStore", manifest: Manifest):
+        self.store = store
+        self.manifest = manifest
+
+    def __getitem__(self, path: str) -> str:
+        return self.store.read_text(self.manifest["files"][path]["hash"])
+
+    def __iter__(self):
+        return iter(self.manifest["files"])
+
+    def __len__(self) -> int:
+        return len(self.manifest["files"])
+
+    def digest(self, path: str) -> str:
+        return self.manifest["files"][path]["hash"]
+
+
+class ArtifactStore:
+    """Content-addressed store for generated project files.
+
+    Each distinct file content is kept once as a zlib-compressed blob named
+    by the SHA-256 of its content, shared across projects and revisions.
+    Every build of a project is a revision: a small JSON manifest mapping
+    paths to blob hashes, so history and rollback cost no extra copies.
+    Blobs are read through memory maps and exported as streaming tar or
+    zip archives without loading whole projects into memory.
+    """
+
+    _shared: "ArtifactStore | None" = None
+
+    def __init__(self, root: str | None = None, compress_level: int = 6):
+        self.root = root or os.path.dirname(data_path("artifacts", ""))
+        self.compress_level = compress_level
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(self.root, "blobs"), exist_ok=True)
+        os.makedirs(os.path.join(self.root, "manifests"), exist_ok=True)
+
+    @classmethod
+    def shared(cls) -> "ArtifactStore":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.root, "blobs", digest[:2], digest[2:])
+
+    def _manifest_dir(self, project_id: str) -> str:
+        return os.path.join(self.root, "manifests", project_id)
+
+    def _write_atomic(self, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def put(self, content: str | bytes) -> ManifestEntry:
+        """Stores content unless an identical blob exists; returns its entry."""
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        digest = content_hash(data)
+        path = self._blob_path(digest)
+        if not os.path.exists(path):
+            self._write_atomic(path, zlib.compress(data, self.compress_level))
+        return ManifestEntry(hash=digest, size=len(data))
+
+    def has(self, digest: str) -> bool:
+        return os.path.exists(self._blob_path(digest))
+
+    def iter_chunks(self, digest: str, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+        """Decompressed content in chunks, read from a memory-mapped blob."""
+        with open(self._blob_path(digest), "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                decompressor = zlib.decompressobj()
+                view = memoryview(mapped)
+                try:
+                    for offset in range(0, len(view), chunk_size):
+                        chunk = decompressor.decompress(
+                            view[offset : offset + chunk_size]
+                        )
+                        if chunk:
+                            yield chunk
+                    tail = decompressor.flush()
+                    if tail:
+                        yield tail
+                finally:
+                    view.release()
+
+    def read(self, digest: str) -> bytes:
+        with open(self._blob_path(digest), "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return zlib.decompress(mapped)
+
+    def read_text(self, digest: str) -> str:
+        return self.read(digest).decode("utf-8")
+
+    def revisions(self, project_id: str) -> list[int]:
+        directory = self._manifest_dir(project_id)
+        if not os.path.isdir(directory):
+            return []
+        return sorted(
+            int(name.removesuffix(".json"))
+            for name in os.listdir(directory)
+            if name.endswith(".json")
+        )
+
+    def _manifest_path(self, project_id: str, revision: int) -> str:
+        return os.path.join(self._manifest_dir(project_id), f"{revision:06d}.json")
+
+    def manifest(self, project_id: str, revision: int | None = None) -> Manifest | None:
+        """The given revision's manifest, or the latest one.
+
+        A revision another writer has claimed but not yet written reads as
+        missing.
+        """
+        if revision is None:
+            for candidate in reversed(self.revisions(project_id)):
+                manifest = self.manifest(project_id, candidate)
+                if manifest is not None:
+                    return manifest
+            return None
+        try:
+            with open(self._manifest_path(project_id, revision), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        return json.loads(data) if data else None
+
+    def files(self, project_id: str, revision: int | None = None) -> RevisionFiles:
+        manifest = self.manifest(project_id, revision)
+        if manifest is None:
+            raise KeyError(f"No revision {revision} for project {project_id}")
+        return RevisionFiles(self, manifest)
+
+    def save_revision(
+        self,
+        project_id: str,
+        files: Mapping[str, str | bytes],
+        meta: dict | None = None,
+    ) -> Manifest:
+        """Records files as a new revision; unchanged files add no blobs.
+
+        If the files are identical to the latest revision, that revision is
+        returned instead of creating a new one. Holds the garbage collector's
+        lock, so blobs stored here are not collected before the manifest
+        referring to them is written.
+        """
+        with self._lock:
+            return self._save_revision(project_id, files, meta)
+
+    def _save_revision(
+        self, project_id: str, files: Mapping[str, str | bytes], meta: dict | None
+    ) -> Manifest:
+        if isinstance(files, RevisionFiles):
+            entries = dict(files.manifest["files"])
+        else:
+            entries = {path: self.put(content) for path, content in files.items()}
+        os.makedirs(self._manifest_dir(project_id), exist_ok=True)
+        while True:
+            latest = self.manifest(project_id)
+            if latest is not None and latest["files"] == entries:
+                return latest
+            revision = max(self.revisions(project_id), default=0) + 1
+            path = self._manifest_path(project_id, revision)
+            # Creating the file exclusively claims the revision number, so
+            # concurrent savers (other processes included) never overwrite
+            # each other; the loser retries with the next number.
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644))
+            except FileExistsError:
+                continue
+            manifest = Manifest(
+                project_id=project_id,
+                revision=revision,
+                parent=latest["revision"] if latest else None,
+                created_at=time.time(),
+                meta=meta or {},
+                files=dict(sorted(entries.items())),
+            )
+            self._write_atomic(path, json.dumps(manifest, indent=1).encode("utf-8"))
+            return manifest
+
+    def rollback(self, project_id: str, revision: int) -> Manifest:
+        """Makes an older revision current again as a new revision."""
+        return self.save_revision(
+            project_id,
+            self.files(project_id, revision),
+            {"rollback_to": revision},
+        )
+
+    def materialize(
+        self, project_id: str, target: str, revision: int | None = None
+    ) -> list[str]:
+        """Writes a revision into a directory, skipping files already there
+        with the same content; returns the paths written.
+
+        Files an earlier materialize (or write_workspace) put there that the
+        revision no longer has are deleted.
+        """
+        manifest = self.manifest(project_id, revision)
+        if manifest is None:
+            return []
+        written = []
+        for path, entry in manifest["files"].items():
+            destination = os.path.join(target, path)
+            if _file_hash(destination, entry["size"]) == entry["hash"]:
+                continue
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            with open(destination, "wb") as f:
+                for chunk in self.iter_chunks(entry["hash"]):
+                    f.write(chunk)
+            written.append(path)
+        prune_workspace(target, manifest["files"])
+        return written
+
+    def export(
+        self,
+        project_id: str,
+        sink: BinaryIO,
+        fmt: str = "tar.gz",
+        revision: int | None = None,
+    ) -> Manifest:
+        """Streams a revision to sink as a tar, tar.gz or zip archive.
+
+        The sink does not need to be seekable. Files sit under a directory
+        named after the project, next to the revision's manifest.json.
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format {fmt!r}")
+        manifest = self.manifest(project_id, revision)
+        if manifest is None:
+            raise KeyError(f"No revision {revision} for project {project_id}")
+        manifest_bytes = json.dumps(manifest, indent=1).encode("utf-8")
+        members = [(MANIFEST_NAME, len(manifest_bytes), None)] + [
+            (path, entry["size"], entry["hash"])
+            for path, entry in manifest["files"].items()
+        ]
+
+        def chunks(digest: str | None) -> Iterator[bytes]:
+            return (
+                iter([manifest_bytes]) if digest is None else self.iter_chunks(digest)
+            )
+
+        if fmt == "zip":
+            date_time = time.localtime(manifest["created_at"])[:6]
+            with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as archive:
+                for path, _, digest in members:
+                    info = zipfile.ZipInfo(f"{project_id}/{path}", date_time)
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                    with archive.open(info, "w") as dest:
+                        for chunk in chunks(digest):
+                            dest.write(chunk)
+        else:
+            mode = "w|gz" if fmt == "tar.gz" else "w|"
+            with tarfile.open(fileobj=sink, mode=mode) as archive:
+                for path, size, digest in members:
+                    info = tarfile.TarInfo(f"{project_id}/{path}")
+                    info.size = size
+                    info.mtime = int(manifest["created_at"])
+                    archive.addfile(info, _BlobReader(chunks(digest)))
+        return manifest
+
+    def import_archive(
+        self, project_id: str, source: BinaryIO, fmt: str = "tar.gz"
+    ) -> Manifest:
+        """Reads an exported archive back in as a new revision of project_id.
+
+        Tar archives are read as a stream; zip needs a seekable source.
+        """
+        files: dict[str, bytes] = {}
+        if fmt == "zip":
+            with zipfile.ZipFile(source) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir():
+                        files[info.filename] = archive.read(info)
+        elif fmt in ("tar", "tar.gz"):
+            with tarfile.open(fileobj=source, mode="r|*") as archive:
+                for member in archive:
+                    if member.isfile():
+                        files[member.name] = archive.extractfile(member).read()
+        else:
+            raise ValueError(f"Unsupported import format {fmt!r}")
+        imported = {}
+        for name, data in files.items():
+            path = _safe_path(name.split("/", 1)[1] if "/" in name else name)
+            if path is None or path == MANIFEST_NAME:
+                continue
+            imported[path] = data
+        return self.save_revision(project_id, imported, {"imported": True})
+
+    def collect_garbage(self) -> int:
+        """Deletes blobs no manifest refers to; returns how many."""
+        with self._lock:
+            referenced = set()
+            manifests = os.path.join(self.root, "manifests")
+            for project_id in os.listdir(manifests):
+                for revision in self.revisions(project_id):
+                    manifest = self.manifest(project_id, revision) or {"files": {}}
+                    referenced.update(e["hash"] for e in manifest["files"].values())
+            removed = 0
+            blobs = os.path.join(self.root, "blobs")
+            for prefix in os.listdir(blobs):
+                for name in os.listdir(os.path.join(blobs, prefix)):
+                    if prefix + name not in referenced and not name.endswith(".tmp"):
+                        os.remove(os.path.join(blobs, prefix, name))
+                        removed += 1
+        return removed
+
+
+def _file_hash(path: str, expected_size: int) -> str | None:
+    try:
+        if os.path.getsize(path) != expected_size:
+            return None
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+    except OSError:
+        return None
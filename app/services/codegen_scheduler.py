@@ -0,0 +1,210 @@
+import asyncio
+import random
+from typing import Awaitable, Callable, TypedDict
+
+import httpx
+
+from app.services.llm_metrics import llm_context
+from app.services.llm_service import LLMService
+
+DEFAULT_CONCURRENCY = {"openrouter": 4, "ollama": 1}
+# Shared modules generated from the spec sections they are planned from;
+# a file reading one of those sections imports the module.
+SHARED_MODULES = ("lib/", "styles/")
+
+
+class PlannedFile(TypedDict, total=False):
+    path: str
+    prompt: str
+    depends_on: list[str]
+    sections: list[str]
+    content: str
+
+
+class RateLimitError(Exception):
+    def __init__(self, retry_after: float | None = None):
+        super().__init__("Rate limited by provider")
+        self.retry_after = retry_after
+
+
+def _reads(section: str, provided: str) -> bool:
+    return section == provided or section.startswith(f"{provided}.")
+
+
+def infer_dependencies(files: list[PlannedFile]) -> list[PlannedFile]:
+    """Makes each file depend on the shared modules built from its sections.
+
+    A file reading nav depends on the lib/ module planned from nav, one
+    reading catalog.collections on the module planned from catalog, and so
+    on; shared modules themselves only keep their explicit depends_on.
+    Files that read nothing a module provides start right away instead of
+    waiting for a whole earlier layer.
+    """
+    shared = [f for f in files if any(m in f["path"] for m in SHARED_MODULES)]
+    result = []
+    for f in files:
+        implied = []
+        if f not in shared:
+            implied = [
+                module["path"]
+                for module in shared
+                if any(
+                    _reads(section, provided)
+                    for section in f.get("sections", [])
+                    for provided in module.get("sections", [])
+                )
+            ]
+        depends_on = list(dict.fromkeys([*f.get("depends_on", []), *implied]))
+        result.append(PlannedFile(**{**f, "depends_on": depends_on}))
+    return result
+
+
+def check_graph(files: list[PlannedFile]):
+    paths = {f["path"] for f in files}
+    deps = {f["path"]: f.get("depends_on", []) for f in files}
+    for path, requires in deps.items():
+        missing = [d for d in requires if d not in paths]
+        if missing:
+            raise ValueError(f"{path} depends on unplanned files: {missing}")
+    visiting, done = set(), set()
+
+    def visit(path: str):
+        if path in done:
+            return
+        if path in visiting:
+            raise ValueError(f"Dependency cycle detected at {path}")
+        visiting.add(path)
+        for dep in deps[path]:
+            visit(dep)
+        visiting.discard(path)
+        done.add(path)
+
+    for path in deps:
+        visit(path)
+
+
+class AdaptiveLimiter:
+    """Concurrency cap that halves on rate limits and creeps back on success."""
+
+    def __init__(self, max_limit: int):
+        self.max_limit = max(1, max_limit)
+        self.limit = self.max_limit
+        self.active = 0
+        self._successes = 0
+        self._condition = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    async def release(self, rate_limited: bool = False):
+        async with self._condition:
+            self.active -= 1
+            if rate_limited:
+                self.limit = max(1, self.limit // 2)
+                self._successes = 0
+            else:
+                self._successes += 1
+                if self.limit < self.max_limit and self._successes >= self.limit:
+                    self.limit += 1
+                    self._successes = 0
+            self._condition.notify_all()
+
+
+class CodegenScheduler:
+    """Generates files under adaptive per-model concurrency limits.
+
+    The limits only work if every job shares them, so workflows use the
+    process-wide scheduler from shared().
+    """
+
+    _shared: "CodegenScheduler | None" = None
+
+    def __init__(
+        self,
+        llm: LLMService,
+        concurrency: dict[str, int] | None = None,
+        max_retries: int = 5,
+        base_backoff: float = 1.0,
+    ):
+        self.llm = llm
+        self.concurrency = {**DEFAULT_CONCURRENCY, **(concurrency or {})}
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self._limiters: dict[tuple[str, str], AdaptiveLimiter] = {}
+
+    @classmethod
+    def shared(cls) -> "CodegenScheduler":
+        """Process-wide scheduler over LLMService.shared(), built on first use."""
+        if cls._shared is None:
+            cls._shared = cls(LLMService.shared())
+        return cls._shared
+
+    def _limiter_for(self, model: str) -> AdaptiveLimiter:
+        provider = self.llm.provider_for_model(model).value
+        key = (provider, model)
+        if key not in self._limiters:
+            cap = self.concurrency.get(model, self.concurrency.get(provider, 1))
+            self._limiters[key] = AdaptiveLimiter(cap)
+        return self._limiters[key]
+
+    async def _generate(
+        self,
+        planned: PlannedFile,
+        model: str,
+        task_type: str,
+        on_partial: Callable[[str], Awaitable[None]] | None = None,
+    ) -> str:
+        limiter = self._limiter_for(model)
+        for attempt in range(self.max_retries + 1):
+            await limiter.acquire()
+            try:
+                with llm_context(task_type=task_type, retries=attempt):
+                    content = await self.llm.generate(
+                        planned["prompt"], model, on_partial=on_partial
+                    )
+            except (RateLimitError, httpx.HTTPStatusError) as e:
+                retry_after = _retry_after(e)
+                if retry_after is None and not isinstance(e, RateLimitError):
+                    await limiter.release()
+                    raise
+                await limiter.release(rate_limited=True)
+                if attempt == self.max_retries:
+                    raise
+                delay = retry_after or self.base_backoff * 2**attempt
+                await asyncio.sleep(delay + random.uniform(0, delay / 4))
+                continue
+            except Exception:
+                await limiter.release()
+                raise
+            await limiter.release()
+            return content
+        raise RateLimitError()
+
+    async def generate_file(
+        self,
+        planned: PlannedFile,
+        task_type: str = "code_generation",
+        on_partial: Callable[[str], Awaitable[None]] | None = None,
+    ) -> str:
+        """Generates one file under the per-model concurrency limit, retrying
+        rate-limited attempts with backoff.
+
+        With on_partial, the completion is streamed and on_partial receives
+        the text so far; a retry starts it over.
+        """
+        model = self.llm.select_model_for_task(task_type)
+        return await self._generate(planned, model, task_type, on_partial)
+
+
+def _retry_after(error: Exception) -> float | None:
+    if isinstance(error, RateLimitError):
+        return error.retry_after
+    if isinstance(error, httpx.HTTPStatusError) and error.response.status_code == 429:
+        header = error.response.headers.get("retry-after")
+        try:
+            return float(header) if header else 0.0
+        except ValueError:
+            return 0.0
+    return None
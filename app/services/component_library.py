@@ -0,0 +1,222 @@
+import hashlib
+import re
+import sqlite3
+import threading
+import time
+
+from app.services.file_planner import slice_spec
+from app.services.prompt_builder import minify_json
+from app.services.storage import data_path
+
+# Bump to invalidate stored components when prompts or conventions change.
+LIBRARY_VERSION = 1
+LIBRARY_PATHS = ("app/components/",)
+# String values under these sections are treated as parameters of a component.
+PARAMETER_SECTIONS = ("brand.name", "brand.logo", "brand.colors", "brand.typography")
+# Values are only parameterized when substituting them back is unambiguous
+# and cannot break the surrounding TSX (no quotes, braces or angle brackets).
+SAFE_VALUE = re.compile(r"[\w#][\w .,#%/:()+-]{2,}")
+SLOT = "@@param{}@@"
+
+
+def _is_parameter(section: str) -> bool:
+    return any(
+        section == prefix or section.startswith(prefix + ".")
+        for prefix in PARAMETER_SECTIONS
+    )
+
+
+def normalize(value, params: list[str], section: str = ""):
+    """Replaces parameter values with slots numbered by first appearance.
+
+    Equal values share a slot, so the normalized form also captures which
+    parameters are equal (e.g. a logo alt text that repeats the brand name).
+    """
+    if isinstance(value, dict):
+        return {
+            key: normalize(value[key], params, f"{section}.{key}".lstrip("."))
+            for key in sorted(value)
+        }
+    if isinstance(value, list):
+        return [normalize(item, params, section) for item in value]
+    if (
+        isinstance(value, str)
+        and _is_parameter(section)
+        and SAFE_VALUE.fullmatch(value)
+    ):
+        if value not in params:
+            params.append(value)
+        return SLOT.format(params.index(value))
+    return value
+
+
+def other_strings(value, section: str = "") -> list[str]:
+    """String values of a spec slice outside the parameter sections."""
+    if isinstance(value, dict):
+        return [
+            text
+            for key in sorted(value)
+            for text in other_strings(value[key], f"{section}.{key}".lstrip("."))
+        ]
+    if isinstance(value, list):
+        return [text for item in value for text in other_strings(item, section)]
+    if isinstance(value, str) and not _is_parameter(section):
+        return [value]
+    return []
+
+
+def _pattern(value: str, flags: int = 0) -> re.Pattern:
+    return re.compile(rf"(?<!\w){re.escape(value)}(?!\w)", flags)
+
+
+def _field(value: str) -> re.Pattern:
+    """The value filling a whole field: a string literal, JSX text, or one
+    item of a comma-separated list such as a font stack."""
+    return re.compile(rf"([\"'`>{{(,:]\s*){re.escape(value)}(?=\s*[\"'`<}}),;])")
+
+
+def parameterize(
+    content: str, params: list[str], reserved: list[str] | None = None
+) -> str | None:
+    """Turns generated content into a template, or None if that is unsafe.
+
+    A value is only replaced where it fills a whole field, and only when
+    every mention of it does: a brand named "Home" or a font named "Inter"
+    could just as well be a nav label or a word in the model's own copy.
+    For the same reason content is not stored when a value also appears in
+    reserved (the slice's other strings, e.g. nav labels) or in another
+    letter case (e.g. an upper-cased brand name).
+    """
+    if "@@param" in content:
+        return None
+    for index in sorted(range(len(params)), key=lambda i: -len(params[i])):
+        value = params[index]
+        mentions = _pattern(value, re.IGNORECASE)
+        if any(mentions.search(text) for text in reserved or []):
+            return None
+        field = _field(value)
+        if len(mentions.findall(content)) != len(field.findall(content)):
+            return None
+        content = field.sub(lambda m: m.group(1) + SLOT.format(index), content)
+    return content
+
+
+def substitute(template: str, params: list[str]) -> str:
+    return re.sub(
+        r"@@param(\d+)@@", lambda match: params[int(match.group(1))], template
+    )
+
+
+class ComponentLibrary:
+    """Validated components reused across projects with near-identical specs.
+
+    Components are keyed on their spec slice with brand values replaced by
+    parameters, so a Header generated for one store is reused for another
+    whose spec differs only in its name, logo, colors or fonts, with the new
+    values substituted in. Only output that passed validation is stored.
+    """
+
+    _shared: "ComponentLibrary | None" = None
+
+    def __init__(self, db_path: str | None = None):
+        self.db_path = db_path or data_path("component_library.db")
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self.stats: dict[str, dict[str, int]] = {}
+
+    @classmethod
+    def shared(cls) -> "ComponentLibrary":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS components ("
+                "key TEXT PRIMARY KEY, path TEXT NOT NULL, template TEXT NOT NULL, "
+                "hits INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL, "
+                "used_at REAL NOT NULL)"
+            )
+        return self._conn
+
+    def handles(self, path: str) -> bool:
+        return path.startswith(LIBRARY_PATHS)
+
+    def key(self, path: str, sections: list[str], spec: dict) -> tuple[str, list[str]]:
+        """Library key for a planned file, and its parameter values."""
+        params: list[str] = []
+        normalized = normalize(slice_spec(spec, sections), params)
+        payload = minify_json(
+            {"version": LIBRARY_VERSION, "path": path, "spec": normalized}
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest(), params
+
+    def lookup(self, path: str, sections: list[str], spec: dict) -> str | None:
+        if not self.handles(path):
+            return None
+        key, params = self.key(path, sections, spec)
+        stats = self.stats.setdefault(path, {"hits": 0, "misses": 0})
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT template FROM components WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                stats["misses"] += 1
+                return None
+            db.execute(
+                "UPDATE components SET hits = hits + 1, used_at = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            db.commit()
+        stats["hits"] += 1
+        return substitute(row[0], params)
+
+    def record(self, path: str, sections: list[str], spec: dict, content: str) -> bool:
+        """Stores validated content; returns False if it cannot be templated."""
+        if not self.handles(path):
+            return False
+        key, params = self.key(path, sections, spec)
+        reserved = other_strings(slice_spec(spec, sections))
+        template = parameterize(content, params, reserved)
+        if template is None:
+            return False
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT INTO components (key, path, template, created_at, used_at) "
+                "VALUES (?, ?, ?, ?, ?) ON CONFLICT(key) DO UPDATE SET "
+                "template = excluded.template, used_at = excluded.used_at",
+                (key, path, template, now, now),
+            )
+            db.commit()
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._db().execute("DELETE FROM components")
+            self._db().commit()
+
+    def get_stats(self) -> dict:
+        """Hit rate per component path for this process, plus library size."""
+        with self._lock:
+            db = self._db()
+            rows = db.execute(
+                "SELECT path, COUNT(*), SUM(hits) FROM components GROUP BY path"
+            ).fetchall()
+        stored = {path: (count, hits) for path, count, hits in rows}
+        components = {}
+        for path in sorted(set(self.stats) | set(stored)):
+            stats = self.stats.get(path, {"hits": 0, "misses": 0})
+            lookups = stats["hits"] + stats["misses"]
+            count, total_hits = stored.get(path, (0, 0))
+            components[path] = {
+                **stats,
+                "hit_rate": stats["hits"] / lookups if lookups else 0.0,
+                "entries": count,
+                "total_hits": total_hits,
+            }
+        return components
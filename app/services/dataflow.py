@@ -0,0 +1,145 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+NodeFn = Callable[[dict[str, Any]], Awaitable[Any]]
+
+_MISSING = object()
+
+
+class Node:
+    def __init__(self, name: str, fn: NodeFn, inputs: list[str], after: list[str]):
+        self.name = name
+        self.fn = fn
+        self.inputs = inputs
+        self.after = after
+        self.task: asyncio.Task | None = None
+        self.done = False
+        self.runs = 0
+
+
+class DataflowExecutor:
+    """Runs each node as soon as its inputs and predecessors are ready.
+
+    Inputs may arrive in any order and may be revised while the graph runs:
+    revising an input to a different value cancels any node reading it that
+    is still running and re-runs nodes that already finished. Nodes listed
+    in `after` only order execution; a node is skipped if one of them fails.
+    """
+
+    def __init__(
+        self,
+        on_event: Callable[[str, str], Awaitable[None]] | None = None,
+    ):
+        self.on_event = on_event
+        self.nodes: dict[str, Node] = {}
+        self.inputs: dict[str, Any] = {}
+        self.results: dict[str, Any] = {}
+        self.errors: dict[str, str] = {}
+        self.stats = {"started": 0, "completed": 0, "cancelled": 0, "redone": 0}
+        self.finished = False
+        self._readers: dict[str, list[Node]] = {}
+        self._followers: dict[str, list[Node]] = {}
+        self._wakeup = asyncio.Event()
+
+    def add_node(
+        self,
+        name: str,
+        fn: NodeFn,
+        inputs: list[str] | None = None,
+        after: list[str] | None = None,
+    ):
+        node = Node(name, fn, list(inputs or []), list(after or []))
+        self.nodes[name] = node
+        for key in node.inputs:
+            self._readers.setdefault(key, []).append(node)
+        for dep in node.after:
+            self._followers.setdefault(dep, []).append(node)
+
+    def set_input(self, key: str, value: Any) -> bool:
+        """Publishes or revises an input; returns whether the running graph
+        accepted it (False once run() has finished or if nothing changed)."""
+        if self.finished or self.inputs.get(key, _MISSING) == value:
+            return False
+        revised = key in self.inputs
+        self.inputs[key] = value
+        if revised:
+            for node in self._readers.get(key, []):
+                self._invalidate(node)
+        self._wakeup.set()
+        return True
+
+    def _invalidate(self, node: Node):
+        if node.task is not None and not node.task.done():
+            node.task.cancel()
+            self.stats["cancelled"] += 1
+        if node.done or node.task is not None:
+            self.stats["redone"] += 1
+        node.task = None
+        node.done = False
+        self.results.pop(node.name, None)
+        self.errors.pop(node.name, None)
+        for follower in self._followers.get(node.name, []):
+            if self.errors.get(follower.name, "").startswith("Skipped"):
+                del self.errors[follower.name]
+
+    def _settled(self, node: Node) -> bool:
+        return node.done or node.name in self.errors
+
+    def _ready(self, node: Node) -> bool:
+        return all(key in self.inputs for key in node.inputs) and all(
+            self.nodes[dep].done for dep in node.after
+        )
+
+    async def _emit(self, name: str, status: str):
+        if self.on_event is not None:
+            await self.on_event(name, status)
+
+    async def _run_node(self, node: Node):
+        task = asyncio.current_task()
+        values = {key: self.inputs[key] for key in node.inputs}
+        self.stats["started"] += 1
+        node.runs += 1
+        await self._emit(node.name, "started")
+        try:
+            result = await node.fn(values)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if node.task is task:
+                self.errors[node.name] = str(e)
+                await self._emit(node.name, "failed")
+        else:
+            if node.task is task:
+                self.results[node.name] = result
+                node.done = True
+                self.stats["completed"] += 1
+                await self._emit(node.name, "completed")
+        finally:
+            self._wakeup.set()
+
+    async def run(self) -> tuple[dict[str, Any], dict[str, str]]:
+        """Runs until every node has finished, failed or been skipped."""
+        try:
+            while True:
+                self._wakeup.clear()
+                for node in self.nodes.values():
+                    if self._settled(node) or node.task is not None:
+                        continue
+                    failed = [d for d in node.after if d in self.errors]
+                    if failed:
+                        self.errors[node.name] = (
+                            f"Skipped: dependencies failed {failed}"
+                        )
+                        await self._emit(node.name, "skipped")
+                        self._wakeup.set()
+                    elif self._ready(node):
+                        node.task = asyncio.create_task(self._run_node(node))
+                if all(self._settled(node) for node in self.nodes.values()):
+                    self.finished = True
+                    return self.results, self.errors
+                await self._wakeup.wait()
+        finally:
+            self.finished = True
+            for node in self.nodes.values():
+                if node.task is not None and not node.task.done():
+                    node.task.cancel()
@@ -0,0 +1,207 @@
+import asyncio
+import contextlib
+import itertools
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+
+from app.services.model_router import percentile
+
+CHEAP = "cheap"
+EXPENSIVE = "expensive"
+DEFAULT_CLASS_WEIGHTS = {CHEAP: 4.0, EXPENSIVE: 1.0}
+WAIT_SAMPLES = 1000
+MAX_IDLE_FLOWS = 1024
+
+
+class AdmissionError(Exception):
+    """Raised when a job is refused because its tenant or the pod is full."""
+
+
+class _Waiter:
+    def __init__(self, seq: int, tenant: str, stage_class: str, tag: float):
+        self.seq = seq
+        self.tenant = tenant
+        self.stage_class = stage_class
+        self.tag = tag
+        self.enqueued_at = time.monotonic()
+        self.granted = False
+        self.changed = asyncio.Event()
+
+
+class FairScheduler:
+    """Bounds how many workflow stages run at once and who runs next.
+
+    Stages are grouped into classes (cheap ones such as spec extraction,
+    expensive ones such as code generation and validation). Each
+    (tenant, class) pair is a flow, and waiting stages are served in order of
+    their start-time fair queuing tags, so every tenant gets an equal share
+    of slots and cheap stages are dispatched `weight` times as often as
+    expensive ones while both are backlogged. A tenant never holds more
+    than `tenant_quota` slots, and each class can be capped below capacity
+    so large builds cannot take the slots spec extraction needs.
+
+    Jobs themselves are admitted by `admit`, which enforces per-tenant and
+    global limits on queued plus running jobs.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 4,
+        stage_classes: dict[str, str] | None = None,
+        class_weights: dict[str, float] | None = None,
+        class_limits: dict[str, int] | None = None,
+        tenant_quota: int = 2,
+        max_jobs_per_tenant: int = 3,
+        max_active_jobs: int = 32,
+        default_class: str = EXPENSIVE,
+    ):
+        self.capacity = capacity
+        self.stage_classes = stage_classes or {}
+        self.class_weights = class_weights or dict(DEFAULT_CLASS_WEIGHTS)
+        self.class_limits = (
+            class_limits
+            if class_limits is not None
+            else {EXPENSIVE: max(1, capacity - 1)}
+        )
+        self.tenant_quota = tenant_quota
+        self.max_jobs_per_tenant = max_jobs_per_tenant
+        self.max_active_jobs = max_active_jobs
+        self.default_class = default_class
+        self._seq = itertools.count()
+        self._waiting: list[_Waiter] = []
+        self._virtual_time = 0.0
+        self._finish_tags: dict[tuple[str, str], float] = {}
+        self._running_by_tenant: dict[str, int] = {}
+        self._running_by_class: dict[str, int] = {}
+        self._waits: dict[str, deque[float]] = {}
+        self.granted = 0
+        self.rejected = 0
+
+    def class_of(self, stage: str) -> str:
+        return self.stage_classes.get(stage, self.default_class)
+
+    def admit(self, tenant: str, tenant_jobs: int, active_jobs: int):
+        """Raises AdmissionError unless another job may be queued for tenant."""
+        if active_jobs >= self.max_active_jobs:
+            self.rejected += 1
+            raise AdmissionError(
+                f"The build queue is full ({active_jobs} builds); try again shortly."
+            )
+        if tenant_jobs >= self.max_jobs_per_tenant:
+            self.rejected += 1
+            raise AdmissionError(
+                f"You already have {tenant_jobs} builds queued or running; "
+                "wait for one to finish."
+            )
+
+    def _running(self) -> int:
+        return sum(self._running_by_class.values())
+
+    def _eligible(self, waiter: _Waiter) -> bool:
+        limit = self.class_limits.get(waiter.stage_class)
+        return self._running_by_tenant.get(waiter.tenant, 0) < self.tenant_quota and (
+            limit is None or self._running_by_class.get(waiter.stage_class, 0) < limit
+        )
+
+    def _dispatch(self):
+        self._waiting.sort(key=lambda w: (w.tag, w.seq))
+        while self._running() < self.capacity:
+            waiter = next((w for w in self._waiting if self._eligible(w)), None)
+            if waiter is None:
+                break
+            self._waiting.remove(waiter)
+            self._virtual_time = max(self._virtual_time, waiter.tag)
+            self._acquire(waiter.tenant, waiter.stage_class)
+            self._waits.setdefault(
+                waiter.stage_class, deque(maxlen=WAIT_SAMPLES)
+            ).append(time.monotonic() - waiter.enqueued_at)
+            waiter.granted = True
+            waiter.changed.set()
+        for waiter in self._waiting:
+            waiter.changed.set()
+        if len(self._finish_tags) > MAX_IDLE_FLOWS:
+            # Flows that finished behind the clock no longer affect order.
+            self._finish_tags = {
+                flow: tag
+                for flow, tag in self._finish_tags.items()
+                if tag > self._virtual_time
+            }
+
+    def _acquire(self, tenant: str, stage_class: str):
+        self.granted += 1
+        self._running_by_tenant[tenant] = self._running_by_tenant.get(tenant, 0) + 1
+        self._running_by_class[stage_class] = (
+            self._running_by_class.get(stage_class, 0) + 1
+        )
+
+    def _release(self, tenant: str, stage_class: str):
+        self._running_by_tenant[tenant] -= 1
+        if not self._running_by_tenant[tenant]:
+            del self._running_by_tenant[tenant]
+        self._running_by_class[stage_class] -= 1
+        self._dispatch()
+
+    def position(self, waiter: _Waiter) -> int:
+        """1-based place in dispatch order among all waiting stages."""
+        return 1 + sum(
+            1 for w in self._waiting if (w.tag, w.seq) < (waiter.tag, waiter.seq)
+        )
+
+    @contextlib.asynccontextmanager
+    async def slot(
+        self,
+        tenant: str,
+        stage: str,
+        on_wait: Callable[[int], Awaitable[None]] | None = None,
+    ) -> AsyncIterator[None]:
+        """Holds a slot for one stage; on_wait gets the queue position
+        whenever it changes while the stage waits for one."""
+        stage_class = self.class_of(stage)
+        flow = (tenant, stage_class)
+        start = max(self._virtual_time, self._finish_tags.get(flow, 0.0))
+        self._finish_tags[flow] = start + 1.0 / self.class_weights.get(stage_class, 1.0)
+        waiter = _Waiter(next(self._seq), tenant, stage_class, start)
+        self._waiting.append(waiter)
+        self._dispatch()
+        reported = None
+        try:
+            while not waiter.granted:
+                position = self.position(waiter)
+                if on_wait is not None and position != reported:
+                    reported = position
+                    await on_wait(position)
+                    continue
+                waiter.changed.clear()
+                await waiter.changed.wait()
+        except BaseException:
+            if waiter.granted:
+                self._release(tenant, stage_class)
+            else:
+                self._waiting.remove(waiter)
+                self._dispatch()
+            raise
+        try:
+            yield
+        finally:
+            self._release(tenant, stage_class)
+
+    def stats(self) -> dict:
+        """Current load, and recent queue waits per stage class."""
+        waits = {}
+        for stage_class, samples in self._waits.items():
+            waits[stage_class] = {
+                "count": len(samples),
+                "mean": round(sum(samples) / len(samples), 4),
+                "p95": round(percentile(list(samples), 95), 4),
+                "max": round(max(samples), 4),
+            }
+        return {
+            "capacity": self.capacity,
+            "running": dict(self._running_by_class),
+            "waiting": len(self._waiting),
+            "tenants_running": len(self._running_by_tenant),
+            "granted": self.granted,
+            "rejected": self.rejected,
+            "wait_seconds": waits,
+        }
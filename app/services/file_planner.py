@@ -0,0 +1,172 @@
+from app.services.codegen_scheduler import PlannedFile
+from app.services.prompt_builder import PromptBuilder
+from app.services.template_engine import TemplateEngine
+
+# (path, spec sections the file is derived from, what the file should contain)
+HYDROGEN_FILES: list[tuple[str, list[str], str]] = [
+    (
+        "package.json",
+        ["brand.name"],
+        "npm manifest for a Shopify Hydrogen storefront on React Router and Vite",
+    ),
+    ("vite.config.ts", [], "Vite config with the Hydrogen and Oxygen plugins"),
+    ("tsconfig.json", [], "strict TypeScript config for a Hydrogen app"),
+    ("eslint.config.js", [], "ESLint flat config for TypeScript"),
+    (
+        "app/lib/shopify.ts",
+        ["store"],
+        "Storefront API client configured for the store domain and API version",
+    ),
+    (
+        "app/lib/fragments.ts",
+        ["catalog"],
+        "GraphQL fragments and queries for products, collections and search",
+    ),
+    ("app/lib/nav.ts", ["nav"], "navigation links exported as NAV_LINKS"),
+    ("app/lib/i18n.ts", ["i18n"], "locale detection and i18n helpers"),
+    (
+        "app/styles/theme.css",
+        ["brand.colors", "brand.typography"],
+        "CSS custom properties for the brand colors and typography",
+    ),
+    (
+        "app/components/Header.tsx",
+        ["brand.name", "brand.logo", "nav", "a11y"],
+        "site header with logo, NAV_LINKS navigation and cart link",
+    ),
+    (
+        "app/components/Footer.tsx",
+        ["brand.name", "nav"],
+        "site footer with NAV_LINKS navigation",
+    ),
+    (
+        "app/components/ProductCard.tsx",
+        ["catalog.pdp.badges"],
+        "product card with image, title, price and badges",
+    ),
+    (
+        "app/components/ProductGrid.tsx",
+        ["catalog.collections"],
+        "responsive grid of ProductCard components",
+    ),
+    (
+        "app/root.tsx",
+        ["seo", "a11y", "analytics", "i18n.defaultLocale"],
+        "root layout rendering Header, Footer, meta tags and analytics",
+    ),
+    (
+        "app/routes/_index.tsx",
+        ["brand.name", "seo", "catalog.collections"],
+        "home page featuring collections",
+    ),
+    (
+        "app/routes/collections.$handle.tsx",
+        ["catalog.collections", "seo"],
+        "collection page with a paginated ProductGrid",
+    ),
+    (
+        "app/routes/products.$handle.tsx",
+        ["catalog.pdp", "seo"],
+        "product detail page with media gallery and buy box",
+    ),
+    ("app/routes/cart.tsx", ["features"], "cart page with line items and checkout"),
+    (
+        "app/routes/search.tsx",
+        ["catalog.search"],
+        "search page with filters",
+    ),
+    ("app/routes/about.tsx", ["brand.name", "seo"], "about page"),
+    ("app/routes/contact.tsx", ["brand.name", "seo"], "contact page"),
+    (
+        ".github/workflows/oxygen.yml",
+        ["environments"],
+        "GitHub Actions workflow deploying to Oxygen",
+    ),
+]
+
+EXPLICIT_DEPENDENCIES = {
+    "app/root.tsx": [
+        "app/components/Header.tsx",
+        "app/components/Footer.tsx",
+        "app/styles/theme.css",
+    ],
+    "app/components/ProductGrid.tsx": ["app/components/ProductCard.tsx"],
+    "app/routes/collections.$handle.tsx": ["app/components/ProductGrid.tsx"],
+    "app/components/Header.tsx": ["app/lib/nav.ts"],
+    "app/components/Footer.tsx": ["app/lib/nav.ts"],
+}
+
+
+def get_section(spec: dict, section: str):
+    value = spec
+    for key in section.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return value
+
+
+def slice_spec(spec: dict, sections: list[str]) -> dict:
+    """Returns a nested dict holding only the given dotted spec sections."""
+    return nest_sections({section: get_section(spec, section) for section in sections})
+
+
+def nest_sections(values: dict[str, object]) -> dict:
+    """Rebuilds a nested spec from dotted section -> value pairs, skipping
+    sections that are missing (None)."""
+    sliced: dict = {}
+    for section, value in values.items():
+        if value is None:
+            continue
+        *parents, leaf = section.split(".")
+        target = sliced
+        for key in parents:
+            target = target.setdefault(key, {})
+        target[leaf] = value
+    return sliced
+
+
+def file_entries(spec: dict) -> list[tuple[str, list[str], str]]:
+    """The HYDROGEN_FILES entries that apply to this spec."""
+    return [
+        entry
+        for entry in HYDROGEN_FILES
+        if entry[0] != "app/lib/i18n.ts"
+        or len(get_section(spec, "i18n.locales") or []) >= 2
+    ]
+
+
+def plan_file(
+    path: str,
+    sections: list[str],
+    description: str,
+    spec: dict,
+    prompts: PromptBuilder,
+    store_data: dict | None = None,
+) -> PlannedFile:
+    """Plans one file, rendering it from a template when the engine can.
+
+    Templated files carry their content and no prompt; the rest get a prompt
+    with just their spec sections, plus the live store's collections and
+    facets for catalog files when store_data is given.
+    """
+    engine = TemplateEngine.shared()
+    planned = PlannedFile(
+        path=path,
+        depends_on=list(EXPLICIT_DEPENDENCIES.get(path, [])),
+        sections=list(sections),
+    )
+    if engine.handles(path):
+        planned["content"] = engine.render(path, spec)
+    else:
+        planned["prompt"] = prompts.file_prompt(
+            path,
+            description,
+            slice_spec(spec, sections),
+            store_data if uses_store_data(sections) else None,
+        )
+    return planned
+
+
+def uses_store_data(sections: list[str]) -> bool:
+    return any(section.startswith("catalog") for section in sections)
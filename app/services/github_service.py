@@ -1,21 +1,192 @@
-import reflex as rx
-from github import Github
+import asyncio
+import hashlib
+from collections.abc import Mapping
+
+import httpx
+
+GITHUB_API_URL = "https://api.github.com"
+
+
+def git_blob_sha(content: str) -> str:
+    data = content.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
 
 
 class GitHubService:
-    def __init__(self, token: str):
-        self.gh = Github(token)
+    def __init__(
+        self, token: str, api_url: str = GITHUB_API_URL, max_concurrency: int = 8
+    ):
+        self.token = token
+        self.api_url = api_url.rstrip("/")
+        self.max_concurrency = max_concurrency
+        self._client: httpx.AsyncClient | None = None
+        self._gh = None
+
+    @property
+    def gh(self):
+        """PyGithub client, imported and built on first use."""
+        if self._gh is None:
+            from github import Github
+
+            self._gh = Github(self.token)
+        return self._gh
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.api_url,
+                headers={
+                    "Authorization": f"Bearer {self.token}",
+                    "Accept": "application/vnd.github+json",
+                    "X-GitHub-Api-Version": "2022-11-28",
+                },
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                ),
+                timeout=30.0,
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _request(self, method: str, url: str, **kwargs) -> dict:
+        response = await self._get_client().request(method, url, **kwargs)
+        response.raise_for_status()
+        return response.json()
 
     def create_repository(self, name: str, description: str, private: bool = True):
         pass
 
-    def create_file(self, repo_full_name: str, path: str, content: str, message: str):
-        pass
+    async def _branch_head(self, repo_full_name: str, branch: str) -> str | None:
+        try:
+            ref = await self._request(
+                "GET", f"/repos/{repo_full_name}/git/ref/heads/{branch}"
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                return None
+            raise
+        return ref["object"]["sha"]
 
-    def create_pull_request(
-        self, repo_full_name: str, title: str, body: str, branch: str
-    ):
-        pass
+    async def commit_tree(
+        self,
+        repo_full_name: str,
+        branch: str,
+        files: Mapping[str, str],
+        message: str,
+        base_branch: str | None = None,
+    ) -> str:
+        """Commits all files to branch as a single commit and returns its SHA.
+
+        Blobs are uploaded concurrently, once per distinct content and
+        skipping any that already exists in the branch tree. A missing branch
+        is created from base_branch.
+        """
+        repo = f"/repos/{repo_full_name}/git"
+        head = await self._branch_head(repo_full_name, branch)
+        create_branch = head is None
+        if create_branch:
+            if base_branch is None:
+                raise ValueError(f"Branch {branch} does not exist")
+            head = await self._branch_head(repo_full_name, base_branch)
+            if head is None:
+                raise ValueError(f"Base branch {base_branch} does not exist")
+        commit = await self._request("GET", f"{repo}/commits/{head}")
+        base_tree = commit["tree"]["sha"]
+        tree = await self._request(
+            "GET", f"{repo}/trees/{base_tree}", params={"recursive": "1"}
+        )
+        existing = {
+            entry["path"]: entry["sha"]
+            for entry in tree.get("tree", [])
+            if entry["type"] == "blob"
+        }
+        changed = {}
+        for path, content in files.items():
+            sha = git_blob_sha(content)
+            if existing.get(path) != sha:
+                changed[path] = sha
+        if not changed and not create_branch:
+            return head
+        # One upload per distinct content not already in the repository, so
+        # identical files (empty index modules, repeated assets) share a blob.
+        known_shas = set(existing.values())
+        uploads = {
+            sha: files[path] for path, sha in changed.items() if sha not in known_shas
+        }
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def upload(content: str):
+            async with semaphore:
+                await self._request(
+                    "POST",
+                    f"{repo}/blobs",
+                    json={"content": content, "encoding": "utf-8"},
+                )
+
+        await asyncio.gather(*(upload(content) for content in uploads.values()))
+        new_tree = await self._request(
+            "POST",
+            f"{repo}/trees",
+            json={
+                "base_tree": base_tree,
+                "tree": [
+                    {"path": path, "mode": "100644", "type": "blob", "sha": sha}
+                    for path, sha in changed.items()
+                ],
+            },
+        )
+        new_commit = await self._request(
+            "POST",
+            f"{repo}/commits",
+            json={"message": message, "tree": new_tree["sha"], "parents": [head]},
+        )
+        if create_branch:
+            await self._request(
+                "POST",
+                f"{repo}/refs",
+                json={"ref": f"refs/heads/{branch}", "sha": new_commit["sha"]},
+            )
+        else:
+            await self._request(
+                "PATCH",
+                f"{repo}/refs/heads/{branch}",
+                json={"sha": new_commit["sha"]},
+            )
+        return new_commit["sha"]
+
+    async def create_file(
+        self,
+        repo_full_name: str,
+        path: str,
+        content: str,
+        message: str,
+        branch: str = "main",
+    ) -> str:
+        return await self.commit_tree(repo_full_name, branch, {path: content}, message)
+
+    async def create_pull_request(
+        self,
+        repo_full_name: str,
+        title: str,
+        body: str,
+        branch: str,
+        files: dict[str, str] | None = None,
+        base: str = "main",
+    ) -> dict:
+        if files:
+            await self.commit_tree(
+                repo_full_name, branch, files, title, base_branch=base
+            )
+        return await self._request(
+            "POST",
+            f"/repos/{repo_full_name}/pulls",
+            json={"title": title, "body": body, "head": branch, "base": base},
+        )
 
     def get_repository(self, full_name: str):
-        return self.gh.get_repo(full_name)
\ No newline at end of file
+        return self.gh.get_repo(full_name)
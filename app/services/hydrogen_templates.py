@@ -0,0 +1,299 @@
+import json
+import re
+
+PACKAGE_JSON = """{
+  "name": {{ name }},
+  "private": true,
+  "sideEffects": false,
+  "type": "module",
+  "scripts": {
+    "build": "shopify hydrogen build --codegen",
+    "dev": "shopify hydrogen dev --codegen",
+    "preview": "shopify hydrogen preview --build",
+    "lint": "eslint --no-error-on-unmatched-pattern .",
+    "test": "vitest run --passWithNoTests",
+    "typecheck": "tsc --noEmit"
+  },
+  "dependencies": {
+    "@shopify/hydrogen": "2025.7.0",
+    "graphql": "^16.10.0",
+    "graphql-tag": "^2.12.6",
+    "isbot": "^5.1.22",
+    "react": "^18.3.1",
+    "react-dom": "^18.3.1",
+    "react-router": "7.9.2",
+    "react-router-dom": "7.9.2"
+  },
+  "devDependencies": {
+    "@eslint/js": "^9.18.0",
+    "@react-router/dev": "7.9.2",
+    "@react-router/fs-routes": "7.9.2",
+    "@shopify/cli": "~3.84.1",
+    "@shopify/mini-oxygen": "^3.2.1",
+    "@shopify/oxygen-workers-types": "^4.1.6",
+    "@types/react": "^18.3.18",
+    "@types/react-dom": "^18.3.5",
+    "eslint": "^9.18.0",
+    "typescript": "^5.9.2",
+    "typescript-eslint": "^8.20.0",
+    "vite": "^6.2.4",
+    "vite-tsconfig-paths": "^4.3.1",
+    "vitest": "^3.2.4"
+  },
+  "engines": {
+    "node": ">=18.0.0"
+  }
+}
+"""
+
+VITE_CONFIG = """import {defineConfig} from 'vite';
+import {hydrogen} from '@shopify/hydrogen/vite';
+import {oxygen} from '@shopify/mini-oxygen/vite';
+import {reactRouter} from '@react-router/dev/vite';
+import tsconfigPaths from 'vite-tsconfig-paths';
+
+export default defineConfig({
+  plugins: [hydrogen(), oxygen(), reactRouter(), tsconfigPaths()],
+  build: {
+    assetsInlineLimit: 0,
+  },
+  ssr: {
+    optimizeDeps: {
+      include: ['isbot'],
+    },
+  },
+});
+"""
+
+ESLINT_CONFIG = """import js from '@eslint/js';
+import tseslint from 'typescript-eslint';
+
+export default tseslint.config(
+  {ignores: ['build/', 'dist/', '.react-router/', 'node_modules/']},
+  js.configs.recommended,
+  ...tseslint.configs.recommended,
+);
+"""
+
+TSCONFIG = """{
+  "include": ["./**/*.d.ts", "./**/*.ts", "./**/*.tsx", ".react-router/types/**/*"],
+  "compilerOptions": {
+    "lib": ["DOM", "DOM.Iterable", "ES2022"],
+    "isolatedModules": true,
+    "esModuleInterop": true,
+    "jsx": "react-jsx",
+    "moduleResolution": "Bundler",
+    "resolveJsonModule": true,
+    "module": "ES2022",
+    "target": "ES2022",
+    "strict": true,
+    "allowJs": true,
+    "forceConsistentCasingInFileNames": true,
+    "skipLibCheck": true,
+    "noEmit": true,
+    "baseUrl": ".",
+    "types": ["@shopify/oxygen-workers-types", "react-router", "vite/client"],
+    "paths": {
+      "~/*": ["app/*"]
+    },
+    "rootDirs": [".", "./.react-router/types"]
+  }
+}
+"""
+
+SHOPIFY_CLIENT = """import {createStorefrontClient, type I18nBase} from '@shopify/hydrogen';
+
+export const STORE_DOMAIN = {{ domain }};
+export const STOREFRONT_API_VERSION = {{ api_version }};
+
+export function createStorefront(
+  env: {PUBLIC_STOREFRONT_API_TOKEN: string; PRIVATE_STOREFRONT_API_TOKEN?: string},
+  request: Request,
+  i18n: I18nBase,
+  cache?: Cache,
+  waitUntil?: (promise: Promise<unknown>) => void,
+) {
+  return createStorefrontClient({
+    cache,
+    waitUntil,
+    i18n,
+    publicStorefrontToken: env.PUBLIC_STOREFRONT_API_TOKEN,
+    privateStorefrontToken: env.PRIVATE_STOREFRONT_API_TOKEN,
+    storeDomain: STORE_DOMAIN,
+    storefrontApiVersion: STOREFRONT_API_VERSION,
+    storefrontHeaders: {
+      requestGroupId: request.headers.get('request-id'),
+      buyerIp: request.headers.get('oxygen-buyer-ip'),
+      cookie: request.headers.get('cookie'),
+      purpose: request.headers.get('purpose'),
+    },
+  });
+}
+"""
+
+NAV = """export type NavLink = {label: string; href: string};
+
+export const NAV_LINKS: NavLink[] = {{ links }};
+"""
+
+I18N = """import type {I18nBase} from '@shopify/hydrogen';
+
+export const LOCALES = {{ locales }} as const;
+export type Locale = (typeof LOCALES)[number];
+export const DEFAULT_LOCALE: Locale = {{ default_locale }};
+
+function toI18n(locale: string): I18nBase {
+  const [language, country] = locale.split('-');
+  return {
+    language: language.toUpperCase() as I18nBase['language'],
+    country: (country ?? 'US').toUpperCase() as I18nBase['country'],
+  };
+}
+
+export function getLocaleFromRequest(request: Request): I18nBase {
+  const [prefix] = new URL(request.url).pathname.split('/').filter(Boolean);
+  const locale = LOCALES.find((l) => l.toLowerCase() === prefix?.toLowerCase());
+  return toI18n(locale ?? DEFAULT_LOCALE);
+}
+"""
+
+THEME_CSS = """:root {
+{{ color_vars }}
+{{ font_vars }}
+}
+
+body {
+  background: var(--color-bg);
+  color: var(--color-primary);
+  font-family: var(--font-body);
+  font-weight: var(--font-body-weight);
+}
+
+h1,
+h2,
+h3,
+h4 {
+  font-family: var(--font-heading);
+  font-weight: var(--font-heading-weight);
+}
+"""
+
+OXYGEN_WORKFLOW = """name: Storefront deployment
+on:
+{{ triggers }}
+
+permissions:
+  contents: read
+  deployments: write
+
+jobs:
+  deploy:
+    name: Deploy to Oxygen
+    timeout-minutes: 30
+    runs-on: ubuntu-latest
+    steps:
+      - uses: actions/checkout@v4
+      - uses: actions/setup-node@v4
+        with:
+          node-version: lts/*
+          check-latest: true
+          cache: npm
+      - run: npm ci
+      - name: Build and publish to Oxygen
+        run: npx shopify hydrogen deploy
+        env:
+          SHOPIFY_HYDROGEN_DEPLOYMENT_TOKEN: ${{ secrets.OXYGEN_DEPLOYMENT_TOKEN }}
+"""
+
+
+def _get(spec: dict, path: str, default=None):
+    value = spec
+    for key in path.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return default
+        value = value[key]
+    return value
+
+
+def _js(value, indent: int | None = None) -> str:
+    return json.dumps(value, ensure_ascii=False, indent=indent)
+
+
+def _slug(name: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", name.lower()).strip("-") or "hydrogen-storefront"
+
+
+def _kebab(name: str) -> str:
+    return re.sub(r"(?<!^)(?=[A-Z])", "-", name).lower()
+
+
+def _css_font(font: str) -> str:
+    return "'" + re.sub(r"[^\w \-]", "", font) + "', system-ui, sans-serif"
+
+
+def theme_context(spec: dict) -> dict[str, str]:
+    colors = _get(spec, "brand.colors", {}) or {}
+    typography = _get(spec, "brand.typography", {}) or {}
+    fonts = []
+    for role in ("heading", "body"):
+        face = typography.get(role) or {}
+        fonts.append(f"  --font-{role}: {_css_font(face.get('font', 'Inter'))};")
+        fonts.append(f"  --font-{role}-weight: {int(face.get('weight', 400))};")
+    return {
+        "color_vars": "\n".join(
+            f"  --color-{_kebab(name)}: {value};" for name, value in colors.items()
+        ),
+        "font_vars": "\n".join(fonts),
+    }
+
+
+def workflow_context(spec: dict) -> dict[str, str]:
+    environments = _get(spec, "environments", {}) or {}
+    triggers = ["  workflow_dispatch: {}"]
+    if environments.get("production", True):
+        triggers.append("  push:\n    branches: [main]")
+    if environments.get("preview", True):
+        triggers.append("  pull_request: {}")
+    return {"triggers": "\n".join(triggers)}
+
+
+def i18n_context(spec: dict) -> dict[str, str]:
+    locales = _get(spec, "i18n.locales") or ["en"]
+    return {
+        "locales": _js(locales),
+        "default_locale": _js(_get(spec, "i18n.defaultLocale") or locales[0]),
+    }
+
+
+# path -> (template source, spec -> template variables)
+HYDROGEN_TEMPLATES = {
+    "package.json": (
+        PACKAGE_JSON,
+        lambda spec: {"name": _js(_slug(_get(spec, "brand.name", "")))},
+    ),
+    "vite.config.ts": (VITE_CONFIG, lambda spec: {}),
+    "tsconfig.json": (TSCONFIG, lambda spec: {}),
+    "eslint.config.js": (ESLINT_CONFIG, lambda spec: {}),
+    "app/lib/shopify.ts": (
+        SHOPIFY_CLIENT,
+        lambda spec: {
+            "domain": _js(_get(spec, "store.domain", "")),
+            "api_version": _js(_get(spec, "store.storefrontApiVersion", "2025-07")),
+        },
+    ),
+    "app/lib/nav.ts": (
+        NAV,
+        lambda spec: {
+            "links": _js(
+                [
+                    {"label": link.get("label", ""), "href": link.get("href", "/")}
+                    for link in _get(spec, "nav", []) or []
+                ],
+                indent=2,
+            )
+        },
+    ),
+    "app/lib/i18n.ts": (I18N, i18n_context),
+    "app/styles/theme.css": (THEME_CSS, theme_context),
+    ".github/workflows/oxygen.yml": (OXYGEN_WORKFLOW, workflow_context),
+}
@@ -0,0 +1,479 @@
+import asyncio
+import contextlib
+import datetime
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from enum import Enum
+from typing import AsyncIterator, Awaitable, Callable
+
+from app.services.fair_scheduler import FairScheduler
+from app.services.storage import data_path
+
+
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+TERMINAL_STATUSES = {JobStatus.COMPLETED.value, JobStatus.FAILED.value}
+# How often watch() re-reads a job, for jobs run by another process.
+WATCH_POLL_SECONDS = 2.0
+
+
+class NonRetryableError(Exception):
+    """Raised by a stage when running it again cannot succeed."""
+
+
+class JobQueue:
+    """Durable SQLite job table with lease-based claiming.
+
+    A job whose worker dies keeps status "running" until its lease expires,
+    after which any worker can claim it again and resume from its checkpoint.
+    """
+
+    def __init__(self, db_path: str | None = None):
+        self.db_path = db_path or data_path("jobs.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                project_id TEXT NOT NULL,
+                tenant TEXT NOT NULL DEFAULT '',
+                status TEXT NOT NULL,
+                stage TEXT,
+                completed_stages TEXT NOT NULL DEFAULT '[]',
+                outputs TEXT NOT NULL DEFAULT '{}',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                lease_until REAL NOT NULL DEFAULT 0,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, created_at);
+            CREATE INDEX IF NOT EXISTS idx_jobs_project ON jobs(project_id);
+            """)
+
+    def enqueue(
+        self, project_id: str, outputs: dict | None = None, tenant: str = ""
+    ) -> str:
+        job_id = f"job_{uuid.uuid4().hex[:12]}"
+        now = datetime.datetime.now().isoformat()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO jobs (id, project_id, tenant, status, outputs, "
+                "created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job_id,
+                    project_id,
+                    tenant,
+                    JobStatus.QUEUED.value,
+                    json.dumps(outputs or {}),
+                    now,
+                    now,
+                ),
+            )
+        return job_id
+
+    def claim(self, lease_seconds: float) -> dict | None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT id FROM jobs WHERE status = ? "
+                    "OR (status = ? AND lease_until < ?) "
+                    "ORDER BY created_at LIMIT 1",
+                    (JobStatus.QUEUED.value, JobStatus.RUNNING.value, now),
+                ).fetchone()
+                if row is None:
+                    self._conn.execute("COMMIT")
+                    return None
+                self._conn.execute(
+                    "UPDATE jobs SET status = ?, attempts = attempts + 1, "
+                    "lease_until = ?, updated_at = ? WHERE id = ?",
+                    (
+                        JobStatus.RUNNING.value,
+                        now + lease_seconds,
+                        datetime.datetime.now().isoformat(),
+                        row["id"],
+                    ),
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return self.get(row["id"])
+
+    def renew_lease(self, job_id: str, lease_seconds: float):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ?",
+                (time.time() + lease_seconds, job_id),
+            )
+
+    def checkpoint(
+        self, job_id: str, stage: str, completed_stages: list[str], outputs: dict
+    ):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET stage = ?, completed_stages = ?, outputs = ?, "
+                "updated_at = ? WHERE id = ?",
+                (
+                    stage,
+                    json.dumps(completed_stages),
+                    json.dumps(outputs),
+                    datetime.datetime.now().isoformat(),
+                    job_id,
+                ),
+            )
+
+    def finish(self, job_id: str, status: JobStatus, error: str | None = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, lease_until = 0, "
+                "updated_at = ? WHERE id = ?",
+                (status.value, error, datetime.datetime.now().isoformat(), job_id),
+            )
+
+    def get(self, job_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        job = dict(row)
+        job["completed_stages"] = json.loads(job["completed_stages"])
+        job["outputs"] = json.loads(job["outputs"])
+        return job
+
+    def latest_outputs(self, project_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT outputs FROM jobs WHERE project_id = ? AND status = ? "
+                "ORDER BY updated_at DESC LIMIT 1",
+                (project_id, JobStatus.COMPLETED.value),
+            ).fetchone()
+        return json.loads(row["outputs"]) if row is not None else None
+
+    def active_job_for(self, project_id: str) -> str | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE project_id = ? AND status IN (?, ?) "
+                "ORDER BY created_at DESC LIMIT 1",
+                (project_id, JobStatus.QUEUED.value, JobStatus.RUNNING.value),
+            ).fetchone()
+        return row["id"] if row is not None else None
+
+    def active_counts(self, tenant: str) -> tuple[int, int]:
+        """Queued or running jobs for tenant, and for everyone."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COALESCE(SUM(tenant = ?), 0), COUNT(*) FROM jobs "
+                "WHERE status IN (?, ?)",
+                (tenant, JobStatus.QUEUED.value, JobStatus.RUNNING.value),
+            ).fetchone()
+        return row[0], row[1]
+
+
+class JobContext:
+    def __init__(self, runner: "JobRunner", job: dict):
+        self.runner = runner
+        self.job_id = job["id"]
+        self.project_id = job["project_id"]
+        self.tenant = job.get("tenant") or ""
+        self.outputs: dict = job["outputs"]
+        self.stage: str | None = None
+
+    async def report(
+        self,
+        message: str | None = None,
+        progress: float | None = None,
+        agent: str | None = None,
+        details: dict | None = None,
+        severity: str = "info",
+    ):
+        await self.runner.publish(
+            self.job_id,
+            {
+                "project_id": self.project_id,
+                "stage": self.stage,
+                "status": JobStatus.RUNNING.value,
+                "progress": progress,
+                "agent": agent,
+                "message": message,
+                "details": details,
+                "severity": severity,
+            },
+        )
+
+
+StageHandler = Callable[[JobContext], Awaitable[dict]]
+
+
+class JobRunner:
+    """Runs queued project workflows on a local asyncio worker pool.
+
+    With a scheduler, workers only bound how many jobs are in flight; each
+    stage additionally waits for a scheduler slot, and jobs are admitted
+    against the scheduler's per-tenant and global limits.
+    """
+
+    _shared: "JobRunner | None" = None
+
+    def __init__(
+        self,
+        stages: list[tuple[str, StageHandler]],
+        queue: JobQueue | None = None,
+        workers: int = 4,
+        lease_seconds: float = 60.0,
+        poll_interval: float = 0.5,
+        max_attempts: int = 3,
+        on_finish: Callable[[dict], None] | None = None,
+        on_event: Callable[[dict], None] | None = None,
+        scheduler: FairScheduler | None = None,
+    ):
+        self.stages = stages
+        self.queue = queue or JobQueue()
+        self.workers = workers
+        self.lease_seconds = lease_seconds
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.on_finish = on_finish
+        self.on_event = on_event
+        self.scheduler = scheduler
+        self._tasks: list[asyncio.Task] = []
+        self._listeners: dict[str, list[asyncio.Queue]] = {}
+        self._wakeup: asyncio.Event | None = None
+
+    @classmethod
+    def shared(cls) -> "JobRunner":
+        if cls._shared is None:
+            from app.services.workflow import (
+                STAGE_CLASSES,
+                WORKFLOW_STAGES,
+                finish_project,
+                log_job_event,
+            )
+
+            capacity = int(os.getenv("HYDROGEN_AGENT_STAGE_CAPACITY", "4"))
+            max_jobs = int(os.getenv("HYDROGEN_AGENT_MAX_ACTIVE_JOBS", "32"))
+            scheduler = FairScheduler(
+                capacity,
+                STAGE_CLASSES,
+                tenant_quota=int(os.getenv("HYDROGEN_AGENT_TENANT_QUOTA", "2")),
+                max_jobs_per_tenant=int(
+                    os.getenv("HYDROGEN_AGENT_TENANT_MAX_JOBS", "3")
+                ),
+                max_active_jobs=max_jobs,
+            )
+            # One worker per admissible job, so admitted jobs never wait to
+            # be claimed and the scheduler alone decides what runs.
+            cls._shared = cls(
+                WORKFLOW_STAGES,
+                workers=max_jobs,
+                on_finish=finish_project,
+                on_event=log_job_event,
+                scheduler=scheduler,
+            )
+        return cls._shared
+
+    def ensure_started(self):
+        if any(not task.done() for task in self._tasks):
+            return
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def serve(self):
+        """Runs the worker pool until cancelled; stale jobs resume on start."""
+        self.ensure_started()
+        try:
+            await asyncio.gather(*self._tasks)
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(
+        self, project_id: str, outputs: dict | None = None, tenant: str = ""
+    ) -> str:
+        """Queues a job for project_id, or returns its already active one.
+
+        Raises AdmissionError if the scheduler refuses a new job.
+        """
+        job_id = self.queue.active_job_for(project_id)
+        if job_id is None:
+            if self.scheduler is not None:
+                self.scheduler.admit(tenant, *self.queue.active_counts(tenant))
+            job_id = self.queue.enqueue(project_id, outputs, tenant)
+        self.ensure_started()
+        self._wakeup.set()
+        return job_id
+
+    async def submit_when_idle(
+        self,
+        project_id: str,
+        outputs: Callable[[], dict | None],
+        tenant: str = "",
+    ) -> str:
+        """Queues a job for project_id once its active job, if any, has ended.
+
+        outputs is only called then, so a follow-up build can seed itself
+        from the job it waited for.
+        """
+        while (active := self.queue.active_job_for(project_id)) is not None:
+            async for _ in self.watch(active):
+                pass
+        return self.submit(project_id, outputs(), tenant)
+
+    async def publish(self, job_id: str, event: dict):
+        if self.on_event is not None:
+            self.on_event(event)
+        for listener in self._listeners.get(job_id, []):
+            listener.put_nowait({"job_id": job_id, **event})
+
+    async def watch(
+        self, job_id: str, poll_interval: float = WATCH_POLL_SECONDS
+    ) -> AsyncIterator[dict]:
+        """Yields progress events for job_id until it completes or fails.
+
+        Events published in this process arrive as they happen. The job is
+        also re-read whenever none has arrived for poll_interval seconds, so
+        a job run by another worker process still reports stage changes and
+        its end.
+        """
+        listener: asyncio.Queue = asyncio.Queue()
+        self._listeners.setdefault(job_id, []).append(listener)
+        try:
+            job = self.queue.get(job_id)
+            if job is None or job["status"] in TERMINAL_STATUSES:
+                if job is not None:
+                    yield self._job_event(job)
+                return
+            stage = job["stage"]
+            while True:
+                try:
+                    event = await asyncio.wait_for(listener.get(), poll_interval)
+                except asyncio.TimeoutError:
+                    job = self.queue.get(job_id)
+                    if job is None:
+                        return
+                    if job["status"] not in TERMINAL_STATUSES and job["stage"] == stage:
+                        continue
+                    event = self._job_event(job)
+                stage = event.get("stage") or stage
+                yield event
+                if event["status"] in TERMINAL_STATUSES:
+                    return
+        finally:
+            self._listeners[job_id].remove(listener)
+            if not self._listeners[job_id]:
+                del self._listeners[job_id]
+
+    def _job_event(self, job: dict) -> dict:
+        return {
+            "job_id": job["id"],
+            "project_id": job["project_id"],
+            "stage": job["stage"],
+            "status": job["status"],
+            "progress": None,
+            "agent": None,
+            "message": job["error"],
+            "details": None,
+            "outputs": job["outputs"],
+        }
+
+    async def _worker(self):
+        while True:
+            job = self.queue.claim(self.lease_seconds)
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await self._run(job)
+
+    async def _keep_lease(self, job_id: str):
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            self.queue.renew_lease(job_id, self.lease_seconds)
+
+    async def _run(self, job: dict):
+        ctx = JobContext(self, job)
+        completed = list(job["completed_stages"])
+        lease = asyncio.create_task(self._keep_lease(job["id"]))
+        try:
+            for stage, handler in self.stages:
+                if stage in completed:
+                    continue
+                ctx.stage = stage
+                async with self._stage_slot(ctx):
+                    await ctx.report(f"Starting stage: {stage}")
+                    stage_outputs = await handler(ctx)
+                ctx.outputs.update(stage_outputs)
+                completed.append(stage)
+                self.queue.checkpoint(job["id"], stage, completed, ctx.outputs)
+                await self.publish(
+                    job["id"],
+                    {
+                        "project_id": ctx.project_id,
+                        "stage": stage,
+                        "status": JobStatus.RUNNING.value,
+                        "progress": None,
+                        "agent": None,
+                        "message": f"Completed stage: {stage}",
+                        "details": None,
+                        "outputs": stage_outputs,
+                    },
+                )
+        except Exception as e:
+            if job["attempts"] < self.max_attempts and not isinstance(
+                e, NonRetryableError
+            ):
+                self.queue.finish(job["id"], JobStatus.QUEUED)
+                await ctx.report(
+                    f"Stage {ctx.stage} failed, retrying: {e}", severity="warning"
+                )
+            else:
+                self.queue.finish(job["id"], JobStatus.FAILED, str(e))
+                await self._finished(job["id"])
+        else:
+            self.queue.finish(job["id"], JobStatus.COMPLETED)
+            await self._finished(job["id"])
+        finally:
+            lease.cancel()
+
+    def _stage_slot(self, ctx: JobContext) -> contextlib.AbstractAsyncContextManager:
+        if self.scheduler is None:
+            return contextlib.nullcontext()
+
+        async def on_wait(position: int):
+            await ctx.report(details={"queue_position": position})
+
+        return self.scheduler.slot(ctx.tenant, ctx.stage, on_wait)
+
+    async def _finished(self, job_id: str):
+        job = self.queue.get(job_id)
+        if self.on_finish is not None:
+            self.on_finish(job)
+        await self.publish(job_id, self._job_event(job))
+
+
+async def run_job_workers():
+    await JobRunner.shared().serve()
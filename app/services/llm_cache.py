@@ -0,0 +1,157 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from app.services.storage import data_path
+
+
+def normalize_prompt(prompt: str) -> str:
+    lines = prompt.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip()
+
+
+def cache_key(prompt: str, model: str, params: dict | None = None) -> str:
+    payload = json.dumps(
+        {"model": model, "prompt": normalize_prompt(prompt), "params": params or {}},
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    """Two-tier response cache: an in-memory LRU in front of a SQLite table.
+
+    Lookups run on the event loop, so a disk hit only reads: access times
+    are batched in memory and written with the next insert, or once
+    touch_batch of them have piled up.
+    """
+
+    _shared: "LLMCache | None" = None
+
+    def __init__(
+        self,
+        db_path: str | None = None,
+        max_memory_entries: int = 512,
+        max_disk_entries: int = 20000,
+        ttl_seconds: float = 7 * 24 * 3600,
+        touch_batch: int = 256,
+    ):
+        self.db_path = db_path or data_path("llm_cache.db")
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self.touch_batch = touch_batch
+        self._touched: dict[str, float] = {}
+        self._memory: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    @classmethod
+    def shared(cls) -> "LLMCache":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, model TEXT NOT NULL, response TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_accessed "
+                "ON responses(accessed_at)"
+            )
+        return self._conn
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                response, created_at = entry
+                if now - created_at <= self.ttl_seconds:
+                    self._memory.move_to_end(key)
+                    self.stats["memory_hits"] += 1
+                    return response
+                del self._memory[key]
+            db = self._db()
+            row = db.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                # Expired rows are deleted by the next set().
+                self.stats["misses"] += 1
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= self.touch_batch:
+                self._flush_touched(db)
+                db.commit()
+            self._remember(key, row[0], row[1])
+            self.stats["disk_hits"] += 1
+            return row[0]
+
+    def set(self, key: str, model: str, response: str):
+        """Caches response; empty responses are never cached."""
+        if not response.strip():
+            return
+        now = time.time()
+        with self._lock:
+            self._remember(key, response, now)
+            self._touched.pop(key, None)
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now),
+            )
+            self._evict_disk(db, now)
+            db.commit()
+
+    def _remember(self, key: str, response: str, created_at: float):
+        self._memory[key] = (response, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def _flush_touched(self, db: sqlite3.Connection):
+        db.executemany(
+            "UPDATE responses SET accessed_at = ? WHERE key = ?",
+            [(accessed_at, key) for key, accessed_at in self._touched.items()],
+        )
+        self._touched.clear()
+
+    def _evict_disk(self, db: sqlite3.Connection, now: float):
+        self._flush_touched(db)
+        expired = db.execute(
+            "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        overflow = db.execute(
+            "DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+            "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_disk_entries,),
+        ).rowcount
+        self.stats["evictions"] += expired + overflow
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._touched.clear()
+            self._db().execute("DELETE FROM responses")
+            self._db().commit()
+
+    def get_stats(self) -> dict:
+        hits = self.stats["memory_hits"] + self.stats["disk_hits"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
@@ -0,0 +1,250 @@
+import atexit
+import contextlib
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from typing import TypedDict
+
+from app.services.storage import data_path
+
+# USD per million (prompt, completion) tokens; unlisted models are free.
+MODEL_PRICING: dict[str, tuple[float, float]] = {}
+# Trace records are appended by a background thread in batches, and the
+# file is rotated once it passes TRACE_MAX_BYTES.
+TRACE_FLUSH_SECONDS = 1.0
+TRACE_MAX_BYTES = 20 * 1024 * 1024
+TRACE_BACKUPS = 3
+
+_call_context: contextvars.ContextVar[dict] = contextvars.ContextVar(
+    "llm_call_context", default={}
+)
+
+
+class LLMCallRecord(TypedDict):
+    trace_id: str
+    span_id: str
+    project_id: str | None
+    stage: str | None
+    task_type: str | None
+    model: str
+    provider: str
+    prompt_tokens: int
+    completion_tokens: int
+    cost_usd: float
+    time_to_first_token: float
+    latency: float
+    cache_hit: bool
+    retries: int
+    ok: bool
+    error: str | None
+    started_at: float
+
+
+@contextlib.contextmanager
+def llm_context(**fields):
+    """Attributes LLM calls made inside the block (and tasks it spawns)."""
+    token = _call_context.set({**_call_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _call_context.reset(token)
+
+
+def estimate_tokens(text: str) -> int:
+    return max(1, len(text) // 4) if text else 0
+
+
+class MetricsRecorder:
+    _shared: "MetricsRecorder | None" = None
+
+    def __init__(
+        self,
+        max_records: int = 10000,
+        trace_path: str | None = None,
+        flush_interval: float = TRACE_FLUSH_SECONDS,
+        max_trace_bytes: int = TRACE_MAX_BYTES,
+        trace_backups: int = TRACE_BACKUPS,
+    ):
+        self.records: deque[LLMCallRecord] = deque(maxlen=max_records)
+        self.trace_path = trace_path
+        self.flush_interval = flush_interval
+        self.max_trace_bytes = max_trace_bytes
+        self.trace_backups = trace_backups
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._pending: list[LLMCallRecord] = []
+        self._writer: threading.Thread | None = None
+
+    @classmethod
+    def shared(cls) -> "MetricsRecorder":
+        if cls._shared is None:
+            cls._shared = cls(trace_path=data_path("traces", "llm_calls.jsonl"))
+        return cls._shared
+
+    def record(
+        self,
+        model: str,
+        provider: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        latency: float,
+        time_to_first_token: float | None = None,
+        cache_hit: bool = False,
+        ok: bool = True,
+        error: str | None = None,
+    ) -> LLMCallRecord:
+        context = _call_context.get()
+        prompt_price, completion_price = MODEL_PRICING.get(model, (0.0, 0.0))
+        record = LLMCallRecord(
+            trace_id=context.get("trace_id") or context.get("project_id") or "",
+            span_id=uuid.uuid4().hex[:16],
+            project_id=context.get("project_id"),
+            stage=context.get("stage"),
+            task_type=context.get("task_type"),
+            model=model,
+            provider=provider,
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            cost_usd=(
+                prompt_tokens * prompt_price + completion_tokens * completion_price
+            )
+            / 1_000_000,
+            time_to_first_token=(
+                latency if time_to_first_token is None else time_to_first_token
+            ),
+            latency=latency,
+            cache_hit=cache_hit,
+            retries=context.get("retries", 0),
+            ok=ok,
+            error=error,
+            started_at=time.time() - latency,
+        )
+        with self._lock:
+            self.records.append(record)
+            if self.trace_path:
+                self._pending.append(record)
+                if self._writer is None:
+                    self._writer = threading.Thread(
+                        target=self._write_loop, name="llm-trace-writer", daemon=True
+                    )
+                    self._writer.start()
+                    atexit.register(self.flush)
+        return record
+
+    def _write_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush()
+
+    def flush(self):
+        """Appends pending records to the trace file, rotating it when full."""
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending or not self.trace_path:
+            return
+        data = "".join(json.dumps(record) + "\n" for record in pending)
+        with self._write_lock:
+            self._rotate()
+            with open(self.trace_path, "a", encoding="utf-8") as f:
+                f.write(data)
+
+    def _rotate(self):
+        try:
+            size = os.path.getsize(self.trace_path)
+        except FileNotFoundError:
+            return
+        if size < self.max_trace_bytes:
+            return
+        for index in range(self.trace_backups, 0, -1):
+            source = f"{self.trace_path}.{index - 1}" if index > 1 else self.trace_path
+            if os.path.exists(source):
+                os.replace(source, f"{self.trace_path}.{index}")
+        if os.path.exists(self.trace_path):
+            os.remove(self.trace_path)
+
+    def query(self, **filters) -> list[LLMCallRecord]:
+        with self._lock:
+            records = list(self.records)
+        return [r for r in records if all(r.get(k) == v for k, v in filters.items())]
+
+    def summary(self, group_by: list[str], **filters) -> list[dict]:
+        """Aggregates matching calls by the given record fields."""
+        groups: dict[tuple, dict] = {}
+        for r in self.query(**filters):
+            key = tuple(r.get(field) for field in group_by)
+            group = groups.setdefault(
+                key,
+                {
+                    **dict(zip(group_by, key)),
+                    "calls": 0,
+                    "errors": 0,
+                    "cache_hits": 0,
+                    "retries": 0,
+                    "prompt_tokens": 0,
+                    "completion_tokens": 0,
+                    "cost_usd": 0.0,
+                    "total_latency": 0.0,
+                    "total_ttft": 0.0,
+                },
+            )
+            group["calls"] += 1
+            group["errors"] += 0 if r["ok"] else 1
+            group["cache_hits"] += 1 if r["cache_hit"] else 0
+            group["retries"] += r["retries"]
+            group["prompt_tokens"] += r["prompt_tokens"]
+            group["completion_tokens"] += r["completion_tokens"]
+            group["cost_usd"] += r["cost_usd"]
+            group["total_latency"] += r["latency"]
+            group["total_ttft"] += r["time_to_first_token"]
+        for group in groups.values():
+            group["avg_latency"] = round(group["total_latency"] / group["calls"], 3)
+            group["avg_ttft"] = round(group["total_ttft"] / group["calls"], 3)
+            group["total_latency"] = round(group["total_latency"], 3)
+            del group["total_ttft"]
+        return list(groups.values())
+
+    def export_jsonl(self, path: str, **filters):
+        with open(path, "w", encoding="utf-8") as f:
+            for record in self.query(**filters):
+                f.write(json.dumps(record) + "\n")
+
+    def export_spans(self, **filters) -> list[dict]:
+        """Returns calls as OpenTelemetry-style span dicts (OTLP JSON field names)."""
+        spans = []
+        for r in self.query(**filters):
+            attributes = {
+                "gen_ai.system": r["provider"],
+                "gen_ai.request.model": r["model"],
+                "gen_ai.usage.input_tokens": r["prompt_tokens"],
+                "gen_ai.usage.output_tokens": r["completion_tokens"],
+                "llm.task_type": r["task_type"],
+                "llm.stage": r["stage"],
+                "llm.project_id": r["project_id"],
+                "llm.cache_hit": r["cache_hit"],
+                "llm.retries": r["retries"],
+                "llm.time_to_first_token": r["time_to_first_token"],
+                "llm.cost_usd": r["cost_usd"],
+            }
+            spans.append(
+                {
+                    "traceId": uuid.uuid5(uuid.NAMESPACE_URL, r["trace_id"]).hex,
+                    "spanId": r["span_id"],
+                    "name": f"llm {r['task_type'] or 'generate'}",
+                    "startTimeUnixNano": int(r["started_at"] * 1e9),
+                    "endTimeUnixNano": int((r["started_at"] + r["latency"]) * 1e9),
+                    "status": {
+                        "code": 1 if r["ok"] else 2,
+                        "message": r["error"] or "",
+                    },
+                    "attributes": [
+                        {"key": key, "value": {"stringValue": str(value)}}
+                        for key, value in attributes.items()
+                        if value is not None
+                    ],
+                }
+            )
+        return spans
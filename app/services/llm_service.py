@@ -1,4 +1,32 @@
+import asyncio
+import contextlib
+import json
+import os
+import time
 from enum import Enum
+from typing import AsyncIterator, Awaitable, Callable
+
+import httpx
+
+from app.services.llm_cache import LLMCache, cache_key
+from app.services.llm_metrics import MetricsRecorder, estimate_tokens, llm_context
+from app.services.model_router import ModelRouter
+from app.services.ollama_client import OLLAMA_BASE_URL, OllamaClient
+from app.services.prompt_builder import minify_json
+from app.services.spec_schema import SpecError, compile_schema
+from app.services.structured_output import (
+    JsonStreamError,
+    SectionStream,
+    StructuredOutputError,
+    StructuredReport,
+    continuation_prompt,
+    decoding_schema,
+    object_schema,
+    section_of,
+    section_prompt,
+)
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
 
 
 class ModelProvider(Enum):
@@ -7,11 +35,41 @@ class ModelProvider(Enum):
 
 
 class LLMService:
+    _shared: "LLMService | None" = None
+
     def __init__(
-        self, api_key: str, provider: ModelProvider = ModelProvider.OPENROUTER
+        self,
+        api_key: str,
+        provider: ModelProvider = ModelProvider.OPENROUTER,
+        openrouter_base_url: str = OPENROUTER_BASE_URL,
+        ollama_base_url: str = OLLAMA_BASE_URL,
+        cache: LLMCache | None = None,
+        router: ModelRouter | None = None,
+        metrics: MetricsRecorder | None = None,
+        ollama: OllamaClient | None = None,
     ):
         self.api_key = api_key
         self.provider = provider
+        self.openrouter_base_url = openrouter_base_url.rstrip("/")
+        self.ollama_base_url = ollama_base_url.rstrip("/")
+        self.cache = cache if cache is not None else LLMCache.shared()
+        self.router = router if router is not None else ModelRouter.shared()
+        self.metrics = metrics if metrics is not None else MetricsRecorder.shared()
+        if ollama is None:
+            ollama = (
+                OllamaClient.shared()
+                if self.ollama_base_url == OLLAMA_BASE_URL.rstrip("/")
+                else OllamaClient(self.ollama_base_url)
+            )
+        self.ollama = ollama
+        self._client: httpx.AsyncClient | None = None
+
+    @classmethod
+    def shared(cls) -> "LLMService":
+        """Process-wide service for OPENROUTER_API_KEY, built on first use."""
+        if cls._shared is None:
+            cls._shared = cls(os.getenv("OPENROUTER_API_KEY", ""))
+        return cls._shared
 
     def get_orchestrator_models(self) -> list[str]:
         return ["phi4:mini", "gemma3:4b"]
@@ -24,15 +82,381 @@ class LLMService:
             "openai/gpt-oss-20b:free",
         ]
 
-    def select_model_for_task(self, task_type: str) -> str:
+    def candidates_for_task(self, task_type: str) -> list[str]:
         if task_type in ["spec_extraction", "file_planning", "repair"]:
-            return self.get_orchestrator_models()[0]
+            return self.get_orchestrator_models()
         elif task_type == "code_generation":
-            return self.get_codegen_models()[0]
-        return self.get_orchestrator_models()[1]
-
-    async def generate(self, prompt: str, model: str) -> str:
-        print(f"--- LLM Call (mock) ---")
-        print(f"Model: {model}")
-        print(f"Prompt: {prompt[:100]}...")
-        return f"Generated content for prompt: {prompt[:50]}..."
\ No newline at end of file
+            return self.get_codegen_models()
+        return list(reversed(self.get_orchestrator_models()))
+
+    def select_model_for_task(self, task_type: str) -> str:
+        return self.router.choose(self.candidates_for_task(task_type))
+
+    def provider_for_model(self, model: str) -> ModelProvider:
+        if model in self.get_orchestrator_models():
+            return ModelProvider.OLLAMA
+        return self.provider
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=httpx.Timeout(10.0, read=120.0))
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def generate(
+        self,
+        prompt: str,
+        model: str,
+        use_cache: bool = True,
+        on_partial: Callable[[str], Awaitable[None]] | None = None,
+        **params,
+    ) -> str:
+        """Completes prompt with model, from the cache when possible.
+
+        With on_partial, the completion is streamed and on_partial receives
+        the text so far, batched to a few updates per second.
+        """
+        key = cache_key(prompt, model, params)
+        if use_cache:
+            start = time.monotonic()
+            cached = self.cache.get(key)
+            if cached is not None:
+                self.metrics.record(
+                    model,
+                    self.provider_for_model(model).value,
+                    estimate_tokens(prompt),
+                    estimate_tokens(cached),
+                    time.monotonic() - start,
+                    cache_hit=True,
+                )
+                return cached
+        if on_partial is None:
+            response = await self._timed_complete(prompt, model, params)
+        else:
+            response = ""
+            async for text in batch_stream(
+                self.generate_stream(prompt, model, **params)
+            ):
+                response += text
+                await on_partial(response)
+        if use_cache:
+            self.cache.set(key, model, response)
+        return response
+
+    async def generate_for_task(
+        self, prompt: str, task_type: str, hedge_after: float | None = None, **params
+    ) -> str:
+        """Generates with the fastest healthy model for task_type.
+
+        With hedge_after set, a second model is raced once the first has run
+        for that many seconds (or its own p95, if larger) or has failed.
+        """
+        models = self.router.rank(self.candidates_for_task(task_type))
+        with llm_context(task_type=task_type):
+            if hedge_after is None or len(models) < 2:
+                return await self.generate(prompt, models[0], **params)
+            delay = max(hedge_after, self.router.hedge_delay(models[0], hedge_after))
+            return await self.router.hedge(
+                lambda model: self.generate(prompt, model, **params), models, delay
+            )
+
+    async def _timed_complete(self, prompt: str, model: str, params: dict) -> str:
+        provider = self.provider_for_model(model).value
+        start = time.monotonic()
+        try:
+            response = await self._complete(prompt, model, params)
+        except Exception as e:
+            latency = time.monotonic() - start
+            self.router.record(model, latency, ok=False)
+            self.metrics.record(
+                model,
+                provider,
+                estimate_tokens(prompt),
+                0,
+                latency,
+                ok=False,
+                error=str(e),
+            )
+            raise
+        latency = time.monotonic() - start
+        completion_tokens = estimate_tokens(response)
+        self.router.record(model, latency, ok=True, tokens=completion_tokens)
+        self.metrics.record(
+            model, provider, estimate_tokens(prompt), completion_tokens, latency
+        )
+        return response
+
+    async def _complete(self, prompt: str, model: str, params: dict) -> str:
+        if self.provider_for_model(model) == ModelProvider.OLLAMA:
+            return await self.ollama.generate(model, prompt, **params)
+        response = await self._get_client().post(
+            f"{self.openrouter_base_url}/chat/completions",
+            json={
+                "model": model,
+                "messages": [{"role": "user", "content": prompt}],
+                **params,
+            },
+            headers={"Authorization": f"Bearer {self.api_key}"},
+        )
+        response.raise_for_status()
+        return response.json()["choices"][0]["message"].get("content") or ""
+
+    async def generate_stream(
+        self, prompt: str, model: str, schema: dict | None = None, **params
+    ) -> AsyncIterator[str]:
+        """Yields completion text deltas as the provider produces them.
+
+        With a JSON schema, the provider is asked to constrain decoding to it
+        (Ollama's format, OpenRouter's response_format).
+        """
+        provider = self.provider_for_model(model)
+        if provider == ModelProvider.OLLAMA:
+            stream = self._stream_ollama(prompt, model, params, schema)
+        else:
+            stream = self._stream_openrouter(prompt, model, params, schema)
+        start = time.monotonic()
+        first_token: float | None = None
+        completion = 0
+        error: str | None = None
+        cancelled = False
+        try:
+            async for delta in stream:
+                if delta:
+                    if first_token is None:
+                        first_token = time.monotonic() - start
+                    completion += len(delta)
+                    yield delta
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        except Exception as e:
+            error = str(e)
+            raise
+        finally:
+            # A consumer that stops reading early (GeneratorExit) still got a
+            # healthy stream, so only provider errors count against the model.
+            if not cancelled:
+                latency = time.monotonic() - start
+                self.router.record(
+                    model, latency, ok=error is None, tokens=completion // 4
+                )
+                self.metrics.record(
+                    model,
+                    provider.value,
+                    estimate_tokens(prompt),
+                    completion // 4,
+                    latency,
+                    first_token,
+                    ok=error is None,
+                    error=error,
+                )
+
+    async def _stream_openrouter(
+        self, prompt: str, model: str, params: dict, schema: dict | None = None
+    ) -> AsyncIterator[str]:
+        payload = {
+            "model": model,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": True,
+            **params,
+        }
+        if schema is not None:
+            payload["response_format"] = {
+                "type": "json_schema",
+                "json_schema": {"name": "output", "strict": False, "schema": schema},
+            }
+        headers = {"Authorization": f"Bearer {self.api_key}"}
+        async with self._get_client().stream(
+            "POST",
+            f"{self.openrouter_base_url}/chat/completions",
+            json=payload,
+            headers=headers,
+        ) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:") :].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                for choice in chunk.get("choices", []):
+                    yield (choice.get("delta") or {}).get("content") or ""
+
+    async def _stream_ollama(
+        self, prompt: str, model: str, params: dict, schema: dict | None = None
+    ) -> AsyncIterator[str]:
+        async for delta in self.ollama.stream(model, prompt, format=schema, **params):
+            yield delta
+
+    async def generate_structured(
+        self,
+        prompt: str,
+        schema: dict,
+        task_type: str,
+        check: Callable[[dict], list[SpecError]] | None = None,
+        max_rounds: int = 3,
+        on_section: Callable[[str, object, bool], Awaitable[None]] | None = None,
+        **params,
+    ) -> tuple[dict, StructuredReport]:
+        """Streams a JSON object matching schema, one section at a time.
+
+        Decoding is constrained to the schema where the provider supports it.
+        Each top-level section is validated as soon as it is closed in the
+        stream, and the rest of the stream keeps going past one that fails.
+        The next round re-prompts each failed section on its own, in
+        parallel; if the JSON itself breaks, the stream is abandoned there and
+        only the broken and not yet received sections are requested again.
+        An HTTP error in one request cancels the others and is raised.
+        check, if given, runs on the complete object and its errors send
+        their sections back for another round. on_section is called with
+        each section as it is validated, so callers can start on accepted
+        sections before the object is complete. Raises StructuredOutputError
+        after max_rounds.
+        """
+        if max_rounds < 1:
+            raise ValueError(f"max_rounds must be at least 1, got {max_rounds}")
+        model = self.router.rank(self.candidates_for_task(task_type))[0]
+        checks = {key: compile_schema(sub) for key, sub in schema["properties"].items()}
+        required = list(schema.get("required", schema["properties"]))
+        accepted: dict = {}
+        broken: dict[str, tuple[str, list[SpecError]]] = {}
+        report = StructuredReport(
+            model=model,
+            rounds=0,
+            requests=0,
+            aborted_streams=0,
+            reprompted_sections=[],
+            completion_chars=0,
+        )
+
+        async def attempt(request: str, request_schema: dict):
+            report["requests"] += 1
+            parser = SectionStream()
+            stream = self.generate_stream(
+                request, model, decoding_schema(request_schema), **params
+            )
+            try:
+                async with contextlib.aclosing(stream):
+                    async for delta in stream:
+                        report["completion_chars"] += len(delta)
+                        for key, value in parser.feed(delta):
+                            if key not in request_schema["properties"]:
+                                continue
+                            errors: list[SpecError] = []
+                            checks[key](value, f"$.{key}", errors)
+                            if errors:
+                                broken[key] = (minify_json(value), errors)
+                            else:
+                                accepted[key] = value
+                            if on_section is not None:
+                                await on_section(key, value, not errors)
+                        if parser.done:
+                            break
+                parser.close()
+            except JsonStreamError as e:
+                report["aborted_streams"] += 1
+                if e.section in request_schema["properties"]:
+                    error = SpecError(path=f"$.{e.section}", message=str(e))
+                    broken[e.section] = (e.text, [error])
+
+        requests = [(prompt, schema)]
+        with llm_context(task_type=task_type):
+            for _ in range(max_rounds):
+                report["rounds"] += 1
+                try:
+                    async with asyncio.TaskGroup() as group:
+                        for request in requests:
+                            group.create_task(attempt(*request))
+                except ExceptionGroup as failure:
+                    raise failure.exceptions[0] from None
+                missing = [k for k in required if k not in accepted and k not in broken]
+                if check is not None and not broken and not missing:
+                    for error in check(accepted):
+                        key = section_of(error["path"])
+                        if key not in accepted:
+                            raise StructuredOutputError(
+                                f"Cannot re-prompt {error['path']}", [error]
+                            )
+                        previous = minify_json(accepted[key])
+                        broken.setdefault(key, (previous, []))[1].append(error)
+                    for key in broken:
+                        accepted.pop(key, None)
+                if not broken and not missing:
+                    return accepted, report
+                requests = [
+                    (
+                        section_prompt(prompt, key, previous, errors),
+                        object_schema(schema, [key]),
+                    )
+                    for key, (previous, errors) in broken.items()
+                ]
+                if missing:
+                    requests.append(
+                        (
+                            continuation_prompt(prompt, list(accepted), missing),
+                            object_schema(schema, missing),
+                        )
+                    )
+                report["reprompted_sections"].extend(broken)
+                remaining = [error for _, errors in broken.values() for error in errors]
+                broken.clear()
+        remaining += [
+            SpecError(path=f"$.{key}", message="is missing") for key in missing
+        ]
+        raise StructuredOutputError(
+            f"{len(remaining)} errors remain after {max_rounds} rounds", remaining
+        )
+
+
+async def batch_stream(
+    stream: AsyncIterator[str], interval: float = 0.25, max_chars: int = 2048
+) -> AsyncIterator[str]:
+    """Coalesces token deltas into at most one update per interval.
+
+    The first delta is flushed immediately to keep time-to-first-output low.
+    Text still pending when the interval runs out is flushed on a timer, so
+    it shows up even if the model stalls before its next delta.
+    """
+    iterator = aiter(stream)
+    pending: list[str] = []
+    pending_chars = 0
+    last_flush: float | None = None
+    next_delta: asyncio.Future | None = None
+    try:
+        while True:
+            if next_delta is None:
+                next_delta = asyncio.ensure_future(anext(iterator))
+            timeout = None
+            if pending:
+                timeout = max(0.0, last_flush + interval - time.monotonic())
+            # wait() rather than wait_for(): a timeout must not cancel the
+            # pending read, which would close the provider stream.
+            done, _ = await asyncio.wait({next_delta}, timeout=timeout)
+            if done:
+                future, next_delta = next_delta, None
+                try:
+                    delta = future.result()
+                except StopAsyncIteration:
+                    break
+                pending.append(delta)
+                pending_chars += len(delta)
+            now = time.monotonic()
+            if pending and (
+                last_flush is None
+                or now - last_flush >= interval
+                or pending_chars >= max_chars
+            ):
+                yield "".join(pending)
+                pending = []
+                pending_chars = 0
+                last_flush = now
+    finally:
+        if next_delta is not None:
+            next_delta.cancel()
+    if pending:
+        yield "".join(pending)
@@ -0,0 +1,131 @@
+import datetime
+import json
+import os
+import sqlite3
+import threading
+
+from app.services.storage import data_path
+
+
+class LogStore:
+    """Append-only JSONL log per project with a SQLite index for paging.
+
+    The index keeps (seq, agent, severity, byte offset) so filtered pages are
+    read with seeks instead of scanning the whole file.
+    """
+
+    _shared: "LogStore | None" = None
+
+    def __init__(self, log_dir: str | None = None):
+        self.log_dir = log_dir or os.path.dirname(data_path("logs", "index.db"))
+        os.makedirs(self.log_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            os.path.join(self.log_dir, "index.db"), check_same_thread=False
+        )
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS log_index (
+                project_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                agent TEXT NOT NULL,
+                severity TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                PRIMARY KEY (project_id, seq)
+            );
+            CREATE INDEX IF NOT EXISTS idx_log_agent
+                ON log_index(project_id, agent, seq);
+            CREATE INDEX IF NOT EXISTS idx_log_severity
+                ON log_index(project_id, severity, seq);
+            """)
+
+    @classmethod
+    def shared(cls) -> "LogStore":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _path(self, project_id: str) -> str:
+        return os.path.join(self.log_dir, f"{project_id}.jsonl")
+
+    def append(
+        self,
+        project_id: str,
+        agent: str,
+        message: str,
+        details: dict | None = None,
+        severity: str = "info",
+    ) -> dict:
+        # BEGIN IMMEDIATE takes SQLite's write lock, so the sequence number
+        # and the file append are serialized across processes, not just
+        # across the threads sharing this connection.
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                cursor = self._conn.execute(
+                    "INSERT INTO log_index "
+                    "SELECT ?, COALESCE(MAX(seq), 0) + 1, ?, ?, 0, 0 "
+                    "FROM log_index WHERE project_id = ?",
+                    (project_id, agent, severity, project_id),
+                )
+                (seq,) = self._conn.execute(
+                    "SELECT seq FROM log_index WHERE rowid = ?", (cursor.lastrowid,)
+                ).fetchone()
+                entry = {
+                    "seq": seq,
+                    "agent": agent,
+                    "severity": severity,
+                    "timestamp": datetime.datetime.now().isoformat(),
+                    "message": message,
+                    "details": details,
+                }
+                line = (json.dumps(entry, separators=(",", ":")) + "\n").encode("utf-8")
+                with open(self._path(project_id), "ab") as f:
+                    offset = f.tell()
+                    f.write(line)
+                self._conn.execute(
+                    "UPDATE log_index SET offset = ?, length = ? "
+                    "WHERE project_id = ? AND seq = ?",
+                    (offset, len(line), project_id, seq),
+                )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return entry
+
+    def page(
+        self,
+        project_id: str,
+        before: int | None = None,
+        limit: int = 50,
+        agent: str | None = None,
+        severity: str | None = None,
+    ) -> tuple[list[dict], int | None]:
+        """Returns up to limit entries older than the before cursor, newest
+        first, plus the cursor for the next (older) page or None."""
+        query = "SELECT seq, offset, length FROM log_index WHERE project_id = ?"
+        args: list = [project_id]
+        if before is not None:
+            query += " AND seq < ?"
+            args.append(before)
+        if agent:
+            query += " AND agent = ?"
+            args.append(agent)
+        if severity:
+            query += " AND severity = ?"
+            args.append(severity)
+        query += " ORDER BY seq DESC LIMIT ?"
+        args.append(limit + 1)
+        with self._lock:
+            rows = self._conn.execute(query, args).fetchall()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        entries = []
+        if rows:
+            with open(self._path(project_id), "rb") as f:
+                for _, offset, length in rows:
+                    f.seek(offset)
+                    entries.append(json.loads(f.read(length)))
+        next_cursor = rows[-1][0] if has_more else None
+        return entries, next_cursor
@@ -0,0 +1,199 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Awaitable, Callable
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, math.ceil(pct / 100 * len(ordered)) - 1)
+    return ordered[rank]
+
+
+class ModelStats:
+    def __init__(self, window: int = 50, error_ttl: float = 300.0):
+        self.calls: deque[tuple[float, bool, float, float]] = deque(maxlen=window)
+        self.error_ttl = error_ttl
+        self.last_error_at: float | None = None
+        self.last_probe_at: float | None = None
+
+    def record(self, latency: float, ok: bool, tokens: int = 0):
+        tokens_per_sec = tokens / latency if ok and latency > 0 else 0.0
+        now = time.monotonic()
+        self.calls.append((latency, ok, tokens_per_sec, now))
+        if not ok:
+            self.last_error_at = now
+
+    @property
+    def samples(self) -> int:
+        return len(self.calls)
+
+    def latencies(self) -> list[float]:
+        return [latency for latency, ok, _, _ in self.calls if ok]
+
+    @property
+    def p50(self) -> float:
+        return percentile(self.latencies(), 50)
+
+    @property
+    def p95(self) -> float:
+        return percentile(self.latencies(), 95)
+
+    @property
+    def error_rate(self) -> float:
+        """Share of failed calls among those made in the last error_ttl seconds."""
+        cutoff = time.monotonic() - self.error_ttl
+        recent = [ok for _, ok, _, at in self.calls if at >= cutoff]
+        if not recent:
+            return 0.0
+        return sum(1 for ok in recent if not ok) / len(recent)
+
+    @property
+    def tokens_per_sec(self) -> float:
+        rates = [rate for _, ok, rate, _ in self.calls if ok]
+        return sum(rates) / len(rates) if rates else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "samples": self.samples,
+            "p50": round(self.p50, 3),
+            "p95": round(self.p95, 3),
+            "error_rate": round(self.error_rate, 3),
+            "tokens_per_sec": round(self.tokens_per_sec, 1),
+        }
+
+
+class ModelRouter:
+    """Ranks candidate models by observed latency and health.
+
+    Failures age out of a model's error rate after error_ttl seconds, and a
+    model that is unhealthy only because of its error rate is put first for
+    one probe call every probe_interval seconds, so it can prove it has
+    recovered before the old failures expire.
+    """
+
+    _shared: "ModelRouter | None" = None
+
+    def __init__(
+        self,
+        window: int = 50,
+        min_samples: int = 3,
+        max_error_rate: float = 0.5,
+        error_cooldown: float = 30.0,
+        error_ttl: float = 300.0,
+        probe_interval: float = 60.0,
+    ):
+        self.window = window
+        self.min_samples = min_samples
+        self.max_error_rate = max_error_rate
+        self.error_cooldown = error_cooldown
+        self.error_ttl = error_ttl
+        self.probe_interval = probe_interval
+        self.stats: dict[str, ModelStats] = {}
+
+    @classmethod
+    def shared(cls) -> "ModelRouter":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _stats_for(self, model: str) -> ModelStats:
+        if model not in self.stats:
+            self.stats[model] = ModelStats(self.window, self.error_ttl)
+        return self.stats[model]
+
+    def record(self, model: str, latency: float, ok: bool, tokens: int = 0):
+        self._stats_for(model).record(latency, ok, tokens)
+
+    def is_healthy(self, model: str) -> bool:
+        stats = self.stats.get(model)
+        if stats is None:
+            return True
+        if stats.error_rate > self.max_error_rate:
+            return False
+        if stats.last_error_at is not None and stats.calls and not stats.calls[-1][1]:
+            return time.monotonic() - stats.last_error_at > self.error_cooldown
+        return True
+
+    def _probe_due(self, model: str) -> bool:
+        stats = self.stats.get(model)
+        if stats is None or stats.error_rate <= self.max_error_rate:
+            return False
+        last = max(stats.last_error_at or 0.0, stats.last_probe_at or 0.0)
+        return time.monotonic() - last > self.probe_interval
+
+    def rank(self, candidates: list[str]) -> list[str]:
+        """Orders candidates healthy-first, then by p50 latency.
+
+        Models without enough samples keep their configured order behind the
+        measured ones, so an unknown model never displaces a proven fast one.
+        An unhealthy model that is due a probe goes first, once per interval.
+        """
+
+        def key(item: tuple[int, str]):
+            index, model = item
+            stats = self.stats.get(model)
+            measured = stats is not None and stats.samples >= self.min_samples
+            return (
+                not self.is_healthy(model),
+                stats.p50 if measured else math.inf,
+                index,
+            )
+
+        ranked = [model for _, model in sorted(enumerate(candidates), key=key)]
+        probe = next((model for model in ranked if self._probe_due(model)), None)
+        if probe is not None:
+            self.stats[probe].last_probe_at = time.monotonic()
+            ranked.remove(probe)
+            ranked.insert(0, probe)
+        return ranked
+
+    def choose(self, candidates: list[str]) -> str:
+        return self.rank(candidates)[0]
+
+    def hedge_delay(self, model: str, default: float) -> float:
+        stats = self.stats.get(model)
+        if stats is None or stats.samples < self.min_samples:
+            return default
+        return stats.p95
+
+    async def hedge(
+        self,
+        call: Callable[[str], Awaitable[str]],
+        models: list[str],
+        hedge_after: float,
+    ) -> str:
+        """Runs call on models[0], adding models[1] if it is slower than
+        hedge_after or fails; returns the first successful result."""
+        pending: dict[asyncio.Task, str] = {
+            asyncio.ensure_future(call(models[0])): models[0]
+        }
+        backups = list(models[1:])
+        last_error: BaseException | None = None
+        try:
+            while pending:
+                timeout = hedge_after if backups else None
+                done, _ = await asyncio.wait(
+                    pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    pending.pop(task)
+                    if task.exception() is None:
+                        return task.result()
+                    last_error = task.exception()
+                if backups and (not done or not pending):
+                    model = backups.pop(0)
+                    pending[asyncio.ensure_future(call(model))] = model
+            raise last_error or RuntimeError("No models available")
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def snapshot(self) -> dict[str, dict]:
+        return {
+            model: {**stats.to_dict(), "healthy": self.is_healthy(model)}
+            for model, stats in self.stats.items()
+        }
@@ -0,0 +1,276 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import deque
+from typing import TYPE_CHECKING, AsyncIterator
+
+if TYPE_CHECKING:
+    import httpx
+
+OLLAMA_BASE_URL = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+DEFAULT_KEEP_ALIVE = "10m"
+# Both orchestrator models (spec extraction and repair) stay resident, so
+# alternating between them does not reload either.
+DEFAULT_MAX_LOADED_MODELS = 2
+
+logger = logging.getLogger(__name__)
+
+
+class ModelSlot:
+    """Per-model request queue and load bookkeeping."""
+
+    def __init__(self, concurrency: int):
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.waiting = 0
+        self.active = 0
+        self.loaded = False
+        self.last_used = 0.0
+        self.requests = 0
+        self.load_times: deque[float] = deque(maxlen=50)
+
+
+class OllamaClient:
+    """Pooled client for the local Ollama server with warm-model management.
+
+    Requests for the same model are queued behind a per-model semaphore.
+    At most max_loaded_models stay resident: loading another one first
+    unloads the least recently used idle model. Every request renews the
+    model's keep_alive, so Ollama itself drops models left idle longer.
+    """
+
+    _shared: "OllamaClient | None" = None
+
+    def __init__(
+        self,
+        base_url: str = OLLAMA_BASE_URL,
+        max_connections: int = 8,
+        per_model_concurrency: int = 1,
+        max_loaded_models: int = DEFAULT_MAX_LOADED_MODELS,
+        keep_alive: str = DEFAULT_KEEP_ALIVE,
+        idle_timeout: float = 600.0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.max_connections = max_connections
+        self.per_model_concurrency = per_model_concurrency
+        self.max_loaded_models = max(1, max_loaded_models)
+        self.keep_alive = keep_alive
+        self.idle_timeout = idle_timeout
+        self._slots: dict[str, ModelSlot] = {}
+        self._load_lock = asyncio.Lock()
+        self._client: httpx.AsyncClient | None = None
+
+    @classmethod
+    def shared(cls) -> "OllamaClient":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _get_client(self) -> "httpx.AsyncClient":
+        import httpx
+
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                    keepalive_expiry=60.0,
+                ),
+                timeout=httpx.Timeout(10.0, read=300.0),
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _slot(self, model: str) -> ModelSlot:
+        if model not in self._slots:
+            self._slots[model] = ModelSlot(self.per_model_concurrency)
+        return self._slots[model]
+
+    async def sync_loaded(self) -> list[str]:
+        """Marks models the server already has in memory as loaded."""
+        response = await self._get_client().get("/api/ps")
+        response.raise_for_status()
+        names = [m["name"] for m in response.json().get("models", [])]
+        for name in names:
+            slot = self._slot(name)
+            slot.loaded = True
+            slot.last_used = slot.last_used or time.monotonic()
+        return names
+
+    async def preload(self, model: str, keep_alive: str | None = None) -> float:
+        """Loads model into memory and returns the load time in seconds."""
+        async with self._load_lock:
+            return await self._load(model, keep_alive)
+
+    async def unload(self, model: str):
+        async with self._load_lock:
+            await self._unload(model)
+
+    async def _load(self, model: str, keep_alive: str | None = None) -> float:
+        slot = self._slot(model)
+        if slot.loaded:
+            return 0.0
+        self._evict(exclude=model)
+        resident = [m for m, s in self._slots.items() if s.loaded]
+        for name in self._eviction_order(resident)[
+            : max(0, len(resident) - self.max_loaded_models + 1)
+        ]:
+            await self._unload(name)
+        start = time.monotonic()
+        response = await self._get_client().post(
+            "/api/generate",
+            json={"model": model, "keep_alive": keep_alive or self.keep_alive},
+        )
+        response.raise_for_status()
+        load_time = time.monotonic() - start
+        slot.loaded = True
+        slot.last_used = time.monotonic()
+        slot.load_times.append(load_time)
+        return load_time
+
+    async def _unload(self, model: str):
+        slot = self._slot(model)
+        response = await self._get_client().post(
+            "/api/generate", json={"model": model, "keep_alive": 0}
+        )
+        response.raise_for_status()
+        slot.loaded = False
+
+    def _eviction_order(self, models: list[str]) -> list[str]:
+        idle = [m for m in models if not self._busy(m)]
+        return sorted(idle, key=lambda m: self._slots[m].last_used)
+
+    def _busy(self, model: str) -> bool:
+        slot = self._slots[model]
+        return slot.active > 0 or slot.waiting > 0
+
+    def _evict(self, exclude: str):
+        """Forgets models Ollama has dropped after their keep-alive ran out."""
+        now = time.monotonic()
+        for name, slot in self._slots.items():
+            if (
+                name != exclude
+                and slot.loaded
+                and not self._busy(name)
+                and now - slot.last_used > self.idle_timeout
+            ):
+                slot.loaded = False
+
+    async def _acquire(self, model: str) -> ModelSlot:
+        slot = self._slot(model)
+        slot.waiting += 1
+        try:
+            await slot.semaphore.acquire()
+        finally:
+            slot.waiting -= 1
+        slot.active += 1
+        try:
+            if not slot.loaded:
+                await self.preload(model)
+        except Exception:
+            self._release(slot)
+            raise
+        return slot
+
+    def _release(self, slot: ModelSlot):
+        slot.active -= 1
+        slot.requests += 1
+        slot.last_used = time.monotonic()
+        slot.semaphore.release()
+
+    def _payload(
+        self,
+        model: str,
+        prompt: str,
+        options: dict,
+        stream: bool,
+        format: dict | str | None = None,
+    ) -> dict:
+        payload = {
+            "model": model,
+            "prompt": prompt,
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+        }
+        if options:
+            payload["options"] = options
+        if format is not None:
+            payload["format"] = format
+        return payload
+
+    async def generate(self, model: str, prompt: str, **options) -> str:
+        slot = await self._acquire(model)
+        try:
+            response = await self._get_client().post(
+                "/api/generate", json=self._payload(model, prompt, options, False)
+            )
+            response.raise_for_status()
+            return response.json().get("response", "")
+        finally:
+            self._release(slot)
+
+    async def stream(
+        self, model: str, prompt: str, format: dict | str | None = None, **options
+    ) -> AsyncIterator[str]:
+        """Yields response deltas; format ("json" or a JSON schema) makes
+        Ollama constrain decoding to valid output."""
+        slot = await self._acquire(model)
+        try:
+            async with self._get_client().stream(
+                "POST",
+                "/api/generate",
+                json=self._payload(model, prompt, options, True, format),
+            ) as response:
+                response.raise_for_status()
+                async for line in response.aiter_lines():
+                    if not line.strip():
+                        continue
+                    chunk = json.loads(line)
+                    yield chunk.get("response", "")
+                    if chunk.get("done"):
+                        break
+        finally:
+            self._release(slot)
+
+    def stats(self) -> dict[str, dict]:
+        return {
+            model: {
+                "loaded": slot.loaded,
+                "queue_depth": slot.waiting,
+                "active": slot.active,
+                "requests": slot.requests,
+                "loads": len(slot.load_times),
+                "last_load_time": (
+                    round(slot.load_times[-1], 3) if slot.load_times else None
+                ),
+                "avg_load_time": (
+                    round(sum(slot.load_times) / len(slot.load_times), 3)
+                    if slot.load_times
+                    else None
+                ),
+            }
+            for model, slot in self._slots.items()
+        }
+
+
+async def warm_orchestrator_models():
+    """Lifespan task that preloads the orchestrator models at startup."""
+    import httpx
+
+    from app.services.llm_service import LLMService
+
+    client = OllamaClient.shared()
+    try:
+        await client.sync_loaded()
+        for model in LLMService("").get_orchestrator_models()[
+            : client.max_loaded_models
+        ]:
+            await client.preload(model)
+    except httpx.HTTPError as e:
+        logger.warning("Ollama warm-up skipped: %s", e)
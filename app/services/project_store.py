@@ -0,0 +1,113 @@
+import sqlite3
+import threading
+import uuid
+
+from app.services.storage import data_path
+
+PROJECT_COLUMNS = [
+    "id",
+    "name",
+    "description",
+    "brand_guidelines",
+    "shopify_domain",
+    "shopify_token",
+    "spec_json",
+    "status",
+    "created_at",
+]
+SUMMARY_COLUMNS = ["id", "name", "description", "status", "created_at"]
+
+
+class ProjectStore:
+    """SQLite-backed project storage so AppState only holds the visible page."""
+
+    _shared: "ProjectStore | None" = None
+
+    def __init__(self, db_path: str | None = None):
+        self.db_path = db_path or data_path("projects.db")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS projects (
+                id TEXT PRIMARY KEY,
+                name TEXT NOT NULL,
+                description TEXT NOT NULL,
+                brand_guidelines TEXT NOT NULL,
+                shopify_domain TEXT NOT NULL,
+                shopify_token TEXT NOT NULL,
+                spec_json TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_projects_status ON projects(status);
+            CREATE INDEX IF NOT EXISTS idx_projects_created_at
+                ON projects(created_at);
+            """)
+
+    @classmethod
+    def shared(cls) -> "ProjectStore":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    @staticmethod
+    def new_id() -> str:
+        return f"proj_{uuid.uuid4().hex[:12]}"
+
+    def create(self, project: dict):
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO projects ({', '.join(PROJECT_COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in PROJECT_COLUMNS)})",
+                [project[column] for column in PROJECT_COLUMNS],
+            )
+            self._conn.commit()
+
+    def get(self, project_id: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM projects WHERE id = ?", (project_id,)
+            ).fetchone()
+        return dict(row) if row is not None else None
+
+    def list_summaries(
+        self, offset: int = 0, limit: int = 12, status: str | None = None
+    ) -> list[dict]:
+        query = f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM projects"
+        args: list = []
+        if status:
+            query += " WHERE status = ?"
+            args.append(status)
+        query += " ORDER BY created_at DESC LIMIT ? OFFSET ?"
+        args += [limit, offset]
+        with self._lock:
+            rows = self._conn.execute(query, args).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self, status: str | None = None) -> int:
+        with self._lock:
+            if status:
+                row = self._conn.execute(
+                    "SELECT COUNT(*) FROM projects WHERE status = ?", (status,)
+                ).fetchone()
+            else:
+                row = self._conn.execute("SELECT COUNT(*) FROM projects").fetchone()
+        return row[0]
+
+    def update(self, project_id: str, **fields):
+        columns = [column for column in fields if column in PROJECT_COLUMNS[1:]]
+        if not columns:
+            return
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE projects SET {', '.join(f'{c} = ?' for c in columns)} "
+                "WHERE id = ?",
+                [fields[c] for c in columns] + [project_id],
+            )
+            self._conn.commit()
+
+    def delete(self, project_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+            self._conn.commit()
@@ -0,0 +1,187 @@
+import json
+import re
+
+from app.services.llm_metrics import estimate_tokens
+
+DEFAULT_TOKEN_BUDGET = 4000
+GUIDELINES_SHARE = 0.5
+
+SYSTEM_PREAMBLE = (
+    "You are generating a Shopify Hydrogen storefront (React Router, Vite, "
+    "TypeScript, Oxygen). Follow the project brief and brand guidelines below. "
+    "Return only the requested file's contents, with no commentary or fences."
+)
+
+SPEC_PREAMBLE = (
+    "You extract the store specification for a Shopify Hydrogen storefront "
+    "from a project brief and brand guidelines. Start from the draft below and "
+    "change only what the brief or guidelines call for."
+)
+
+
+def minify_json(value) -> str:
+    """Canonical JSON: sorted keys, no whitespace, so equal specs are equal text."""
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def _clean(text: str) -> str:
+    return re.sub(r"[ \t]+", " ", re.sub(r"\n\s*\n+", "\n", text or "")).strip()
+
+
+def fit_to_budget(text: str, max_tokens: int) -> str:
+    """Shrinks text to roughly max_tokens, keeping whole sentences in order.
+
+    Repeated sentences are dropped first; if that is not enough the tail is
+    cut at a sentence boundary and marked as truncated.
+    """
+    text = _clean(text)
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    sentences = re.split(r"(?<=[.!?])\s+|\n", text)
+    marker = " [truncated]"
+    limit = max_tokens - estimate_tokens(marker)
+    seen, kept, used, truncated = set(), [], 0, False
+    for sentence in sentences:
+        key = sentence.strip().lower()
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        cost = estimate_tokens(sentence) + 1
+        if used + cost > limit:
+            truncated = True
+            break
+        kept.append(sentence.strip())
+        used += cost
+    if not kept:
+        return text[: max(0, limit) * 4].rstrip() + marker
+    return " ".join(kept) + (marker if truncated else "")
+
+
+def fit_store_data(
+    store_data: dict, max_tokens: int, keep: list[str] | None = None
+) -> dict | None:
+    """Shrinks the live store's catalog facets to roughly max_tokens.
+
+    Lists are capped at a common length, so the longest lose the most, with
+    the values in keep (e.g. the spec's own collections) moved to the front
+    so they survive; how many values each list dropped goes under "omitted".
+    Returns None when not even the empty lists fit.
+    """
+    pinned = set(keep or [])
+    lists = {
+        key: [v for v in value if v in pinned] + [v for v in value if v not in pinned]
+        for key, value in store_data.items()
+        if isinstance(value, list)
+    }
+
+    def capped(limit: int) -> dict:
+        data = {
+            key: lists[key][:limit] if key in lists else value
+            for key, value in store_data.items()
+        }
+        omitted = {
+            key: len(value) - limit
+            for key, value in lists.items()
+            if len(value) > limit
+        }
+        if omitted:
+            data["omitted"] = omitted
+        return data
+
+    low, high = 0, max((len(value) for value in lists.values()), default=0)
+    if estimate_tokens(minify_json(capped(high))) <= max_tokens:
+        return capped(high)
+    if estimate_tokens(minify_json(capped(0))) > max_tokens:
+        return None
+    while high - low > 1:
+        middle = (low + high) // 2
+        if estimate_tokens(minify_json(capped(middle))) <= max_tokens:
+            low = middle
+        else:
+            high = middle
+    return capped(low)
+
+
+class PromptBuilder:
+    """Builds per-file prompts that share one byte-identical prefix.
+
+    The prefix (instructions, brief and brand guidelines) comes first and is
+    the same for every file in a project, so provider prompt caching and
+    Ollama's KV cache can reuse it; only the short per-file suffix varies.
+    """
+
+    def __init__(
+        self,
+        brief: str = "",
+        brand_guidelines: str = "",
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+    ):
+        self.token_budget = token_budget
+        brief = fit_to_budget(brief, int(token_budget * (1 - GUIDELINES_SHARE) / 2))
+        guidelines = fit_to_budget(
+            brand_guidelines, int(token_budget * GUIDELINES_SHARE)
+        )
+        parts = [SYSTEM_PREAMBLE]
+        if brief:
+            parts.append(f"Project brief:\n{brief}")
+        if guidelines:
+            parts.append(f"Brand guidelines:\n{guidelines}")
+        self.prefix = "\n\n".join(parts) + "\n\n"
+
+    @staticmethod
+    def _suffix(path: str, description: str, spec_slice: dict) -> str:
+        return (
+            f"File: {path}\nPurpose: {description}\n"
+            f"Spec: {minify_json(spec_slice)}\n"
+        )
+
+    def file_prompt(
+        self,
+        path: str,
+        description: str,
+        spec_slice: dict,
+        store_data: dict | None = None,
+    ) -> str:
+        """The prefix plus this file's suffix.
+
+        store_data goes into the spec as "storeData", trimmed to whatever the
+        budget leaves after the rest of the suffix, and is left out entirely
+        when nothing of it fits.
+        """
+        suffix = self._suffix(path, description, spec_slice)
+        remaining = self.token_budget - estimate_tokens(self.prefix)
+        if store_data:
+            room = remaining - estimate_tokens(suffix + ',"storeData":') - 1
+            collections = (spec_slice.get("catalog") or {}).get("collections")
+            fitted = fit_store_data(store_data, room, keep=collections)
+            if fitted is not None:
+                spec_slice = {**spec_slice, "storeData": fitted}
+                suffix = self._suffix(path, description, spec_slice)
+        if estimate_tokens(suffix) > remaining:
+            raise ValueError(
+                f"Prompt for {path} exceeds the {self.token_budget}-token budget; "
+                "narrow the spec sections it depends on"
+            )
+        return self.prefix + suffix
+
+
+def spec_prompt(
+    brief: str,
+    brand_guidelines: str,
+    draft: dict,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+) -> str:
+    """Prompt asking for the draft's sections as one JSON object, in order."""
+    parts = [SPEC_PREAMBLE]
+    brief = fit_to_budget(brief, int(token_budget * (1 - GUIDELINES_SHARE) / 2))
+    guidelines = fit_to_budget(brand_guidelines, int(token_budget * GUIDELINES_SHARE))
+    if brief:
+        parts.append(f"Project brief:\n{brief}")
+    if guidelines:
+        parts.append(f"Brand guidelines:\n{guidelines}")
+    parts.append(f"Draft: {json.dumps(draft, separators=(',', ':'))}")
+    parts.append(
+        f"Return only a JSON object with the keys {', '.join(draft)}, in that "
+        "order, with no commentary or fences."
+    )
+    return "\n\n".join(parts)
@@ -0,0 +1,401 @@
+import asyncio
+import os
+import re
+import time
+from typing import Awaitable, Callable, TypedDict
+
+from app.services.llm_metrics import estimate_tokens
+from app.services.llm_service import LLMService
+from app.services.prompt_builder import PromptBuilder
+from app.services.validation_service import ValidationService
+
+MAX_REPAIR_ITERATIONS = 3
+CONTEXT_LINES = 3
+# Files whose failing hunks cover more than this share of their lines are
+# regenerated whole instead of hunk by hunk.
+HUNK_SHARE = 0.5
+# Seconds (or the first model's p95, if larger) before a repair call is
+# raced against the next-ranked model.
+HEDGE_AFTER = 20.0
+FAILED_STATUSES = ("failure", "timeout")
+
+ESLINT_UNIX = re.compile(
+    r"^(?P<file>[^:\s][^:]*):(?P<line>\d+):(?P<column>\d+):\s*(?P<message>.+?)"
+    r"(?:\s+\[(?P<severity>Error|Warning)/(?P<rule>[^\]]+)\])?$"
+)
+TSC = re.compile(
+    r"^(?P<file>[^(\s]+)\((?P<line>\d+),(?P<column>\d+)\):\s*"
+    r"(?P<severity>error|warning)\s+(?P<rule>TS\d+):\s*(?P<message>.+)$"
+)
+TSC_PRETTY = re.compile(
+    r"^(?P<file>\S+):(?P<line>\d+):(?P<column>\d+)\s+-\s+"
+    r"(?P<severity>error|warning)\s+(?P<rule>TS\d+):\s*(?P<message>.+)$"
+)
+VITE_RESOLVE = re.compile(
+    r'(?P<message>[Ff]ailed to resolve import "[^"]+") from "(?P<file>[^"]+)"'
+)
+ESBUILD_ERROR = re.compile(r"\[ERROR\]\s*(?P<message>.+)$")
+ESBUILD_LOCATION = re.compile(r"^\s+(?P<file>\S+):(?P<line>\d+):(?P<column>\d+):\s*$")
+STACK_FRAME = re.compile(
+    r"(?:❯|\bat\b).*?(?P<file>[\w./$@-]+\.[jt]sx?):(?P<line>\d+):(?P<column>\d+)"
+)
+ERROR_MESSAGE = re.compile(
+    r"^\s*(?:\w*Error|AssertionError|FAIL)\b:?\s*(?P<message>.+)$"
+)
+FILE_MENTION = re.compile(
+    r"(?P<file>[\w./$@-]+\.(?:[jt]sx?|css|json))(?::(?P<line>\d+))?"
+)
+HUNK_HEADER = re.compile(r"^### Hunk (\d+)\b.*$", re.MULTILINE)
+FENCE = re.compile(r"^```[\w-]*\n(.*?)\n?```\s*$", re.DOTALL)
+
+
+class Diagnostic(TypedDict, total=False):
+    check: str
+    file: str
+    line: int | None
+    column: int | None
+    severity: str
+    rule: str | None
+    message: str
+
+
+class RepairIteration(TypedDict):
+    iteration: int
+    diagnostics: int
+    files: list[str]
+    hunks: int
+    repair_seconds: float
+    check_seconds: float
+    prompt_tokens: int
+    completion_tokens: int
+
+
+def _relative(path: str, project_path: str) -> str:
+    path = path.removeprefix("file://")
+    if os.path.isabs(path):
+        path = os.path.relpath(path, project_path)
+    return os.path.normpath(path).replace(os.sep, "/")
+
+
+def parse_diagnostics(
+    check: str, output: str, project_path: str, files: set[str]
+) -> list[Diagnostic]:
+    """Extracts file-level diagnostics from a check's output.
+
+    Understands eslint's unix format, tsc (plain and pretty), Vite/esbuild
+    build errors and vitest stack frames; any other error line mentioning a
+    generated file is kept without a line number. Only diagnostics for
+    files in `files` are returned, deduplicated.
+    """
+    found: dict[tuple, Diagnostic] = {}
+    pending_message: str | None = None
+
+    def add(file: str, line, column, message: str, severity="error", rule=None):
+        file = _relative(file, project_path)
+        if file not in files:
+            return
+        key = (file, line, message)
+        found.setdefault(
+            key,
+            Diagnostic(
+                check=check,
+                file=file,
+                line=int(line) if line else None,
+                column=int(column) if column else None,
+                severity=severity.lower(),
+                rule=rule,
+                message=message.strip(),
+            ),
+        )
+
+    for raw in output.splitlines():
+        line = raw.rstrip()
+        for pattern in (TSC, TSC_PRETTY, ESLINT_UNIX):
+            match = pattern.match(line)
+            if match:
+                fields = match.groupdict()
+                add(
+                    fields["file"],
+                    fields["line"],
+                    fields["column"],
+                    fields["message"],
+                    fields.get("severity") or "error",
+                    fields.get("rule"),
+                )
+                break
+        else:
+            if match := VITE_RESOLVE.search(line):
+                add(match["file"], None, None, match["message"])
+            elif match := ESBUILD_ERROR.search(line):
+                pending_message = match["message"]
+            elif (match := ESBUILD_LOCATION.match(line)) and pending_message:
+                add(match["file"], match["line"], match["column"], pending_message)
+                pending_message = None
+            elif match := STACK_FRAME.search(line):
+                add(
+                    match["file"],
+                    match["line"],
+                    match["column"],
+                    pending_message or f"{check} failed here",
+                )
+            elif match := ERROR_MESSAGE.match(line):
+                pending_message = match["message"]
+            elif "error" in line.lower():
+                for mention in FILE_MENTION.finditer(line):
+                    add(mention["file"], mention["line"], None, line.strip())
+    return list(found.values())
+
+
+def failing_checks(results: dict[str, dict]) -> list[str]:
+    return [
+        check
+        for check, result in results.items()
+        if result.get("status") in FAILED_STATUSES
+    ]
+
+
+def hunks_for(diagnostics: list[Diagnostic], line_count: int, context: int):
+    """Merged (start, end) line ranges, 1-based and inclusive, or None when
+    a diagnostic has no line and the whole file has to be rewritten."""
+    if any(d.get("line") is None for d in diagnostics):
+        return None
+    ranges = sorted(
+        (max(1, d["line"] - context), min(line_count, d["line"] + context))
+        for d in diagnostics
+    )
+    merged: list[list[int]] = []
+    for start, end in ranges:
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1][1] = max(merged[-1][1], end)
+        else:
+            merged.append([start, end])
+    return [tuple(r) for r in merged]
+
+
+def strip_fences(text: str) -> str:
+    match = FENCE.match(text.strip())
+    return match.group(1) if match else text
+
+
+def describe(diagnostics: list[Diagnostic]) -> str:
+    return "\n".join(
+        f"- [{d['check']}] line {d.get('line') or '?'}: {d['message']}"
+        + (f" ({d['rule']})" if d.get("rule") else "")
+        for d in diagnostics
+    )
+
+
+class RepairEngine:
+    """Verifier → Coder loop that fixes only what the checks point at.
+
+    Check output is parsed into per-file diagnostics; each failing file gets
+    one prompt carrying all of its diagnostics, asking for just the affected
+    hunks when they are small, or the whole file otherwise. The loop stops
+    when the checks pass, after max_iterations, or as soon as a round fails
+    to reduce the number of diagnostics.
+    """
+
+    def __init__(
+        self,
+        llm: LLMService,
+        prompts: PromptBuilder,
+        validator: ValidationService | None = None,
+        max_iterations: int = MAX_REPAIR_ITERATIONS,
+        context_lines: int = CONTEXT_LINES,
+        hunk_share: float = HUNK_SHARE,
+        max_concurrency: int = 4,
+        hedge_after: float | None = HEDGE_AFTER,
+    ):
+        self.llm = llm
+        self.prompts = prompts
+        self.validator = validator or ValidationService()
+        self.max_iterations = max_iterations
+        self.context_lines = context_lines
+        self.hunk_share = hunk_share
+        self.max_concurrency = max_concurrency
+        self.hedge_after = hedge_after
+
+    def diagnose(
+        self, results: dict[str, dict], project_path: str, files: set[str]
+    ) -> list[Diagnostic]:
+        return [
+            diagnostic
+            for check in failing_checks(results)
+            for diagnostic in parse_diagnostics(
+                check, results[check].get("output", ""), project_path, files
+            )
+        ]
+
+    async def _complete(self, prompt: str, usage: dict) -> str:
+        response = await self.llm.generate_for_task(
+            prompt, "repair", hedge_after=self.hedge_after
+        )
+        usage["prompt_tokens"] += estimate_tokens(prompt)
+        usage["completion_tokens"] += estimate_tokens(response)
+        return strip_fences(response)
+
+    async def _repair_whole(
+        self, path: str, content: str, diagnostics: list[Diagnostic], usage: dict
+    ) -> str:
+        prompt = self.prompts.prefix + (
+            f"Repair file: {path}\nThese checks failed on it:\n"
+            f"{describe(diagnostics)}\n\nCurrent contents:\n{content}\n\n"
+            "Return the corrected file's full contents."
+        )
+        return await self._complete(prompt, usage)
+
+    async def _repair_hunks(
+        self,
+        path: str,
+        lines: list[str],
+        hunks: list[tuple[int, int]],
+        diagnostics: list[Diagnostic],
+        usage: dict,
+    ) -> list[str] | None:
+        sections = "\n".join(
+            f"### Hunk {index} (lines {start}-{end})\n{''.join(lines[start - 1:end])}"
+            for index, (start, end) in enumerate(hunks, 1)
+        )
+        prompt = self.prompts.prefix + (
+            f"Repair file: {path}\nThese checks failed on it:\n"
+            f"{describe(diagnostics)}\n\nOnly these parts of the file need to "
+            f"change:\n{sections}\n\nReturn every hunk in the same format: its "
+            "'### Hunk N' line followed by the corrected lines, and nothing else."
+        )
+        response = await self._complete(prompt, usage)
+        parts = HUNK_HEADER.split(response)
+        replacements = {
+            int(number): body.strip("\n")
+            for number, body in zip(parts[1::2], parts[2::2])
+        }
+        if set(replacements) != set(range(1, len(hunks) + 1)):
+            return None
+        patched = list(lines)
+        for index, (start, end) in reversed(list(enumerate(hunks, 1))):
+            body = strip_fences(replacements[index])
+            patched[start - 1 : end] = [f"{text}\n" for text in body.split("\n")]
+        return patched
+
+    async def repair_file(
+        self, path: str, content: str, diagnostics: list[Diagnostic], usage: dict
+    ) -> tuple[str, int]:
+        """Returns the repaired content and how many hunks were rewritten
+        (0 for a whole-file rewrite)."""
+        lines = content.splitlines(keepends=True)
+        if lines and not lines[-1].endswith("\n"):
+            lines[-1] += "\n"
+        hunks = hunks_for(diagnostics, len(lines), self.context_lines)
+        if hunks:
+            covered = sum(end - start + 1 for start, end in hunks)
+            if covered <= len(lines) * self.hunk_share:
+                patched = await self._repair_hunks(
+                    path, lines, hunks, diagnostics, usage
+                )
+                if patched is not None:
+                    text = "".join(patched)
+                    return (text if content.endswith("\n") else text[:-1]), len(hunks)
+        return await self._repair_whole(path, content, diagnostics, usage), 0
+
+    async def run(
+        self,
+        project_path: str,
+        files: dict[str, str],
+        results: dict[str, dict],
+        write: Callable[[str, dict[str, str]], None],
+        on_progress: Callable[[str, dict], Awaitable[None]] | None = None,
+    ) -> tuple[dict[str, str], dict[str, dict], dict]:
+        """Repairs until the checks pass or progress stops.
+
+        Returns the updated files, the latest check results and a report
+        with the stop reason, per-iteration timings and token counts, and
+        the diagnostics left over. If the loop stalls or runs out of
+        iterations, the files, workspace and results of the round with the
+        fewest diagnostics are restored, so a bad last round is not kept.
+        """
+        files = dict(files)
+        iterations: list[RepairIteration] = []
+        diagnostics = self.diagnose(results, project_path, set(files))
+        best = (0, dict(files), results, diagnostics)
+        previous: int | None = None
+        status = "passed"
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def report(message: str, details: dict):
+            if on_progress is not None:
+                await on_progress(message, details)
+
+        for iteration in range(1, self.max_iterations + 2):
+            if not failing_checks(results):
+                status = "passed"
+                break
+            if not diagnostics:
+                status = "unlocalized"
+                break
+            if previous is not None and len(diagnostics) >= previous:
+                status = "stalled"
+                break
+            if iteration > self.max_iterations:
+                status = "exhausted"
+                break
+            by_file: dict[str, list[Diagnostic]] = {}
+            for diagnostic in diagnostics:
+                by_file.setdefault(diagnostic["file"], []).append(diagnostic)
+            await report(
+                f"Repair iteration {iteration}: {len(diagnostics)} diagnostics "
+                f"in {len(by_file)} files.",
+                {"iteration": iteration, "files": sorted(by_file)},
+            )
+            usage = {"prompt_tokens": 0, "completion_tokens": 0}
+            start = time.monotonic()
+
+            async def repair(path: str) -> tuple[str, str, int]:
+                async with semaphore:
+                    content, hunks = await self.repair_file(
+                        path, files[path], by_file[path], usage
+                    )
+                return path, content, hunks
+
+            repaired = await asyncio.gather(*(repair(path) for path in by_file))
+            repair_seconds = time.monotonic() - start
+            changed = {path: content for path, content, _ in repaired}
+            files.update(changed)
+            write(project_path, files)
+            start = time.monotonic()
+            results = await self.validator.run_checks(project_path)
+            check_seconds = time.monotonic() - start
+            iterations.append(
+                RepairIteration(
+                    iteration=iteration,
+                    diagnostics=len(diagnostics),
+                    files=sorted(changed),
+                    hunks=sum(hunks for _, _, hunks in repaired),
+                    repair_seconds=round(repair_seconds, 3),
+                    check_seconds=round(check_seconds, 3),
+                    **usage,
+                )
+            )
+            previous = len(diagnostics)
+            diagnostics = self.diagnose(results, project_path, set(files))
+            if len(diagnostics) < len(best[3]):
+                best = (iteration, dict(files), results, diagnostics)
+        restored = None
+        if status in ("stalled", "exhausted") and len(diagnostics) > len(best[3]):
+            restored, files, results, diagnostics = best
+            write(project_path, files)
+            await report(
+                f"Repair {status}; restoring the files from "
+                + (f"iteration {restored}" if restored else "before repair")
+                + f" ({len(diagnostics)} diagnostics).",
+                {"restored_iteration": restored},
+            )
+        return (
+            files,
+            results,
+            {
+                "status": status,
+                "restored_iteration": restored,
+                "iterations": iterations,
+                "remaining": diagnostics[:20],
+                "remaining_count": len(diagnostics),
+            },
+        )
@@ -1,12 +1,227 @@
-import reflex as rx
+import asyncio
+import hashlib
+import random
+import time
+
+import httpx
+
+STOREFRONT_API_VERSION = "2025-07"
+
+STORE_METADATA_FIELDS = {
+    "shop": "shop { name description primaryDomain { url } "
+    "paymentSettings { currencyCode countryCode } }",
+    "localization": "localization { language { isoCode } "
+    "availableLanguages { isoCode } availableCountries { isoCode } }",
+    "collections": "collections(first: 250) { nodes { handle title } }",
+    "productTypes": "productTypes(first: 250) { nodes }",
+    "products": "products(first: 250) { nodes { vendor } }",
+}
+
+
+class ShopifyError(Exception):
+    pass
+
+
+class ThrottleBucket:
+    """Client-side view of Shopify's leaky-bucket query cost limit."""
+
+    def __init__(self):
+        self.available: float | None = None
+        self.restore_rate = 50.0
+        self.updated = time.monotonic()
+
+    def update(self, throttle_status: dict):
+        self.available = float(throttle_status.get("currentlyAvailable", 0))
+        self.restore_rate = float(throttle_status.get("restoreRate", 50.0)) or 50.0
+        self.updated = time.monotonic()
+
+    def delay_for(self, cost: float) -> float:
+        if self.available is None:
+            return 0.0
+        restored = (
+            self.available + (time.monotonic() - self.updated) * self.restore_rate
+        )
+        return max(0.0, (cost - restored) / self.restore_rate)
 
 
 class ShopifyService:
-    def validate_credentials(self, domain: str, token: str) -> bool:
+    """Async Storefront API client shared across projects.
+
+    One pooled connection set serves every store. Independent lookups are
+    combined into a single aliased query, store metadata is cached per
+    (domain, API version), and requests back off on Shopify throttling:
+    429/430 responses with Retry-After, THROTTLED errors, and the query
+    cost reported in extensions.cost.
+    """
+
+    _shared: "ShopifyService | None" = None
+
+    def __init__(
+        self,
+        api_version: str = STOREFRONT_API_VERSION,
+        max_connections: int = 8,
+        cache_ttl: float = 600.0,
+        max_retries: int = 4,
+        base_backoff: float = 1.0,
+    ):
+        self.api_version = api_version
+        self.max_connections = max_connections
+        self.cache_ttl = cache_ttl
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self._client: httpx.AsyncClient | None = None
+        self._metadata: dict[tuple[str, str, str], tuple[float, dict]] = {}
+        self._pending: dict[tuple[str, str, str], asyncio.Future] = {}
+        self._buckets: dict[str, ThrottleBucket] = {}
+
+    @classmethod
+    def shared(cls) -> "ShopifyService":
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections,
+                ),
+                timeout=httpx.Timeout(10.0, read=30.0),
+            )
+        return self._client
+
+    async def aclose(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def endpoint(self, domain: str, api_version: str | None = None) -> str:
+        host = domain.removeprefix("https://").removeprefix("http://").rstrip("/")
+        scheme = "http" if domain.startswith("http://") else "https"
+        return f"{scheme}://{host}/api/{api_version or self.api_version}/graphql.json"
+
+    async def query(
+        self,
+        domain: str,
+        token: str,
+        query: str,
+        variables: dict | None = None,
+        expected_cost: float = 1.0,
+    ) -> dict:
+        """Runs a Storefront GraphQL query and returns its data."""
+        bucket = self._buckets.setdefault(domain, ThrottleBucket())
+        for attempt in range(self.max_retries + 1):
+            delay = bucket.delay_for(expected_cost)
+            if delay:
+                await asyncio.sleep(delay)
+            response = await self._get_client().post(
+                self.endpoint(domain),
+                json={"query": query, "variables": variables or {}},
+                headers={"X-Shopify-Storefront-Access-Token": token},
+            )
+            if response.status_code in (429, 430):
+                if attempt == self.max_retries:
+                    response.raise_for_status()
+                await asyncio.sleep(self._backoff(attempt, response))
+                continue
+            response.raise_for_status()
+            body = response.json()
+            cost = (body.get("extensions") or {}).get("cost") or {}
+            if "throttleStatus" in cost:
+                bucket.update(cost["throttleStatus"])
+            errors = body.get("errors") or []
+            throttled = any(
+                (e.get("extensions") or {}).get("code") == "THROTTLED" for e in errors
+            )
+            if throttled and attempt < self.max_retries:
+                await asyncio.sleep(self._backoff(attempt, response))
+                continue
+            if errors:
+                raise ShopifyError("; ".join(e.get("message", str(e)) for e in errors))
+            return body.get("data") or {}
+        raise ShopifyError("Storefront API request kept being throttled")
+
+    def _backoff(self, attempt: int, response: httpx.Response) -> float:
+        header = response.headers.get("retry-after")
+        try:
+            delay = float(header) if header else self.base_backoff * 2**attempt
+        except ValueError:
+            delay = self.base_backoff * 2**attempt
+        return delay + random.uniform(0, delay / 4)
+
+    async def batch(self, domain: str, token: str, fields: dict[str, str]) -> dict:
+        """Fetches several root fields in one query, aliased by their keys."""
+        selection = " ".join(f"{alias}: {field}" for alias, field in fields.items())
+        return await self.query(
+            domain, token, f"query Batch {{ {selection} }}", expected_cost=len(fields)
+        )
+
+    async def get_store_metadata(self, domain: str, token: str) -> dict:
+        """Shop, localization and catalog facets, cached per store, token and
+        version, so a wrong token never reads what a valid one cached.
+
+        Concurrent callers for the same store share one in-flight request.
+        """
+        token_hash = hashlib.sha256(token.encode("utf-8")).hexdigest()
+        key = (domain, token_hash, self.api_version)
+        cached = self._metadata.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        if key in self._pending:
+            return await asyncio.shield(self._pending[key])
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            data = await self.batch(domain, token, STORE_METADATA_FIELDS)
+            metadata = {
+                "name": data["shop"]["name"],
+                "description": data["shop"].get("description") or "",
+                "url": (data["shop"].get("primaryDomain") or {}).get("url"),
+                "currency": data["shop"]["paymentSettings"]["currencyCode"],
+                "country": data["shop"]["paymentSettings"]["countryCode"],
+                "locales": [
+                    lang["isoCode"].lower()
+                    for lang in data["localization"]["availableLanguages"]
+                ],
+                "collections": [c["handle"] for c in data["collections"]["nodes"]],
+                "productTypes": sorted({t for t in data["productTypes"]["nodes"] if t}),
+                "vendors": sorted(
+                    {p["vendor"] for p in data["products"]["nodes"] if p["vendor"]}
+                ),
+            }
+            self._metadata[key] = (time.monotonic() + self.cache_ttl, metadata)
+            future.set_result(metadata)
+            return metadata
+        except BaseException as e:
+            future.set_exception(e)
+            future.exception()
+            raise
+        finally:
+            del self._pending[key]
+
+    def invalidate(self, domain: str):
+        for key in [k for k in self._metadata if k[0] == domain]:
+            del self._metadata[key]
+
+    async def validate_credentials(self, domain: str, token: str) -> bool:
+        try:
+            await self.query(domain, token, "{ shop { name } }")
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in (401, 403, 404):
+                return False
+            raise
+        except ShopifyError:
+            return False
         return True
 
-    def test_storefront_api(self, domain: str, token: str) -> bool:
+    async def test_storefront_api(self, domain: str, token: str) -> bool:
+        try:
+            await self.query(domain, token, "{ products(first: 1) { nodes { id } } }")
+        except (httpx.HTTPError, ShopifyError):
+            return False
         return True
 
-    def get_store_info(self, domain: str, token: str) -> dict:
-        return {"name": "Mock Store", "currency": "USD"}
\ No newline at end of file
+    async def get_store_info(self, domain: str, token: str) -> dict:
+        metadata = await self.get_store_metadata(domain, token)
+        return {"name": metadata["name"], "currency": metadata["currency"]}
@@ -0,0 +1,384 @@
+import re
+from typing import Callable, TypedDict
+
+Check = Callable[[object, str, list], None]
+
+HEX_COLOR = r"^#(?:[0-9a-fA-F]{3}){1,2}$"
+HOSTNAME = r"^(?=.{1,253}$)[a-z0-9](?:[a-z0-9-]*[a-z0-9])?(?:\.[a-z0-9](?:[a-z0-9-]*[a-z0-9])?)+$"
+LOCALE = r"^[a-z]{2,3}(?:-[A-Za-z]{2})?$"
+
+_FONT = {
+    "type": "object",
+    "required": ["font", "weight"],
+    "properties": {
+        "font": {"type": "string", "minLength": 1},
+        "weight": {"type": "integer", "minimum": 100, "maximum": 900},
+    },
+}
+
+# A JSON Schema subset: type, properties, required, additionalProperties,
+# items, enum, pattern, minLength, minimum, maximum, minItems, uniqueItems.
+STORE_SPEC_SCHEMA: dict = {
+    "type": "object",
+    "additionalProperties": False,
+    "required": [
+        "store",
+        "brand",
+        "nav",
+        "catalog",
+        "i18n",
+        "seo",
+        "features",
+        "a11y",
+        "analytics",
+        "environments",
+    ],
+    "properties": {
+        "store": {
+            "type": "object",
+            "required": ["domain", "storefrontApiVersion"],
+            "properties": {
+                "domain": {"type": "string", "pattern": HOSTNAME},
+                "storefrontApiVersion": {
+                    "type": "string",
+                    "pattern": r"^\d{4}-(01|04|07|10)$",
+                },
+            },
+        },
+        "brand": {
+            "type": "object",
+            "required": ["name", "colors", "typography"],
+            "properties": {
+                "name": {"type": "string", "minLength": 1},
+                "logo": {
+                    "type": "object",
+                    "required": ["src"],
+                    "properties": {
+                        "src": {"type": "string", "minLength": 1},
+                        "alt": {"type": "string"},
+                    },
+                },
+                "colors": {
+                    "type": "object",
+                    "required": ["primary", "bg"],
+                    "additionalProperties": {"type": "string", "pattern": HEX_COLOR},
+                },
+                "typography": {
+                    "type": "object",
+                    "required": ["heading", "body"],
+                    "properties": {"heading": _FONT, "body": _FONT},
+                },
+            },
+        },
+        "nav": {
+            "type": "array",
+            "minItems": 1,
+            "items": {
+                "type": "object",
+                "required": ["label", "href"],
+                "properties": {
+                    "label": {"type": "string", "minLength": 1},
+                    "href": {"type": "string", "pattern": r"^(/|https?://)"},
+                },
+            },
+        },
+        "catalog": {
+            "type": "object",
+            "required": ["collections", "pdp", "search"],
+            "properties": {
+                "collections": {
+                    "type": "array",
+                    "uniqueItems": True,
+                    "items": {"type": "string", "pattern": r"^[a-z0-9][a-z0-9-]*$"},
+                },
+                "pdp": {
+                    "type": "object",
+                    "properties": {
+                        "mediaGallery": {"type": "boolean"},
+                        "badges": {
+                            "type": "array",
+                            "uniqueItems": True,
+                            "items": {"enum": ["in_stock", "low_stock", "sale", "new"]},
+                        },
+                        "buybox": {
+                            "type": "object",
+                            "properties": {
+                                "quantitySelector": {"type": "boolean"},
+                                "variantPicker": {
+                                    "enum": ["dropdown", "buttons", "swatches"]
+                                },
+                            },
+                        },
+                    },
+                },
+                "search": {
+                    "type": "object",
+                    "properties": {
+                        "provider": {"enum": ["storefront", "predictive"]},
+                        "filters": {
+                            "type": "array",
+                            "uniqueItems": True,
+                            "items": {"type": "string", "minLength": 1},
+                        },
+                    },
+                },
+            },
+        },
+        "i18n": {
+            "type": "object",
+            "required": ["locales", "defaultLocale"],
+            "properties": {
+                "locales": {
+                    "type": "array",
+                    "minItems": 1,
+                    "uniqueItems": True,
+                    "items": {"type": "string", "pattern": LOCALE},
+                },
+                "defaultLocale": {"type": "string", "pattern": LOCALE},
+            },
+        },
+        "seo": {
+            "type": "object",
+            "required": ["titleTemplate"],
+            "properties": {
+                "titleTemplate": {"type": "string", "pattern": "%s"},
+                "metaDescription": {"type": "string"},
+            },
+        },
+        "features": {
+            "type": "object",
+            "additionalProperties": {"type": "boolean"},
+        },
+        "a11y": {
+            "type": "object",
+            "required": ["contrastMin"],
+            "properties": {
+                "contrastMin": {"type": "number", "minimum": 1, "maximum": 21},
+                "focusVisible": {"type": "boolean"},
+            },
+        },
+        "analytics": {
+            "type": "object",
+            "properties": {
+                "lighthouseBudget": {"type": "integer", "minimum": 0, "maximum": 100}
+            },
+        },
+        "environments": {
+            "type": "object",
+            "additionalProperties": {"type": "boolean"},
+        },
+    },
+}
+
+
+class SpecError(TypedDict):
+    path: str
+    message: str
+
+
+_TYPES: dict[str, tuple[type, ...]] = {
+    "object": (dict,),
+    "array": (list,),
+    "string": (str,),
+    "number": (int, float),
+    "integer": (int,),
+    "boolean": (bool,),
+}
+
+
+def _type_check(name: str) -> Callable[[object], bool]:
+    types = _TYPES[name]
+    if name in ("number", "integer"):
+        return lambda v: isinstance(v, types) and not isinstance(v, bool)
+    return lambda v: isinstance(v, types)
+
+
+def compile_schema(schema: dict) -> Check:
+    """Compiles a schema node into a checker that appends every violation
+    (with its JSON path) to an error list instead of stopping at the first."""
+    checks: list[Check] = []
+    type_name = schema.get("type")
+    is_type = _type_check(type_name) if type_name else None
+
+    if "enum" in schema:
+        allowed = list(schema["enum"])
+
+        def check_enum(value, path, errors):
+            if value not in allowed:
+                errors.append(SpecError(path=path, message=f"must be one of {allowed}"))
+
+        checks.append(check_enum)
+    if "pattern" in schema:
+        regex = re.compile(schema["pattern"])
+        pattern = schema["pattern"]
+
+        def check_pattern(value, path, errors):
+            if isinstance(value, str) and not regex.search(value):
+                errors.append(SpecError(path=path, message=f"must match {pattern}"))
+
+        checks.append(check_pattern)
+    if "minLength" in schema:
+        min_length = schema["minLength"]
+
+        def check_min_length(value, path, errors):
+            if isinstance(value, str) and len(value) < min_length:
+                errors.append(
+                    SpecError(
+                        path=path, message=f"must be at least {min_length} characters"
+                    )
+                )
+
+        checks.append(check_min_length)
+    for keyword, fails, text in (
+        ("minimum", lambda v, b: v < b, "must be >="),
+        ("maximum", lambda v, b: v > b, "must be <="),
+    ):
+        if keyword in schema:
+            bound = schema[keyword]
+
+            def check_bound(value, path, errors, bound=bound, fails=fails, text=text):
+                if isinstance(value, (int, float)) and fails(value, bound):
+                    errors.append(SpecError(path=path, message=f"{text} {bound}"))
+
+            checks.append(check_bound)
+    if type_name == "object":
+        properties = {
+            key: compile_schema(sub)
+            for key, sub in schema.get("properties", {}).items()
+        }
+        required = list(schema.get("required", []))
+        extra = schema.get("additionalProperties", True)
+        extra_check = compile_schema(extra) if isinstance(extra, dict) else None
+
+        def check_object(value, path, errors):
+            for key in required:
+                if key not in value:
+                    errors.append(
+                        SpecError(path=f"{path}.{key}", message="is required")
+                    )
+            for key, item in value.items():
+                child = properties.get(key)
+                if child is not None:
+                    child(item, f"{path}.{key}", errors)
+                elif extra_check is not None:
+                    extra_check(item, f"{path}.{key}", errors)
+                elif extra is False:
+                    errors.append(
+                        SpecError(path=f"{path}.{key}", message="is not allowed")
+                    )
+
+        checks.append(check_object)
+    if type_name == "array":
+        items = compile_schema(schema["items"]) if "items" in schema else None
+        min_items = schema.get("minItems", 0)
+        unique = schema.get("uniqueItems", False)
+
+        def check_array(value, path, errors):
+            if len(value) < min_items:
+                errors.append(
+                    SpecError(
+                        path=path, message=f"must have at least {min_items} items"
+                    )
+                )
+            if unique and len({repr(v) for v in value}) != len(value):
+                errors.append(SpecError(path=path, message="items must be unique"))
+            if items is not None:
+                for index, item in enumerate(value):
+                    items(item, f"{path}[{index}]", errors)
+
+        checks.append(check_array)
+
+    def check(value, path, errors):
+        if is_type is not None and not is_type(value):
+            errors.append(SpecError(path=path, message=f"must be of type {type_name}"))
+            return
+        for c in checks:
+            c(value, path, errors)
+
+    return check
+
+
+def relative_luminance(hex_color: str) -> float:
+    value = hex_color.lstrip("#")
+    if len(value) == 3:
+        value = "".join(c * 2 for c in value)
+    channels = []
+    for i in (0, 2, 4):
+        c = int(value[i : i + 2], 16) / 255
+        channels.append(c / 12.92 if c <= 0.04045 else ((c + 0.055) / 1.055) ** 2.4)
+    r, g, b = channels
+    return 0.2126 * r + 0.7152 * g + 0.0722 * b
+
+
+def contrast_ratio(foreground: str, background: str) -> float:
+    """WCAG 2.x contrast ratio between two hex colors (1.0 to 21.0)."""
+    lighter, darker = sorted(
+        (relative_luminance(foreground), relative_luminance(background)),
+        reverse=True,
+    )
+    return (lighter + 0.05) / (darker + 0.05)
+
+
+# (foreground, background) brand color pairs used for text.
+CONTRAST_PAIRS = [("primary", "bg"), ("primary", "surface")]
+_HEX = re.compile(HEX_COLOR)
+
+
+def _semantic_errors(spec: dict) -> list[SpecError]:
+    errors: list[SpecError] = []
+    colors = (spec.get("brand") or {}).get("colors") or {}
+    minimum = (spec.get("a11y") or {}).get("contrastMin")
+    if isinstance(minimum, (int, float)) and isinstance(colors, dict):
+        for fg, bg in CONTRAST_PAIRS:
+            a, b = colors.get(fg), colors.get(bg)
+            if not (isinstance(a, str) and isinstance(b, str)):
+                continue
+            if not (_HEX.match(a) and _HEX.match(b)):
+                continue
+            ratio = contrast_ratio(a, b)
+            if ratio < minimum:
+                errors.append(
+                    SpecError(
+                        path=f"$.brand.colors.{fg}",
+                        message=f"contrast {ratio:.2f}:1 against {bg} is below "
+                        f"a11y.contrastMin {minimum}",
+                    )
+                )
+    i18n = spec.get("i18n") or {}
+    locales = i18n.get("locales")
+    default = i18n.get("defaultLocale")
+    if isinstance(locales, list) and isinstance(default, str):
+        if default not in locales:
+            errors.append(
+                SpecError(
+                    path="$.i18n.defaultLocale", message="must be one of i18n.locales"
+                )
+            )
+    return errors
+
+
+_check_spec = compile_schema(STORE_SPEC_SCHEMA)
+
+
+def validate_spec(spec: object) -> list[SpecError]:
+    """Returns every structural and semantic error in the spec, in one pass."""
+    errors: list[SpecError] = []
+    _check_spec(spec, "$", errors)
+    if isinstance(spec, dict):
+        errors.extend(_semantic_errors(spec))
+    return errors
+
+
+def normalize_domain(value: str) -> str:
+    """A shop domain as typed ("https://Acme.myshopify.com/") as a bare hostname."""
+    domain = re.sub(r"^[a-z][a-z0-9+.-]*://", "", value.strip().lower())
+    return domain.split("/", 1)[0].split("?", 1)[0]
+
+
+def is_valid_domain(value: str) -> bool:
+    return re.match(HOSTNAME, value) is not None
+
+
+def format_errors(errors: list[SpecError]) -> str:
+    """Renders errors as a list suitable for feeding back into a re-prompt."""
+    return "\n".join(f"- {e['path']}: {e['message']}" for e in errors)
@@ -0,0 +1,35 @@
+import contextlib
+import json
+import os
+from collections.abc import Iterable
+
+DATA_DIR = os.getenv("HYDROGEN_AGENT_DATA_DIR", ".data")
+
+
+def data_path(*parts: str) -> str:
+    path = os.path.join(DATA_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+# Lists the files the app last wrote into a workspace, so a later write can
+# delete the ones a build no longer produces.
+WORKSPACE_INDEX = ".generated-files.json"
+
+
+def prune_workspace(workspace: str, paths: Iterable[str]):
+    """Deletes files the previous write listed but paths no longer has,
+    then records paths; files the app never wrote are left alone."""
+    index = os.path.join(workspace, WORKSPACE_INDEX)
+    try:
+        with open(index, encoding="utf-8") as f:
+            previous = json.load(f)
+    except FileNotFoundError:
+        previous = []
+    paths = sorted(paths)
+    for path in set(previous) - set(paths):
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(os.path.join(workspace, path))
+    os.makedirs(workspace, exist_ok=True)
+    with open(index, "w", encoding="utf-8") as f:
+        json.dump(paths, f)
@@ -0,0 +1,187 @@
+import json
+import re
+from typing import TypedDict
+
+from app.services.spec_schema import SpecError, format_errors
+
+# Keywords kept in schemas sent to providers for constrained decoding.
+# Patterns are dropped because grammar converters reject lookarounds;
+# they are still enforced when each section is validated.
+DECODING_KEYWORDS = {
+    "type",
+    "properties",
+    "required",
+    "additionalProperties",
+    "items",
+    "enum",
+    "minItems",
+    "minLength",
+    "minimum",
+    "maximum",
+}
+_KEY = re.compile(r'\s*"((?:[^"\\]|\\.)*)"')
+_CLOSERS = {"{": "}", "[": "]"}
+
+
+class JsonStreamError(ValueError):
+    """Raised when streamed JSON breaks inside a top-level section."""
+
+    def __init__(self, message: str, section: str | None, text: str = ""):
+        super().__init__(message)
+        self.section = section
+        self.text = text
+
+
+class StructuredOutputError(Exception):
+    """Raised when sections are still invalid after every re-prompt."""
+
+    def __init__(self, message: str, errors: list[SpecError]):
+        super().__init__(message)
+        self.errors = errors
+
+
+class StructuredReport(TypedDict):
+    model: str
+    rounds: int
+    requests: int
+    aborted_streams: int
+    reprompted_sections: list[str]
+    completion_chars: int
+
+
+def decoding_schema(schema):
+    """Schema restricted to what constrained decoders reliably support."""
+    if isinstance(schema, list):
+        return [decoding_schema(item) for item in schema]
+    if not isinstance(schema, dict):
+        return schema
+    result = {}
+    for key, value in schema.items():
+        if key not in DECODING_KEYWORDS:
+            continue
+        if key == "properties":
+            result[key] = {name: decoding_schema(sub) for name, sub in value.items()}
+        else:
+            result[key] = decoding_schema(value)
+    return result
+
+
+def object_schema(schema: dict, keys: list[str]) -> dict:
+    """An object schema with only the given top-level properties, all required."""
+    return {
+        "type": "object",
+        "additionalProperties": False,
+        "required": list(keys),
+        "properties": {key: schema["properties"][key] for key in keys},
+    }
+
+
+class SectionStream:
+    """Incremental parser for a streamed JSON object, one member at a time.
+
+    Text before the opening brace (prose, a code fence) is skipped. Each
+    top-level member is returned by feed() as soon as its value is closed,
+    so a section can be validated while later ones are still generating;
+    a section that cannot be parsed raises JsonStreamError right away.
+    """
+
+    def __init__(self):
+        self.started = False
+        self.done = False
+        self._member: list[str] = []
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def current_section(self) -> str | None:
+        """Key of the member being received, once its key is complete."""
+        match = _KEY.match("".join(self._member))
+        return json.loads(f'"{match.group(1)}"') if match else None
+
+    def _finish_member(self) -> tuple[str, object] | None:
+        text = "".join(self._member)
+        self._member = []
+        if not text.strip():
+            return None
+        try:
+            member = json.loads("{" + text + "}")
+        except json.JSONDecodeError as e:
+            match = _KEY.match(text)
+            raise JsonStreamError(
+                f"Invalid JSON: {e.msg}",
+                json.loads(f'"{match.group(1)}"') if match else None,
+                text,
+            ) from None
+        if len(member) != 1:
+            raise JsonStreamError("Expected one member", None, text)
+        return next(iter(member.items()))
+
+    def feed(self, text: str) -> list[tuple[str, object]]:
+        members = []
+        for char in text:
+            if self.done:
+                break
+            if not self.started:
+                if char == "{":
+                    self.started = True
+                continue
+            if self._in_string:
+                self._member.append(char)
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if not self._stack and char in ",}":
+                member = self._finish_member()
+                if member is not None:
+                    members.append(member)
+                self.done = char == "}"
+                continue
+            self._member.append(char)
+            if char == '"':
+                self._in_string = True
+            elif char in _CLOSERS:
+                self._stack.append(_CLOSERS[char])
+            elif char in "]}":
+                if not self._stack or self._stack.pop() != char:
+                    raise JsonStreamError(
+                        f"Unexpected {char!r}",
+                        self.current_section,
+                        "".join(self._member),
+                    )
+        return members
+
+    def close(self):
+        """Raises JsonStreamError if the object was never closed."""
+        if not self.done:
+            raise JsonStreamError(
+                "Output ended before the JSON object was closed",
+                self.current_section,
+                "".join(self._member),
+            )
+
+
+def section_of(path: str) -> str:
+    """Top-level key an error path such as "$.brand.colors.bg" points into."""
+    return re.split(r"[.\[]", path.removeprefix("$."), maxsplit=1)[0]
+
+
+def section_prompt(
+    prompt: str, key: str, previous: str, errors: list[SpecError]
+) -> str:
+    return (
+        f'{prompt}\n\nYour previous "{key}" section was invalid:\n'
+        f"{format_errors(errors)}\nPrevious output: {previous[:2000]}\n"
+        f'Return only a JSON object with the single key "{key}", corrected.'
+    )
+
+
+def continuation_prompt(prompt: str, done: list[str], missing: list[str]) -> str:
+    return (
+        f"{prompt}\n\nThese sections are already done: {', '.join(done) or 'none'}.\n"
+        f"Return only a JSON object with the keys {', '.join(missing)}."
+    )
@@ -0,0 +1,72 @@
+import re
+from typing import Callable
+
+from app.services.hydrogen_templates import HYDROGEN_TEMPLATES
+
+PLACEHOLDER = re.compile(r"\{\{\s*([A-Za-z_]\w*)\s*\}\}")
+
+
+class TemplateError(Exception):
+    pass
+
+
+class CompiledTemplate:
+    """A template split once into literal text and {{ name }} slots.
+
+    Only bare identifiers are slots, so GitHub Actions expressions such as
+    ${{ secrets.TOKEN }} pass through untouched.
+    """
+
+    def __init__(self, name: str, source: str):
+        self.name = name
+        self.parts: list[str] = []
+        self.slots: list[str] = []
+        last = 0
+        for match in PLACEHOLDER.finditer(source):
+            self.parts.append(source[last : match.start()])
+            self.slots.append(match.group(1))
+            last = match.end()
+        self.parts.append(source[last:])
+        self.variables = frozenset(self.slots)
+
+    def render(self, context: dict[str, str]) -> str:
+        missing = self.variables - context.keys()
+        if missing:
+            raise TemplateError(f"{self.name}: missing variables {sorted(missing)}")
+        out = [self.parts[0]]
+        for slot, literal in zip(self.slots, self.parts[1:]):
+            out.append(str(context[slot]))
+            out.append(literal)
+        return "".join(out)
+
+
+class TemplateEngine:
+    """Renders files that are pure functions of the store spec.
+
+    Every template is compiled when the engine is built, so rendering is a
+    join over precomputed parts.
+    """
+
+    _shared: "TemplateEngine | None" = None
+
+    def __init__(
+        self,
+        templates: dict[str, tuple[str, Callable[[dict], dict[str, str]]]],
+    ):
+        self._templates = {
+            path: (CompiledTemplate(path, source), context)
+            for path, (source, context) in templates.items()
+        }
+
+    @classmethod
+    def shared(cls) -> "TemplateEngine":
+        if cls._shared is None:
+            cls._shared = cls(HYDROGEN_TEMPLATES)
+        return cls._shared
+
+    def handles(self, path: str) -> bool:
+        return path in self._templates
+
+    def render(self, path: str, spec: dict) -> str:
+        template, context = self._templates[path]
+        return template.render(context(spec))
@@ -1,18 +1,358 @@
-import reflex as rx
+import asyncio
+import hashlib
+import json
+import os
+import re
+import shutil
+import signal
+import sqlite3
+import subprocess
+import threading
+import time
+from typing import Awaitable, Callable
+
+from app.services.storage import data_path
+
+CHECK_COMMANDS = {
+    "build": ["npm", "run", "build"],
+    "lint": ["npx", "--no", "--", "eslint", "--format", "unix"],
+    "test": ["npx", "--no", "--", "vitest", "run", "--passWithNoTests"],
+}
+INSTALL_COMMAND = ["npm", "install", "--no-audit", "--no-fund"]
+CHECK_TIMEOUTS = {"build": 300.0, "lint": 120.0, "test": 300.0, "install": 600.0}
+# Written into node_modules after an install, holding the manifest digest it
+# installed, so later runs only reinstall when package.json changes.
+INSTALL_STAMP = os.path.join("node_modules", ".install-digest")
+# Output meaning the check's tool or its config is missing rather than the
+# code being wrong; such runs are reported as skipped.
+MISSING_TOOLCHAIN = re.compile(
+    r"could not determine executable to run|canceled due to missing packages"
+    r"|command not found|couldn't find an eslint\.config|No ESLint configuration",
+    re.IGNORECASE,
+)
+LINT_EXTENSIONS = (".ts", ".tsx", ".js", ".jsx")
+# eslint exits 1 when it found problems and 2 when it could not lint at all
+# (crash, missing config); only the first two outcomes say anything about
+# the files.
+LINT_EXIT_CODES = (0, 1)
+# A problem line in eslint's unix format: path:line:column: message [...]
+LINT_PROBLEM = re.compile(r"^(?P<file>[^:\s][^:]*):\d+:\d+:\s")
+LINT_CONFIG_FILES = ("package.json", "tsconfig.json", "eslint.config.js", ".eslintrc")
+IGNORED_DIRS = {"node_modules", ".git", "dist", "build", ".cache", ".react-router"}
+# Failures can come from a flaky test or registry, so they are only reused
+# for a while; successes are kept until the tree changes.
+FAILURE_TTL = 600.0
+# Check output is forwarded to on_output in batches, and only its first
+# lines; results always carry the full output.
+OUTPUT_BATCH_SECONDS = 1.0
+MAX_FORWARDED_LINES = 200
+
+
+def tree_hashes(project_path: str) -> dict[str, str]:
+    hashes = {}
+    for root, dirs, files in os.walk(project_path):
+        dirs[:] = sorted(d for d in dirs if d not in IGNORED_DIRS)
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            with open(path, "rb") as f:
+                hashes[os.path.relpath(path, project_path)] = hashlib.sha256(
+                    f.read()
+                ).hexdigest()
+    return hashes
+
+
+def tree_digest(hashes: dict[str, str]) -> str:
+    return hashlib.sha256(
+        json.dumps(hashes, sort_keys=True).encode("utf-8")
+    ).hexdigest()
+
+
+def manifest_digest(project_path: str) -> str | None:
+    """Digest of package.json and its lockfile, or None without package.json."""
+    hashes = {}
+    for name in ("package.json", "package-lock.json"):
+        try:
+            with open(os.path.join(project_path, name), "rb") as f:
+                hashes[name] = hashlib.sha256(f.read()).hexdigest()
+        except FileNotFoundError:
+            continue
+    return tree_digest(hashes) if "package.json" in hashes else None
+
+
+def _read(path: str) -> str | None:
+    try:
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    except FileNotFoundError:
+        return None
+
+
+def _kill_group(process):
+    """Kills a check and everything it started (npm runs its tools as children)."""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+class ValidationCache:
+    def __init__(self, db_path: str | None = None, failure_ttl: float = FAILURE_TTL):
+        self.db_path = db_path or data_path("validation_cache.db")
+        self.failure_ttl = failure_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, "
+            "result TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM results WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        result = json.loads(row[0])
+        if (
+            result.get("status") != "success"
+            and time.time() - row[1] > self.failure_ttl
+        ):
+            return None
+        return result
+
+    def set(self, key: str, result: dict):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                (key, json.dumps(result), time.time()),
+            )
+            self._conn.commit()
 
 
 class ValidationService:
+    def __init__(
+        self,
+        cache: ValidationCache | None = None,
+        max_parallel: int | None = None,
+        timeouts: dict[str, float] | None = None,
+    ):
+        self._cache = cache
+        self.max_parallel = max_parallel or os.cpu_count() or 2
+        self.timeouts = {**CHECK_TIMEOUTS, **(timeouts or {})}
+
+    @property
+    def cache(self) -> ValidationCache:
+        if self._cache is None:
+            self._cache = ValidationCache()
+        return self._cache
+
+    def _run_sync(self, check: str, project_path: str) -> dict:
+        command = CHECK_COMMANDS[check]
+        if shutil.which(command[0]) is None:
+            return {"status": "skipped", "output": f"{command[0]} not found"}
+        with subprocess.Popen(
+            command,
+            cwd=project_path,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            start_new_session=True,
+        ) as process:
+            try:
+                stdout, stderr = process.communicate(timeout=self.timeouts[check])
+            except subprocess.TimeoutExpired:
+                _kill_group(process)
+                process.communicate()
+                return {"status": "timeout", "output": f"{check} timed out"}
+        return {
+            "status": "success" if process.returncode == 0 else "failure",
+            "output": stdout + stderr,
+        }
+
     def run_build_check(self, project_path: str) -> dict:
-        return {"status": "success", "output": "Build successful"}
+        return self._run_sync("build", project_path)
 
     def run_lint_check(self, project_path: str) -> dict:
-        return {"status": "success", "output": "No lint errors"}
+        return self._run_sync("lint", project_path)
 
     def run_test_check(self, project_path: str) -> dict:
-        return {"status": "success", "output": "All tests passed"}
+        return self._run_sync("test", project_path)
 
     def run_lighthouse_check(self, url: str) -> dict:
         return {"status": "success", "score": 95}
 
     def run_a11y_check(self, url: str) -> dict:
-        return {"status": "success", "issues": 0}
\ No newline at end of file
+        return {"status": "success", "issues": 0}
+
+    async def _run_command(
+        self,
+        check: str,
+        command: list[str],
+        project_path: str,
+        on_output: Callable[[str, str], Awaitable[None]] | None,
+    ) -> dict:
+        if shutil.which(command[0]) is None:
+            return {"status": "skipped", "output": f"{command[0]} not found"}
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            cwd=project_path,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.STDOUT,
+            start_new_session=True,
+        )
+        lines: list[str] = []
+
+        async def read_output():
+            pending: list[str] = []
+            flushed_at: float | None = None
+            async for raw in process.stdout:
+                lines.append(raw.decode("utf-8", errors="replace").rstrip("\n"))
+                if on_output is None or len(lines) > MAX_FORWARDED_LINES:
+                    continue
+                pending.append(lines[-1])
+                now = time.monotonic()
+                if flushed_at is None or now - flushed_at >= OUTPUT_BATCH_SECONDS:
+                    await on_output(check, "\n".join(pending))
+                    pending = []
+                    flushed_at = now
+            if on_output is not None and pending:
+                await on_output(check, "\n".join(pending))
+            if on_output is not None and len(lines) > MAX_FORWARDED_LINES:
+                await on_output(
+                    check, f"... {len(lines) - MAX_FORWARDED_LINES} more lines"
+                )
+
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(read_output(), process.wait()), self.timeouts[check]
+            )
+        except asyncio.TimeoutError:
+            _kill_group(process)
+            await process.wait()
+            lines.append(f"{check} timed out after {self.timeouts[check]}s")
+            return {"status": "timeout", "output": "\n".join(lines)}
+        except asyncio.CancelledError:
+            _kill_group(process)
+            await process.wait()
+            raise
+        return {
+            "status": "success" if process.returncode == 0 else "failure",
+            "output": "\n".join(lines),
+            "exit_code": process.returncode,
+        }
+
+    async def install_dependencies(
+        self,
+        project_path: str,
+        on_output: Callable[[str, str], Awaitable[None]] | None = None,
+    ) -> dict | None:
+        """Runs npm install unless the installed packages match package.json.
+
+        Returns None when dependencies are in place, or the failed install's
+        result.
+        """
+        digest = manifest_digest(project_path)
+        stamp = os.path.join(project_path, INSTALL_STAMP)
+        if digest is None or _read(stamp) == digest:
+            return None
+        result = await self._run_command(
+            "install", INSTALL_COMMAND, project_path, on_output
+        )
+        if result["status"] != "success":
+            return result
+        os.makedirs(os.path.dirname(stamp), exist_ok=True)
+        with open(stamp, "w", encoding="utf-8") as f:
+            f.write(manifest_digest(project_path) or "")
+        return None
+
+    async def _run_lint(
+        self,
+        project_path: str,
+        hashes: dict[str, str],
+        on_output: Callable[[str, str], Awaitable[None]] | None,
+    ) -> dict:
+        """Lints only files without a cached clean result for their content."""
+        config = tree_digest(
+            {p: h for p, h in hashes.items() if p.startswith(LINT_CONFIG_FILES)}
+        )
+        keys = {
+            path: f"lint:{config}:{path}:{digest}"
+            for path, digest in hashes.items()
+            if path.endswith(LINT_EXTENSIONS)
+        }
+        pending = [path for path, key in keys.items() if self.cache.get(key) is None]
+        if not pending:
+            return {"status": "success", "output": "", "linted_files": []}
+        result = await self._run_command(
+            "lint", CHECK_COMMANDS["lint"] + pending, project_path, on_output
+        )
+        if result.get("exit_code") in LINT_EXIT_CODES:
+            failing = {
+                os.path.relpath(os.path.join(project_path, match["file"]), project_path)
+                for line in result["output"].splitlines()
+                if (match := LINT_PROBLEM.match(line))
+            }
+            for path in pending:
+                if path not in failing:
+                    self.cache.set(keys[path], {"status": "success"})
+        return {**result, "linted_files": pending}
+
+    async def run_checks(
+        self,
+        project_path: str,
+        checks: list[str] | None = None,
+        on_output: Callable[[str, str], Awaitable[None]] | None = None,
+    ) -> dict[str, dict]:
+        """Runs independent checks concurrently, each in its own process.
+
+        Dependencies are installed first when package.json changed; if that
+        fails, or a check's tool or config is missing, the check is reported
+        as skipped rather than failed, since the code was never judged.
+        Build and test results are cached against a hash of the whole project
+        tree; lint results are cached per file, so a repair iteration only
+        re-runs what its changes can affect.
+        """
+        checks = checks or list(CHECK_COMMANDS)
+        install = await self.install_dependencies(project_path, on_output)
+        if install is not None:
+            output = f"Dependencies could not be installed:\n{install['output']}"
+            return {
+                check: {"status": "skipped", "output": output, "cached": False}
+                for check in checks
+            }
+        hashes = await asyncio.to_thread(tree_hashes, project_path)
+        digest = tree_digest(hashes)
+        semaphore = asyncio.Semaphore(self.max_parallel)
+
+        async def run(check: str) -> dict:
+            start = time.monotonic()
+            key = f"{check}:{digest}"
+            if check != "lint":
+                cached = self.cache.get(key)
+                if cached is not None:
+                    return {**cached, "cached": True, "duration": 0.0}
+            async with semaphore:
+                if check == "lint":
+                    result = await self._run_lint(project_path, hashes, on_output)
+                else:
+                    result = await self._run_command(
+                        check, CHECK_COMMANDS[check], project_path, on_output
+                    )
+            if result["status"] == "failure" and (
+                result.get("exit_code") == 127
+                or MISSING_TOOLCHAIN.search(result["output"])
+            ):
+                result = {**result, "status": "skipped"}
+            if check != "lint" and result["status"] in ("success", "failure"):
+                self.cache.set(key, result)
+            return {
+                **result,
+                "cached": False,
+                "duration": round(time.monotonic() - start, 3),
+            }
+
+        results = await asyncio.gather(*(run(check) for check in checks))
+        return dict(zip(checks, results))
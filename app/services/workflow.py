@@ -0,0 +1,634 @@
+import asyncio
+import json
+import os
+from collections.abc import Awaitable, Callable, Collection, Mapping
+
+from app.services.dataflow import DataflowExecutor
+from app.services.fair_scheduler import CHEAP, EXPENSIVE
+from app.services.job_runner import (
+    JobContext,
+    JobStatus,
+    NonRetryableError,
+    StageHandler,
+)
+from app.services.llm_metrics import MetricsRecorder, llm_context
+from app.services.log_store import LogStore
+from app.services.project_store import ProjectStore
+from app.services.spec_schema import (
+    STORE_SPEC_SCHEMA,
+    format_errors,
+    validate_spec,
+)
+from app.services.storage import data_path, prune_workspace
+from app.services.template_engine import TemplateEngine
+from app.services.workflow_stages import AgentType, WorkflowStage
+
+# Trailing characters of a streaming file shown in the activity panel.
+STREAM_PREVIEW_CHARS = 400
+
+STAGE_PROGRESS = {
+    WorkflowStage.EXTRACTING_SPEC.value: 10.0,
+    WorkflowStage.PLANNING_FILES.value: 25.0,
+    WorkflowStage.GENERATING_CODE.value: 40.0,
+    WorkflowStage.VALIDATING.value: 75.0,
+    WorkflowStage.READY_FOR_REVIEW.value: 100.0,
+}
+
+
+def _tracked(stage: WorkflowStage, handler: StageHandler) -> StageHandler:
+    async def run(ctx: JobContext) -> dict:
+        ProjectStore.shared().update(ctx.project_id, status=stage.value)
+        with llm_context(project_id=ctx.project_id, stage=stage.value):
+            outputs = await handler(ctx)
+        usage = MetricsRecorder.shared().summary(["stage"], project_id=ctx.project_id)
+        return {**outputs, "llm_usage": usage}
+
+    return run
+
+
+def finish_project(job: dict):
+    status = (
+        WorkflowStage.READY_FOR_REVIEW
+        if job["status"] == JobStatus.COMPLETED.value
+        else WorkflowStage.FAILED
+    )
+    ProjectStore.shared().update(job["project_id"], status=status.value)
+
+
+def incremental_seed(outputs: dict | None) -> dict:
+    """Seeds a rebuild job from the outputs of the project's last build."""
+    if not outputs or "artifact_revision" not in outputs:
+        return {}
+    return {
+        "previous_spec": outputs.get("store_spec"),
+        "previous_revision": outputs["artifact_revision"],
+    }
+
+
+def log_job_event(event: dict):
+    """Persists a job event to the project log and attaches the entry as
+    event["log"] for live views."""
+    severity = event.get("severity", "info")
+    message = event.get("message")
+    if event["status"] == JobStatus.COMPLETED.value:
+        message = "Workflow ready for review."
+    elif event["status"] == JobStatus.FAILED.value:
+        message, severity = f"Workflow failed: {message}", "error"
+    if not message:
+        return
+    event["log"] = LogStore.shared().append(
+        event["project_id"],
+        event.get("agent") or AgentType.ORCHESTRATOR.value,
+        message,
+        event.get("details"),
+        severity,
+    )
+
+
+# Spec sections taken from the project form as-is, never from the model.
+FIXED_SPEC_SECTIONS = ("store",)
+
+
+async def extract_from_brief(
+    ctx: JobContext,
+    draft: dict,
+    on_accept: Callable[[str, object], Awaitable[None]] | None = None,
+) -> dict:
+    """Has the orchestrator model fill in the spec from the brief and brand
+    guidelines, starting from the form's draft; returns the draft if that
+    fails. on_accept is called with each section as soon as it streams in
+    and validates, and again if a later round revises it."""
+    import httpx
+
+    from app.services.llm_service import LLMService
+    from app.services.prompt_builder import spec_prompt
+    from app.services.structured_output import StructuredOutputError, object_schema
+
+    fixed = {key: draft[key] for key in FIXED_SPEC_SECTIONS}
+    keys = [key for key in draft if key not in fixed]
+
+    async def on_section(key: str, value: object, ok: bool):
+        await ctx.report(
+            agent=AgentType.SPEC_EXTRACTOR.value,
+            details={"section": key, "valid": ok},
+        )
+        if ok and on_accept is not None:
+            await on_accept(key, value)
+
+    try:
+        extracted, report = await LLMService.shared().generate_structured(
+            spec_prompt(
+                ctx.outputs.get("brief", ""),
+                ctx.outputs.get("brand_guidelines", ""),
+                {key: draft[key] for key in keys},
+            ),
+            object_schema(STORE_SPEC_SCHEMA, keys),
+            "spec_extraction",
+            check=lambda value: validate_spec({**fixed, **value}),
+            on_section=on_section,
+            temperature=0,
+        )
+    except (httpx.HTTPError, StructuredOutputError) as e:
+        await ctx.report(
+            f"Could not extract the spec from the brief, using the draft: {e}",
+            agent=AgentType.SPEC_EXTRACTOR.value,
+            severity="warning",
+        )
+        return draft
+    spec = {key: extracted.get(key, fixed.get(key)) for key in draft}
+    ProjectStore.shared().update(
+        ctx.project_id, spec_json=json.dumps(spec, separators=(",", ":"))
+    )
+    await ctx.report(
+        f"Extracted the spec from the brief in {report['requests']} requests, "
+        f"re-prompting {len(report['reprompted_sections'])} sections.",
+        agent=AgentType.SPEC_EXTRACTOR.value,
+        details=report,
+    )
+    return spec
+
+
+async def check_spec(ctx: JobContext, spec: dict):
+    errors = validate_spec(spec)
+    if errors:
+        await ctx.report(
+            f"Store specification has {len(errors)} errors:\n{format_errors(errors)}",
+            agent=AgentType.SPEC_EXTRACTOR.value,
+            details={"errors": errors},
+            severity="error",
+        )
+        raise NonRetryableError(f"Store specification has {len(errors)} errors")
+
+
+async def extract_spec(ctx: JobContext) -> dict:
+    """Loads the project's spec. When the job asks for extraction from the
+    brief, the form's draft is passed on unchecked and plan_and_generate
+    extracts and validates it while generation is already running."""
+    await ctx.report(
+        "Extracting store specification.",
+        STAGE_PROGRESS[WorkflowStage.EXTRACTING_SPEC.value],
+        AgentType.SPEC_EXTRACTOR.value,
+    )
+    project = ProjectStore.shared().get(ctx.project_id)
+    if project is None:
+        raise ValueError(f"Project {ctx.project_id} not found")
+    spec = json.loads(project["spec_json"])
+    if not ctx.outputs.get("extract_spec"):
+        await check_spec(ctx, spec)
+    await ctx.report(
+        "Loaded store specification.",
+        agent=AgentType.SPEC_EXTRACTOR.value,
+        details={"spec_keys": list(spec.keys())},
+    )
+    return {
+        "store_spec": spec,
+        "brief": project["description"],
+        "brand_guidelines": project["brand_guidelines"],
+    }
+
+
+async def fetch_store_data(ctx: JobContext) -> dict | None:
+    """Catalog facets from the live store, or None without credentials."""
+    import httpx
+
+    from app.services.shopify_service import ShopifyError, ShopifyService
+
+    project = ProjectStore.shared().get(ctx.project_id)
+    if not project or not project["shopify_domain"] or not project["shopify_token"]:
+        return None
+    try:
+        metadata = await ShopifyService.shared().get_store_metadata(
+            project["shopify_domain"], project["shopify_token"]
+        )
+    except (httpx.HTTPError, ShopifyError) as e:
+        await ctx.report(
+            f"Could not load store data, planning from the spec only: {e}",
+            agent=AgentType.FILE_PLANNER.value,
+            severity="warning",
+        )
+        return None
+    return {
+        key: metadata[key]
+        for key in ("collections", "productTypes", "vendors", "currency")
+    }
+
+
+# Build pipelines still accepting spec revisions, by project id.
+LIVE_PIPELINES: dict[str, DataflowExecutor] = {}
+
+
+def spec_inputs(spec: dict, keys: Collection[str] | None = None) -> dict[str, object]:
+    """Dataflow inputs for a spec: one per dotted section a planned file
+    reads (the same slices slice_spec sends the model), so a revision only
+    reaches files whose own slice changed. With keys, only the sections
+    under those top-level keys; otherwise the whole spec rides along under
+    "spec", which only the pipeline's completion node reads."""
+    from app.services.file_planner import HYDROGEN_FILES, get_section
+
+    sections = {s for _, file_sections, _ in HYDROGEN_FILES for s in file_sections}
+    if keys is not None:
+        sections = {s for s in sections if s.split(".", 1)[0] in keys}
+    inputs = {f"spec:{s}": get_section(spec, s) for s in sorted(sections)}
+    return inputs if keys is not None else {"spec": spec, **inputs}
+
+
+def revise_spec(project_id: str, spec: dict) -> bool:
+    """Feeds an edited spec into the project's running build.
+
+    Only files reading a changed section are cancelled or redone. Returns
+    False when no build can take the revision, e.g. because it has moved
+    past code generation or is still extracting the spec from the brief.
+    """
+    executor = LIVE_PIPELINES.get(project_id)
+    if executor is None or executor.finished:
+        return False
+    for key, value in spec_inputs(spec).items():
+        executor.set_input(key, value)
+    return True
+
+
+async def plan_and_generate(ctx: JobContext) -> dict:
+    """Plans and generates files as a dataflow instead of two stages.
+
+    Each file starts as soon as the spec sections it reads (and, for catalog
+    files, the live store data) are available and the shared modules it
+    uses are done, so templated and non-catalog files are generated while
+    the Shopify lookup is still in flight. When the job extracts the spec
+    from the brief, sections are fed in as they stream out of the model, so
+    a file only waits for its own sections rather than the whole spec. Spec
+    revisions sent through revise_spec while the build runs redo only the
+    files they affect.
+    """
+    from app.services.codegen_scheduler import (
+        CodegenScheduler,
+        PlannedFile,
+        check_graph,
+        infer_dependencies,
+    )
+    from app.services.artifact_store import ArtifactStore
+    from app.services.component_library import ComponentLibrary
+    from app.services.file_planner import (
+        EXPLICIT_DEPENDENCIES,
+        HYDROGEN_FILES,
+        file_entries,
+        nest_sections,
+        plan_file,
+        slice_spec,
+        uses_store_data,
+    )
+    from app.services.prompt_builder import PromptBuilder
+
+    draft = ctx.outputs["store_spec"]
+    extracting = bool(ctx.outputs.get("extract_spec"))
+    entries = {path: (sections, desc) for path, sections, desc in HYDROGEN_FILES}
+    graph = infer_dependencies(
+        [
+            PlannedFile(
+                path=path,
+                depends_on=list(EXPLICIT_DEPENDENCIES.get(path, [])),
+                sections=sections,
+            )
+            for path, (sections, _) in entries.items()
+        ]
+    )
+    check_graph(graph)
+    prompts = PromptBuilder(
+        ctx.outputs.get("brief", ""), ctx.outputs.get("brand_guidelines", "")
+    )
+    store = ArtifactStore.shared()
+    previous_revision = ctx.outputs.get("previous_revision")
+    previous = {}
+    if store.manifest(ctx.project_id, previous_revision) is not None:
+        previous = store.files(ctx.project_id, previous_revision)
+    previous_spec = ctx.outputs.get("previous_spec")
+    planned_files: dict[str, dict] = {}
+    regenerated: set[str] = set()
+    library = ComponentLibrary.shared()
+    library_hits: set[str] = set()
+    scheduler = CodegenScheduler.shared()
+    start = STAGE_PROGRESS[WorkflowStage.GENERATING_CODE.value]
+    end = STAGE_PROGRESS[WorkflowStage.VALIDATING.value]
+
+    def build_node(path: str, sections: list[str], description: str):
+        async def run(values: dict) -> str | None:
+            current = nest_sections(
+                {
+                    key.removeprefix("spec:"): value
+                    for key, value in values.items()
+                    if key.startswith("spec:")
+                }
+            )
+            if path not in {entry[0] for entry in file_entries(current)}:
+                planned_files.pop(path, None)
+                return None
+            planned = plan_file(
+                path,
+                sections,
+                description,
+                current,
+                prompts,
+                values.get("store_data"),
+            )
+            planned_files[path] = planned
+            if (
+                path in previous
+                and previous_spec is not None
+                and slice_spec(previous_spec, sections) == slice_spec(current, sections)
+            ):
+                regenerated.discard(path)
+                return previous[path]
+            regenerated.add(path)
+            if "content" in planned:
+                return planned["content"]
+            reused = library.lookup(path, sections, current)
+            if reused is not None:
+                library_hits.add(path)
+                return reused
+            library_hits.discard(path)
+
+            async def on_partial(text: str):
+                await ctx.report(
+                    agent=AgentType.CODE_GENERATOR.value,
+                    details={
+                        "path": path,
+                        "streamed_chars": len(text),
+                        "preview": text[-STREAM_PREVIEW_CHARS:],
+                    },
+                )
+
+            return await scheduler.generate_file(planned, on_partial=on_partial)
+
+        return run
+
+    async def on_event(name: str, status: str):
+        if status == "started" or not name.startswith("file:"):
+            return
+        done = sum(
+            1
+            for node in executor.results.keys() | executor.errors.keys()
+            if node.startswith("file:")
+        )
+        path = name.removeprefix("file:")
+        await ctx.report(
+            f"{path}: {status}",
+            start + (end - start) * done / max(len(entries), 1),
+            AgentType.CODE_GENERATOR.value,
+            {"path": path, "status": status, "done": done, "total": len(entries)},
+        )
+
+    executor = DataflowExecutor(on_event=on_event)
+    for planned in graph:
+        path = planned["path"]
+        sections, description = entries[path]
+        inputs = [f"spec:{section}" for section in sections]
+        if uses_store_data(sections):
+            inputs.append("store_data")
+        executor.add_node(
+            f"file:{path}",
+            build_node(path, sections, description),
+            inputs,
+            [f"file:{dep}" for dep in planned["depends_on"]],
+        )
+
+    async def complete(values: dict) -> dict:
+        return values["spec"]
+
+    # Holds the run open until the final spec is in, so sections a later
+    # extraction round revises still reach the files that read them.
+    executor.add_node("spec", complete, ["spec"])
+    store_data: dict | None = None
+
+    async def load_store_data():
+        nonlocal store_data
+        try:
+            store_data = await fetch_store_data(ctx)
+        except Exception as e:
+            await ctx.report(
+                f"Could not load store data: {e}",
+                agent=AgentType.FILE_PLANNER.value,
+                severity="warning",
+            )
+        finally:
+            executor.set_input("store_data", store_data)
+
+    async def feed_spec():
+        spec = draft
+        if extracting:
+
+            async def on_accept(key: str, value: object):
+                for name, section in spec_inputs({key: value}, [key]).items():
+                    executor.set_input(name, section)
+
+            for name, value in spec_inputs(draft, FIXED_SPEC_SECTIONS).items():
+                executor.set_input(name, value)
+            spec = await extract_from_brief(ctx, draft, on_accept)
+            await check_spec(ctx, spec)
+        for name, value in spec_inputs(spec).items():
+            executor.set_input(name, value)
+        LIVE_PIPELINES[ctx.project_id] = executor
+
+    engine_files = sum(1 for path in entries if TemplateEngine.shared().handles(path))
+    await ctx.report(
+        f"Planned up to {len(entries)} files ({engine_files} rendered from "
+        "templates); generating each as soon as its inputs are ready.",
+        STAGE_PROGRESS[WorkflowStage.PLANNING_FILES.value],
+        AgentType.FILE_PLANNER.value,
+    )
+    try:
+        async with asyncio.TaskGroup() as group:
+            group.create_task(feed_spec())
+            group.create_task(load_store_data())
+            run = group.create_task(executor.run())
+    except ExceptionGroup as failure:
+        raise failure.exceptions[0] from None
+    finally:
+        LIVE_PIPELINES.pop(ctx.project_id, None)
+    results, errors = run.result()
+    if errors:
+        raise RuntimeError(
+            f"{len(errors)} of {len(executor.nodes)} files failed to generate: "
+            f"{sorted(name.removeprefix('file:') for name in errors)}"
+        )
+    spec = executor.inputs["spec"]
+    files = {
+        name.removeprefix("file:"): content
+        for name, content in results.items()
+        if name.startswith("file:") and content is not None
+    }
+    if store_data is not None:
+        missing = [
+            handle
+            for handle in spec["catalog"]["collections"]
+            if handle not in store_data["collections"]
+        ]
+        if missing:
+            await ctx.report(
+                f"Collections not found in the store: {', '.join(missing)}",
+                agent=AgentType.FILE_PLANNER.value,
+                severity="warning",
+            )
+    manifest = store.save_revision(
+        ctx.project_id,
+        files,
+        {"job_id": ctx.job_id, "stage": WorkflowStage.GENERATING_CODE.value},
+    )
+    return {
+        "store_spec": spec,
+        "extract_spec": False,
+        "store_data": store_data,
+        "planned_files": [planned_files[path] for path in entries if path in files],
+        "artifact_revision": manifest["revision"],
+        "regenerated_files": sorted(regenerated & files.keys()),
+        "library_hits": sorted(library_hits & files.keys()),
+        "pipeline": executor.stats,
+    }
+
+
+def write_workspace(project_path: str, files: Mapping[str, str]):
+    """Makes the workspace's generated files exactly files.
+
+    Unchanged files are left untouched, and files from the previous write
+    that are no longer generated are deleted; anything else in the
+    workspace (installed dependencies, lockfiles) is never touched.
+    """
+    for path, content in files.items():
+        target = os.path.join(project_path, path)
+        if os.path.exists(target):
+            with open(target, encoding="utf-8") as f:
+                if f.read() == content:
+                    continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, "w", encoding="utf-8") as f:
+            f.write(content)
+    prune_workspace(project_path, files)
+
+
+async def validate(ctx: JobContext) -> dict:
+    from app.services.artifact_store import ArtifactStore
+    from app.services.repair_engine import failing_checks
+    from app.services.validation_service import ValidationService
+
+    await ctx.report(
+        "Running build, lint and test checks.",
+        STAGE_PROGRESS[WorkflowStage.VALIDATING.value],
+        AgentType.VERIFIER.value,
+        {"changed_files": ctx.outputs.get("regenerated_files", [])},
+    )
+    project_path = data_path("projects", ctx.project_id, "workspace", "")
+    store = ArtifactStore.shared()
+    revision = ctx.outputs["artifact_revision"]
+    store.materialize(ctx.project_id, project_path, revision)
+
+    async def on_output(check: str, text: str):
+        await ctx.report(f"[{check}] {text}", agent=AgentType.VERIFIER.value)
+
+    validator = ValidationService()
+    results = await validator.run_checks(project_path, on_output=on_output)
+    await ctx.report(
+        "Checks finished.",
+        agent=AgentType.VERIFIER.value,
+        details={check: result["status"] for check, result in results.items()},
+    )
+    outputs = {"validation": results, "artifact_revision": revision}
+    if failing_checks(results):
+        files, results, report = await repair(
+            ctx,
+            validator,
+            project_path,
+            results,
+            store.files(ctx.project_id, revision),
+        )
+        revision = store.save_revision(
+            ctx.project_id,
+            files,
+            {"job_id": ctx.job_id, "stage": WorkflowStage.VALIDATING.value},
+        )["revision"]
+        outputs = {
+            "validation": results,
+            "artifact_revision": revision,
+            "repair": report,
+        }
+    if not failing_checks(results):
+        add_to_library(
+            {**ctx.outputs, **outputs}, store.files(ctx.project_id, revision)
+        )
+    return outputs
+
+
+async def repair(
+    ctx: JobContext,
+    validator,
+    project_path: str,
+    results: dict,
+    files: Mapping[str, str],
+) -> tuple[dict[str, str], dict, dict]:
+    from app.services.llm_service import LLMService
+    from app.services.prompt_builder import PromptBuilder
+    from app.services.repair_engine import RepairEngine
+
+    engine = RepairEngine(
+        LLMService.shared(),
+        PromptBuilder(
+            ctx.outputs.get("brief", ""), ctx.outputs.get("brand_guidelines", "")
+        ),
+        validator,
+    )
+
+    async def on_progress(message: str, details: dict):
+        await ctx.report(message, agent=AgentType.CODE_GENERATOR.value, details=details)
+
+    files, results, report = await engine.run(
+        project_path,
+        files,
+        results,
+        write_workspace,
+        on_progress,
+    )
+    await ctx.report(
+        f"Repair {report['status']} after {len(report['iterations'])} iterations; "
+        f"{report['remaining_count']} diagnostics remain.",
+        agent=AgentType.VERIFIER.value,
+        details={
+            "iterations": report["iterations"],
+            "checks": {check: result["status"] for check, result in results.items()},
+        },
+        severity="info" if report["status"] == "passed" else "warning",
+    )
+    return files, results, report
+
+
+def add_to_library(outputs: dict, generated: Mapping[str, str]):
+    """Stores freshly generated components that passed validation."""
+    from app.services.component_library import ComponentLibrary
+
+    library = ComponentLibrary.shared()
+    reused = set(outputs.get("library_hits", []))
+    for planned in outputs.get("planned_files", []):
+        path = planned["path"]
+        if (
+            "prompt" in planned
+            and path in outputs.get("regenerated_files", [])
+            and path not in reused
+            and path in generated
+        ):
+            library.record(
+                path, planned["sections"], outputs["store_spec"], generated[path]
+            )
+
+
+# Scheduler class of each stage: spec extraction is one short LLM call,
+# planning plus code generation and validation hold a slot for minutes.
+STAGE_CLASSES = {
+    WorkflowStage.EXTRACTING_SPEC.value: CHEAP,
+    WorkflowStage.GENERATING_CODE.value: EXPENSIVE,
+    WorkflowStage.VALIDATING.value: EXPENSIVE,
+}
+
+WORKFLOW_STAGES: list[tuple[str, StageHandler]] = [
+    (stage.value, _tracked(stage, handler))
+    for stage, handler in [
+        (WorkflowStage.EXTRACTING_SPEC, extract_spec),
+        (WorkflowStage.GENERATING_CODE, plan_and_generate),
+        (WorkflowStage.VALIDATING, validate),
+    ]
+]
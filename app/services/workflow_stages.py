@@ -0,0 +1,23 @@
+from enum import Enum
+
+
+class WorkflowStage(Enum):
+    DRAFT = "Draft"
+    EXTRACTING_SPEC = "Extracting Specification"
+    PLANNING_FILES = "Planning File Structure"
+    GENERATING_CODE = "Generating Code"
+    VALIDATING = "Validating Code"
+    READY_FOR_REVIEW = "Ready for Review"
+    APPROVED = "Approved"
+    DEPLOYING = "Deploying"
+    DEPLOYED = "Deployed"
+    FAILED = "Failed"
+
+
+class AgentType(Enum):
+    ORCHESTRATOR = "Orchestrator"
+    SPEC_EXTRACTOR = "Spec Extractor"
+    FILE_PLANNER = "File Planner"
+    CODE_GENERATOR = "Code Generator"
+    VERIFIER = "Verifier"
+    DEPLOYER = "Deployer"
@@ -1,54 +1,139 @@
 import reflex as rx
 from typing import TypedDict, Literal
-import datetime
-from enum import Enum
+import uuid
 
+from app.services.workflow_stages import AgentType, WorkflowStage
 
-class WorkflowStage(Enum):
-    DRAFT = "Draft"
-    EXTRACTING_SPEC = "Extracting Specification"
-    PLANNING_FILES = "Planning File Structure"
-    GENERATING_CODE = "Generating Code"
-    VALIDATING = "Validating Code"
-    READY_FOR_REVIEW = "Ready for Review"
-    APPROVED = "Approved"
-    DEPLOYING = "Deploying"
-    DEPLOYED = "Deployed"
-    FAILED = "Failed"
 
+class StreamPreview(TypedDict):
+    path: str
+    chars: int
+    text: str
 
-class AgentType(Enum):
-    ORCHESTRATOR = "Orchestrator"
-    SPEC_EXTRACTOR = "Spec Extractor"
-    FILE_PLANNER = "File Planner"
-    CODE_GENERATOR = "Code Generator"
-    VERIFIER = "Verifier"
-    DEPLOYER = "Deployer"
+
+class ModelHealth(TypedDict):
+    model: str
+    samples: int
+    p50: float
+    p95: float
+    error_rate: float
+    tokens_per_sec: float
+    healthy: bool
+
+
+class OllamaModelStats(TypedDict):
+    model: str
+    loaded: bool
+    queue_depth: int
+    active: int
+    requests: int
+    loads: int
+    last_load_time: float | None
+    avg_load_time: float | None
 
 
 class AgentLog(TypedDict):
+    seq: int
     agent: str
+    severity: str
     timestamp: str
     message: str
     details: dict | None
 
 
+LIVE_LOG_LIMIT = 50
+LOG_PAGE_SIZE = 50
+# How long the browser keeps the id its builds are scheduled under.
+TENANT_COOKIE_MAX_AGE = 365 * 24 * 3600
+
+
+# How each job output is mirrored into agent_outputs. Bulky values are
+# reduced to counts or statuses, and None drops the key entirely (the spec
+# and brief are already available from AppState on demand, and the rest is
+# only needed by later stages).
+OUTPUT_SUMMARIES = {
+    "store_spec": None,
+    "previous_spec": None,
+    "extract_spec": None,
+    "brief": None,
+    "brand_guidelines": None,
+    "store_data": None,
+    "pipeline": None,
+    "planned_files": len,
+    "regenerated_files": len,
+    "library_hits": len,
+    "llm_usage": lambda usage: {
+        "calls": sum(group["calls"] for group in usage),
+        "cost_usd": round(sum(group["cost_usd"] for group in usage), 6),
+    },
+    "validation": lambda results: {
+        check: result["status"] for check, result in results.items()
+    },
+    "repair": lambda report: {
+        key: value for key, value in report.items() if key != "remaining"
+    },
+}
+
+
+def summarize_outputs(outputs: dict) -> dict:
+    summary = {}
+    for key, value in outputs.items():
+        reduce = OUTPUT_SUMMARIES.get(key, lambda v: v)
+        if reduce is not None:
+            summary[key] = reduce(value)
+    return summary
+
+
 class AgentState(rx.State):
     current_project_id: str | None = None
     current_workflow_stage: WorkflowStage = WorkflowStage.DRAFT
     current_agent: AgentType | None = None
     workflow_progress: float = 0.0
+    queue_position: int | None = None
     agent_logs: list[AgentLog] = []
+    stream_previews: list[StreamPreview] = []
     agent_outputs: dict = {}
+    model_stats: list[ModelHealth] = []
+    ollama_stats: list[OllamaModelStats] = []
+    log_history: list[AgentLog] = []
+    log_cursor: int | None = None
+    log_has_newer: bool = False
+    # The before-cursor of each history page from the newest to the one shown.
+    _log_pages: list[int | None] = []
+    log_agent_filter: str = ""
+    log_severity_filter: str = ""
+    # The job whose events are being mirrored, so one job is never watched twice.
+    _watched_job: str | None = None
+    # Builds are scheduled fairly per tenant. The cookie is shared by every
+    # tab of a browser and survives reloads, unlike the per-tab client token.
+    tenant_id: str = rx.Cookie(
+        "", name="hydrogen_tenant", max_age=TENANT_COOKIE_MAX_AGE
+    )
+
+    def _push_log(self, entry: dict):
+        self.agent_logs.append(AgentLog(**entry))
+        if len(self.agent_logs) > LIVE_LOG_LIMIT:
+            self.agent_logs = self.agent_logs[-LIVE_LOG_LIMIT:]
 
-    def _add_log(self, agent: AgentType, message: str, details: dict | None = None):
-        log_entry = AgentLog(
-            agent=agent.value,
-            timestamp=datetime.datetime.now().isoformat(),
-            message=message,
-            details=details,
+    def _add_log(
+        self,
+        agent: AgentType,
+        message: str,
+        details: dict | None = None,
+        severity: str = "info",
+    ) -> int:
+        """Appends to the project's on-disk log and the live ring buffer."""
+        from app.services.log_store import LogStore
+
+        entry = LogStore.shared().append(
+            self.current_project_id or "unassigned",
+            agent.value,
+            message,
+            details,
+            severity,
         )
-        self.agent_logs.append(log_entry)
+        self._push_log(entry)
+        return entry["seq"]
 
     @rx.event
     def start_spec_extraction(self, project_id: str):
@@ -74,10 +159,225 @@ class AgentState(rx.State):
         )
         self._add_log(AgentType.ORCHESTRATOR, "Proceeding to file structure planning.")
 
+    def _update_preview(self, details: dict):
+        """Shows the tail of a file's completion while it streams."""
+        preview = StreamPreview(
+            path=details["path"],
+            chars=details["streamed_chars"],
+            text=details["preview"],
+        )
+        for index, current in enumerate(self.stream_previews):
+            if current["path"] == preview["path"]:
+                self.stream_previews[index] = preview
+                return
+        self.stream_previews.append(preview)
+
+    def _apply_job_event(self, event: dict):
+        if event.get("stage"):
+            self.current_workflow_stage = WorkflowStage(event["stage"])
+        if event.get("agent"):
+            self.current_agent = AgentType(event["agent"])
+        if event.get("progress") is not None:
+            self.workflow_progress = event["progress"]
+        if event.get("outputs"):
+            self.agent_outputs.update(summarize_outputs(event["outputs"]))
+        details = event.get("details") or {}
+        self.queue_position = details.get("queue_position")
+        if "preview" in details:
+            self._update_preview(details)
+        elif "path" in details and "status" in details:
+            self.agent_outputs.setdefault("file_progress", {})[details["path"]] = (
+                details["status"]
+            )
+            self.stream_previews = [
+                p for p in self.stream_previews if p["path"] != details["path"]
+            ]
+        if event["status"] in ("completed", "failed"):
+            self.stream_previews = []
+        if event["status"] == "completed":
+            self.current_workflow_stage = WorkflowStage.READY_FOR_REVIEW
+            self.current_agent = None
+            self.workflow_progress = 100.0
+        elif event["status"] == "failed":
+            self.current_workflow_stage = WorkflowStage.FAILED
+        if event.get("log"):
+            self._push_log(event["log"])
+
+    @rx.event(background=True)
+    async def run_workflow(self, project_id: str, incremental: bool = False):
+        """Queues the project workflow on the job runner and mirrors its progress.
+
+        The workflow itself runs out of band, so closing the page or starting
+        another project does not interrupt it. Incremental runs only regenerate
+        files whose spec sections changed since the last completed build; if
+        a build is still running they wait for it rather than being folded
+        into it. Other runs first extract the spec from the project brief.
+        """
+        from app.services.fair_scheduler import AdmissionError
+        from app.services.job_runner import JobRunner
+        from app.services.workflow import incremental_seed
+
+        runner = JobRunner.shared()
+        async with self:
+            if not self.tenant_id:
+                self.tenant_id = uuid.uuid4().hex
+            tenant = self.tenant_id
+        try:
+            if not incremental:
+                job_id = runner.submit(project_id, {"extract_spec": True}, tenant)
+            else:
+                if runner.queue.active_job_for(project_id) is not None:
+                    yield rx.toast.info(
+                        "Spec saved; it will be rebuilt when the current build "
+                        "finishes."
+                    )
+                job_id = await runner.submit_when_idle(
+                    project_id,
+                    lambda: incremental_seed(runner.queue.latest_outputs(project_id)),
+                    tenant,
+                )
+        except AdmissionError as e:
+            async with self:
+                self.current_project_id = project_id
+                self._watched_job = None
+                self._add_log(AgentType.ORCHESTRATOR, str(e), severity="warning")
+            yield rx.toast.warning(str(e))
+            return
+        async with self:
+            self.current_project_id = project_id
+            self.current_workflow_stage = WorkflowStage.EXTRACTING_SPEC
+            self.current_agent = AgentType.ORCHESTRATOR
+            self.workflow_progress = 0.0
+            self.queue_position = None
+            self.agent_logs = []
+            self.stream_previews = []
+            self.agent_outputs = {}
+            self._watched_job = job_id
+            self._add_log(
+                AgentType.ORCHESTRATOR,
+                f"Queued workflow for project {project_id}.",
+                {"job_id": job_id},
+            )
+        await self._follow_job(job_id)
+
+    async def _follow_job(self, job_id: str):
+        """Mirrors the job's events until it ends or another job is shown."""
+        from app.services.job_runner import JobRunner
+
+        async for event in JobRunner.shared().watch(job_id):
+            async with self:
+                if self._watched_job != job_id:
+                    return
+                self._apply_job_event(event)
+
+    @rx.event(background=True)
+    async def follow_project(self, project_id: str):
+        """Points the agent panels at a project opened from the list: its
+        saved logs and last build's outputs, then the live progress of any
+        build still queued or running for it."""
+        from app.services.job_runner import JobRunner
+        from app.services.log_store import LogStore
+        from app.services.project_store import ProjectStore
+
+        runner = JobRunner.shared()
+        job_id = runner.queue.active_job_for(project_id)
+        async with self:
+            if self.current_project_id == project_id and (
+                job_id is not None and self._watched_job == job_id
+            ):
+                return
+            self._reset_view()
+            self.current_project_id = project_id
+            self._watched_job = job_id
+            entries, _ = LogStore.shared().page(project_id, limit=LIVE_LOG_LIMIT)
+            self.agent_logs = [AgentLog(**entry) for entry in reversed(entries)]
+            self._reload_log_history()
+            outputs = runner.queue.latest_outputs(project_id)
+            if outputs:
+                self.agent_outputs = summarize_outputs(outputs)
+            project = ProjectStore.shared().get(project_id)
+            if project is not None:
+                self.current_workflow_stage = WorkflowStage(project["status"])
+            job = runner.queue.get(job_id) if job_id is not None else None
+            if job is not None and job["stage"]:
+                self.current_workflow_stage = WorkflowStage(job["stage"])
+        if job_id is not None:
+            await self._follow_job(job_id)
+
+    @rx.event
+    def refresh_model_stats(self):
+        from app.services.model_router import ModelRouter
+        from app.services.ollama_client import OllamaClient
+
+        self.model_stats = [
+            ModelHealth(model=model, **stats)
+            for model, stats in ModelRouter.shared().snapshot().items()
+        ]
+        self.ollama_stats = [
+            OllamaModelStats(model=model, **stats)
+            for model, stats in OllamaClient.shared().stats().items()
+        ]
+
+    def _load_log_page(self, before: int | None):
+        """Shows one page of history, replacing the page shown before."""
+        from app.services.log_store import LogStore
+
+        if not self.current_project_id:
+            return
+        entries, self.log_cursor = LogStore.shared().page(
+            self.current_project_id,
+            before=before,
+            limit=LOG_PAGE_SIZE,
+            agent=self.log_agent_filter or None,
+            severity=self.log_severity_filter or None,
+        )
+        self.log_history = [AgentLog(**entry) for entry in entries]
+        self.log_has_newer = len(self._log_pages) > 1
+
+    def _reload_log_history(self):
+        self._log_pages = [None]
+        self._load_log_page(None)
+
+    @rx.event
+    def load_log_history(self):
+        self._reload_log_history()
+
+    @rx.event
+    def load_older_logs(self):
+        if self.log_cursor is not None:
+            self._log_pages.append(self.log_cursor)
+            self._load_log_page(self.log_cursor)
+
+    @rx.event
+    def load_newer_logs(self):
+        if len(self._log_pages) > 1:
+            self._log_pages.pop()
+            self._load_log_page(self._log_pages[-1])
+
+    @rx.event
+    def set_log_agent_filter(self, agent: str):
+        self.log_agent_filter = "" if agent == "All" else agent
+        self._reload_log_history()
+
+    @rx.event
+    def set_log_severity_filter(self, severity: str):
+        self.log_severity_filter = "" if severity == "All" else severity
+        self._reload_log_history()
+
     @rx.event
     def reset_workflow(self):
+        self._reset_view()
+
+    def _reset_view(self):
+        self._watched_job = None
         self.current_workflow_stage = WorkflowStage.DRAFT
         self.current_agent = None
         self.workflow_progress = 0.0
+        self.queue_position = None
         self.agent_logs = []
-        self.agent_outputs = {}
\ No newline at end of file
+        self.stream_previews = []
+        self.agent_outputs = {}
+        self.log_history = []
+        self.log_cursor = None
+        self.log_has_newer = False
+        self._log_pages = []
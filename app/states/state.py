@@ -1,6 +1,18 @@
 import reflex as rx
 from typing import TypedDict
 import datetime
+import hashlib
+import json
+
+from app.services.project_store import ProjectStore
+from app.services.spec_schema import (
+    format_errors,
+    is_valid_domain,
+    normalize_domain,
+    validate_spec,
+)
+
+PROJECTS_PAGE_SIZE = 12
 
 
 class Project(TypedDict):
@@ -15,87 +27,198 @@ class Project(TypedDict):
     created_at: str
 
 
+class ProjectSummary(TypedDict):
+    id: str
+    name: str
+    description: str
+    status: str
+    created_at: str
+
+
+class ProjectView(TypedDict):
+    """What the details page needs; never the token or the spec itself."""
+
+    id: str
+    name: str
+    description: str
+    brand_guidelines: str
+    shopify_domain: str
+    has_token: bool
+    status: str
+    created_at: str
+    spec_hash: str
+
+
+def spec_digest(spec_json: str) -> str:
+    return hashlib.sha256(spec_json.encode("utf-8")).hexdigest()[:16]
+
+
+def project_view(project: dict) -> ProjectView:
+    return ProjectView(
+        id=project["id"],
+        name=project["name"],
+        description=project["description"],
+        brand_guidelines=project["brand_guidelines"],
+        shopify_domain=project["shopify_domain"],
+        has_token=bool(project["shopify_token"]),
+        status=project["status"],
+        created_at=project["created_at"],
+        spec_hash=spec_digest(project["spec_json"]),
+    )
+
+
+def clean_project_form(form_data: dict) -> dict:
+    """Trimmed form values, with the shop domain reduced to a hostname."""
+    form = {
+        key: value.strip() if isinstance(value, str) else value
+        for key, value in form_data.items()
+    }
+    form["shopify_domain"] = normalize_domain(form.get("shopify_domain", ""))
+    return form
+
+
+def project_form_error(form: dict) -> str | None:
+    """Why a cleaned new-project form cannot produce a valid spec, if it can't."""
+    if not form.get("project_name"):
+        return "Project name is required."
+    if not is_valid_domain(form["shopify_domain"]):
+        return "Enter the shop domain as a hostname, e.g. your-store.myshopify.com."
+    return None
+
+
+def build_store_spec(form_data: dict) -> dict:
+    return {
+        "store": {
+            "domain": form_data.get("shopify_domain", ""),
+            "storefrontApiVersion": "2025-07",
+        },
+        "brand": {
+            "name": form_data.get("project_name", ""),
+            "logo": {
+                "src": "brand/logo.svg",
+                "alt": form_data.get("project_name", ""),
+            },
+            "colors": {
+                "primary": "#1E2A39",
+                "accent": "#97E3FF",
+                "bg": "#FFFFFF",
+                "surface": "#F7F9FB",
+            },
+            "typography": {
+                "heading": {"font": "Inter", "weight": 700},
+                "body": {"font": "Inter", "weight": 400},
+            },
+        },
+        "nav": [
+            {"label": "Home", "href": "/"},
+            {"label": "Shop", "href": "/collections/all"},
+            {"label": "About", "href": "/about"},
+            {"label": "Contact", "href": "/contact"},
+        ],
+        "catalog": {
+            "collections": ["all", "new", "sale"],
+            "pdp": {
+                "mediaGallery": True,
+                "badges": ["in_stock", "low_stock", "sale"],
+                "buybox": {"quantitySelector": True, "variantPicker": "dropdown"},
+            },
+            "search": {
+                "provider": "storefront",
+                "filters": ["price", "vendor", "productType"],
+            },
+        },
+        "i18n": {"locales": ["en"], "defaultLocale": "en"},
+        "seo": {
+            "titleTemplate": f"%s | {form_data.get('project_name', '')}",
+            "metaDescription": form_data.get("store_description", ""),
+        },
+        "features": {"markets": False, "b2b": False, "subscriptions": False},
+        "a11y": {"contrastMin": 4.5, "focusVisible": True},
+        "analytics": {"lighthouseBudget": 85},
+        "environments": {"preview": True, "production": True},
+    }
+
+
 class AppState(rx.State):
-    projects: list[Project] = []
+    projects: list[ProjectSummary] = []
+    projects_page: int = 0
+    projects_total: int = 0
     current_page: str = "Dashboard"
     current_project_id: str | None = None
+    current_project: ProjectView | None = None
+    spec_open: bool = False
+    spec_text: str = ""
+    spec_hash: str = ""
 
     @rx.var
-    def current_project(self) -> Project | None:
-        if not self.current_project_id:
-            return None
-        for project in self.projects:
-            if project["id"] == self.current_project_id:
-                return project
-        return None
+    def projects_page_count(self) -> int:
+        return max(1, -(-self.projects_total // PROJECTS_PAGE_SIZE))
+
+    def _load_projects_page(self):
+        store = ProjectStore.shared()
+        self.projects_total = store.count()
+        last_page = max(0, -(-self.projects_total // PROJECTS_PAGE_SIZE) - 1)
+        self.projects_page = min(self.projects_page, last_page)
+        self.projects = [
+            ProjectSummary(**summary)
+            for summary in store.list_summaries(
+                offset=self.projects_page * PROJECTS_PAGE_SIZE,
+                limit=PROJECTS_PAGE_SIZE,
+            )
+        ]
+
+    def _load_current_project(self):
+        project = None
+        if self.current_project_id:
+            project = ProjectStore.shared().get(self.current_project_id)
+        view = project_view(project) if project is not None else None
+        if view != self.current_project:
+            self.current_project = view
+        if project is not None and self.spec_open:
+            self._load_spec(project)
+
+    def _load_spec(self, project: dict):
+        """Sends the spec text only when its content hash differs from what
+        the client already holds."""
+        digest = spec_digest(project["spec_json"])
+        if digest != self.spec_hash:
+            self.spec_text = json.dumps(json.loads(project["spec_json"]), indent=2)
+            self.spec_hash = digest
+
+    @rx.event
+    def toggle_spec(self):
+        self.spec_open = not self.spec_open
+        if self.spec_open and self.current_project_id:
+            project = ProjectStore.shared().get(self.current_project_id)
+            if project is not None:
+                self._load_spec(project)
 
     @rx.event
     def set_current_page(self, page_name: str):
         self.current_page = page_name
         self.current_project_id = None
+        self.current_project = None
+        if page_name == "Projects":
+            self._load_projects_page()
 
     @rx.event
-    def view_project(self, project_id: str):
-        self.current_project_id = project_id
-        self.current_page = "Project Details"
+    def set_projects_page(self, page: int):
+        self.projects_page = max(0, page)
+        self._load_projects_page()
 
     @rx.event
-    async def add_project_and_start_spec_extraction(self, form_data: dict):
-        """Adds a new project and immediately triggers the spec extraction workflow."""
-        import json
+    def view_project(self, project_id: str):
         from app.states.agent_state import AgentState
 
-        project_id = f"proj_{len(self.projects) + 1}"
-        spec = {
-            "store": {
-                "domain": form_data.get("shopify_domain", ""),
-                "storefrontApiVersion": "2025-07",
-            },
-            "brand": {
-                "name": form_data.get("project_name", ""),
-                "logo": {
-                    "src": "brand/logo.svg",
-                    "alt": form_data.get("project_name", ""),
-                },
-                "colors": {
-                    "primary": "#1E2A39",
-                    "accent": "#97E3FF",
-                    "bg": "#FFFFFF",
-                    "surface": "#F7F9FB",
-                },
-                "typography": {
-                    "heading": {"font": "Inter", "weight": 700},
-                    "body": {"font": "Inter", "weight": 400},
-                },
-            },
-            "nav": [
-                {"label": "Home", "href": "/"},
-                {"label": "Shop", "href": "/collections/all"},
-                {"label": "About", "href": "/about"},
-                {"label": "Contact", "href": "/contact"},
-            ],
-            "catalog": {
-                "collections": ["all", "new", "sale"],
-                "pdp": {
-                    "mediaGallery": True,
-                    "badges": ["in_stock", "low_stock", "sale"],
-                    "buybox": {"quantitySelector": True, "variantPicker": "dropdown"},
-                },
-                "search": {
-                    "provider": "storefront",
-                    "filters": ["price", "vendor", "productType"],
-                },
-            },
-            "i18n": {"locales": ["en"], "defaultLocale": "en"},
-            "seo": {
-                "titleTemplate": f"%s | {form_data.get('project_name', '')}",
-                "metaDescription": form_data.get("store_description", ""),
-            },
-            "features": {"markets": False, "b2b": False, "subscriptions": False},
-            "a11y": {"contrastMin": 4.5, "focusVisible": True},
-            "analytics": {"lighthouseBudget": 85},
-            "environments": {"preview": True, "production": True},
-        }
+        self.current_project_id = project_id
+        self.current_page = "Project Details"
+        self._load_current_project()
+        return AgentState.follow_project(project_id)
+
+    def _create_project(self, form_data: dict) -> str:
+        """Stores a project from a form cleaned by clean_project_form."""
+        project_id = ProjectStore.new_id()
+        spec = build_store_spec(form_data)
         new_project = Project(
             id=project_id,
             name=form_data.get("project_name", ""),
@@ -103,81 +226,62 @@ class AppState(rx.State):
             brand_guidelines=form_data.get("brand_guidelines", ""),
             shopify_domain=form_data.get("shopify_domain", ""),
             shopify_token=form_data.get("shopify_token", ""),
-            spec_json=json.dumps(spec, indent=2),
+            spec_json=json.dumps(spec, separators=(",", ":")),
             status="Draft",
             created_at=datetime.datetime.now().isoformat(),
         )
-        self.projects.append(new_project)
+        ProjectStore.shared().create(new_project)
+        return project_id
+
+    @rx.event
+    def add_project_and_start_spec_extraction(self, form_data: dict):
+        """Adds a new project and immediately triggers the spec extraction workflow."""
+        from app.states.agent_state import AgentState
+
+        form_data = clean_project_form(form_data)
+        error = project_form_error(form_data)
+        if error:
+            yield rx.toast.error(error)
+            return
+        project_id = self._create_project(form_data)
         self.current_project_id = project_id
         self.current_page = "Project Details"
-        agent_state = await self.get_state(AgentState)
-        yield agent_state.start_spec_extraction(project_id)
+        self._load_current_project()
+        yield AgentState.run_workflow(project_id)
 
     @rx.event
-    def add_project(self, form_data: dict):
-        import json
+    def update_project_spec(self, form_data: dict):
+        """Saves an edited spec and rebuilds only the files it affects."""
+        from app.services.workflow import revise_spec
+        from app.states.agent_state import AgentState
 
-        project_id = f"proj_{len(self.projects) + 1}"
-        spec = {
-            "store": {
-                "domain": form_data.get("shopify_domain", ""),
-                "storefrontApiVersion": "2025-07",
-            },
-            "brand": {
-                "name": form_data.get("project_name", ""),
-                "logo": {
-                    "src": "brand/logo.svg",
-                    "alt": form_data.get("project_name", ""),
-                },
-                "colors": {
-                    "primary": "#1E2A39",
-                    "accent": "#97E3FF",
-                    "bg": "#FFFFFF",
-                    "surface": "#F7F9FB",
-                },
-                "typography": {
-                    "heading": {"font": "Inter", "weight": 700},
-                    "body": {"font": "Inter", "weight": 400},
-                },
-            },
-            "nav": [
-                {"label": "Home", "href": "/"},
-                {"label": "Shop", "href": "/collections/all"},
-                {"label": "About", "href": "/about"},
-                {"label": "Contact", "href": "/contact"},
-            ],
-            "catalog": {
-                "collections": ["all", "new", "sale"],
-                "pdp": {
-                    "mediaGallery": True,
-                    "badges": ["in_stock", "low_stock", "sale"],
-                    "buybox": {"quantitySelector": True, "variantPicker": "dropdown"},
-                },
-                "search": {
-                    "provider": "storefront",
-                    "filters": ["price", "vendor", "productType"],
-                },
-            },
-            "i18n": {"locales": ["en"], "defaultLocale": "en"},
-            "seo": {
-                "titleTemplate": f"%s | {form_data.get('project_name', '')}",
-                "metaDescription": form_data.get("store_description", ""),
-            },
-            "features": {"markets": False, "b2b": False, "subscriptions": False},
-            "a11y": {"contrastMin": 4.5, "focusVisible": True},
-            "analytics": {"lighthouseBudget": 85},
-            "environments": {"preview": True, "production": True},
-        }
-        new_project = Project(
-            id=project_id,
-            name=form_data.get("project_name", ""),
-            description=form_data.get("store_description", ""),
-            brand_guidelines=form_data.get("brand_guidelines", ""),
-            shopify_domain=form_data.get("shopify_domain", ""),
-            shopify_token=form_data.get("shopify_token", ""),
-            spec_json=json.dumps(spec, indent=2),
-            status="Draft",
-            created_at=datetime.datetime.now().isoformat(),
+        if not self.current_project_id:
+            return
+        try:
+            spec = json.loads(form_data.get("spec_json", ""))
+        except json.JSONDecodeError as e:
+            return rx.toast.error(f"Spec is not valid JSON: {e}")
+        errors = validate_spec(spec)
+        if errors:
+            return rx.toast.error(
+                f"Spec has {len(errors)} errors:\n{format_errors(errors[:5])}"
+            )
+        ProjectStore.shared().update(
+            self.current_project_id,
+            spec_json=json.dumps(spec, separators=(",", ":")),
         )
-        self.projects.append(new_project)
-        self.current_page = "Projects"
\ No newline at end of file
+        self._load_current_project()
+        if revise_spec(self.current_project_id, spec):
+            return rx.toast.info("Applied to the running build.")
+        return AgentState.run_workflow(self.current_project_id, True)
+
+    @rx.event
+    def add_project(self, form_data: dict):
+        form_data = clean_project_form(form_data)
+        error = project_form_error(form_data)
+        if error:
+            return rx.toast.error(error)
+        self._create_project(form_data)
+        self.current_page = "Projects"
+        self.projects_page = 0
+        self._load_projects_page()
@@ -0,0 +1,241 @@
+"""Deterministic stand-ins for the LLM, GitHub, Shopify and validation backends.
+
+Each fake sleeps for a configurable latency (with seeded jitter) and can
+inject failures at a given rate, so benchmark runs are reproducible and
+never touch the network or run npm.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import json
+import os
+import random
+import re
+
+
+class FakeBackends:
+    def __init__(
+        self,
+        seed: int = 0,
+        llm_latency: float = 0.05,
+        llm_rate_limit_rate: float = 0.0,
+        llm_failure_rate: float = 0.0,
+        completion_chars: int = 1500,
+        shopify_latency: float = 0.02,
+        github_latency: float = 0.02,
+        check_latency: float = 0.05,
+        check_failure_rate: float = 0.0,
+        spec_error_rate: float = 0.0,
+        tokens_per_second: float = 400.0,
+        jitter: float = 0.2,
+    ):
+        self.rng = random.Random(seed)
+        self.llm_latency = llm_latency
+        self.llm_rate_limit_rate = llm_rate_limit_rate
+        self.llm_failure_rate = llm_failure_rate
+        self.completion_chars = completion_chars
+        self.shopify_latency = shopify_latency
+        self.github_latency = github_latency
+        self.check_latency = check_latency
+        self.check_failure_rate = check_failure_rate
+        self.spec_error_rate = spec_error_rate
+        self.tokens_per_second = tokens_per_second
+        self.jitter = jitter
+        self.calls = {"llm": 0, "shopify": 0, "github": 0, "checks": 0}
+
+    async def _sleep(self, latency: float):
+        await asyncio.sleep(latency * (1 + self.rng.uniform(-self.jitter, self.jitter)))
+
+    async def llm_complete(self, prompt: str, model: str, params: dict) -> str:
+        from app.services.codegen_scheduler import RateLimitError
+
+        self.calls["llm"] += 1
+        await self._sleep(self.llm_latency)
+        roll = self.rng.random()
+        if roll < self.llm_rate_limit_rate:
+            raise RateLimitError(retry_after=self.llm_latency)
+        if roll < self.llm_rate_limit_rate + self.llm_failure_rate:
+            raise RuntimeError("injected LLM failure")
+        digest = hashlib.sha256(f"{model}:{prompt}".encode("utf-8")).hexdigest()
+        if "Return every hunk" in prompt:
+            return "".join(
+                f"{header}\n// repaired {digest[:8]}\n"
+                for header in re.findall(r"^### Hunk \d+", prompt, re.MULTILINE)
+            )
+        body = f"// {digest}\n" + "export const x = 1;\n" * (
+            self.completion_chars // 20
+        )
+        return body
+
+    async def llm_stream(
+        self, prompt: str, model: str, params: dict, schema: dict | None = None
+    ):
+        """Streams llm_complete's output, or the prompt's draft spec back.
+
+        For spec prompts, each requested section is broken with probability
+        spec_error_rate. Without a schema that is a JSON syntax error; with
+        one, decoding is assumed to be constrained, so the section parses
+        but has an empty string where a value was expected.
+        """
+        draft = re.search(r"^Draft: (.*)$", prompt, re.MULTILINE)
+        if draft is None:
+            output = await self.llm_complete(prompt, model, params)
+        else:
+            self.calls["llm"] += 1
+            await self._sleep(self.llm_latency)
+            output = self._spec_output(json.loads(draft[1]), schema)
+        chunk = 16
+        for offset in range(0, len(output), chunk):
+            await asyncio.sleep(chunk / 4 / self.tokens_per_second)
+            yield output[offset : offset + chunk]
+
+    def _spec_output(self, draft: dict, schema: dict | None) -> str:
+        keys = schema["required"] if schema else list(draft)
+        members = []
+        for key in keys:
+            text = json.dumps(draft[key], separators=(",", ":"))
+            if self.rng.random() < self.spec_error_rate:
+                if schema is None:
+                    text = text.replace(":", " ", 1) if ":" in text else text + "]"
+                else:
+                    text = re.sub(r'"[^"]*"(?=[,\]}])', '""', text, count=1)
+            members.append(f'"{key}":{text}')
+        return "{" + ",".join(members) + "}"
+
+    async def shopify_query(
+        self,
+        domain: str,
+        token: str,
+        query: str,
+        variables: dict | None = None,
+        expected_cost: float = 1.0,
+    ) -> dict:
+        self.calls["shopify"] += 1
+        await self._sleep(self.shopify_latency)
+        return {
+            "shop": {
+                "name": domain,
+                "description": "",
+                "primaryDomain": {"url": f"https://{domain}"},
+                "paymentSettings": {"currencyCode": "USD", "countryCode": "US"},
+            },
+            "localization": {
+                "language": {"isoCode": "EN"},
+                "availableLanguages": [{"isoCode": "EN"}],
+                "availableCountries": [{"isoCode": "US"}],
+            },
+            "collections": {
+                "nodes": [{"handle": h, "title": h} for h in ("all", "new", "sale")]
+            },
+            "productTypes": {"nodes": ["Apparel", "Accessories"]},
+            "products": {"nodes": [{"vendor": "Acme"}, {"vendor": "Globex"}]},
+        }
+
+    async def github_request(self, method: str, url: str, **kwargs) -> dict:
+        self.calls["github"] += 1
+        await self._sleep(self.github_latency)
+        sha = hashlib.sha1(f"{method}{url}{self.calls['github']}".encode()).hexdigest()
+        if "/git/ref/" in url:
+            return {"object": {"sha": sha}}
+        if "/git/commits/" in url:
+            return {"tree": {"sha": sha}}
+        if "/git/trees/" in url:
+            return {"tree": []}
+        if url.endswith("/pulls"):
+            return {"number": self.calls["github"], "html_url": url}
+        return {"sha": sha}
+
+    async def run_check(
+        self, check: str, command: list[str], project_path: str, on_output
+    ) -> dict:
+        self.calls["checks"] += 1
+        await self._sleep(self.check_latency)
+        if check == "install":
+            return {"status": "success", "output": "", "exit_code": 0}
+        failed = self.rng.random() < self.check_failure_rate
+        line = f"{check}: ok"
+        if failed:
+            line = self._diagnostic(check, project_path)
+        if on_output is not None:
+            await on_output(check, line)
+        return {
+            "status": "failure" if failed else "success",
+            "output": line,
+            "exit_code": 1 if failed else 0,
+        }
+
+    def _diagnostic(self, check: str, project_path: str) -> str:
+        """An error in the style of the check's tool, on a random source file."""
+        sources = sorted(
+            os.path.relpath(os.path.join(root, name), project_path)
+            for root, _, names in os.walk(os.path.join(project_path, "app"))
+            for name in names
+            if name.endswith(".tsx")
+        )
+        if not sources:
+            return f"{check}: 1 error"
+        path = self.rng.choice(sources)
+        if check == "lint":
+            return f"{path}:2:1: 'x' is assigned a value but never used. [Error/no-unused-vars]"
+        if check == "build":
+            return f"{path}(2,1): error TS2304: Cannot find name 'x'."
+        return f"AssertionError: expected 1 to be 2\n ❯ {path}:2:1"
+
+    @contextlib.contextmanager
+    def installed(self):
+        """Routes the app's backend calls to these fakes for the duration."""
+        from app.services.github_service import GitHubService
+        from app.services.llm_service import LLMService
+        from app.services.shopify_service import ShopifyService
+        from app.services.validation_service import ValidationService
+
+        fakes = self
+        patches = [
+            (
+                LLMService,
+                "_complete",
+                lambda self, prompt, model, params: fakes.llm_complete(
+                    prompt, model, params
+                ),
+            ),
+            (
+                LLMService,
+                "_stream_ollama",
+                lambda self, prompt, model, params, schema=None: fakes.llm_stream(
+                    prompt, model, params, schema
+                ),
+            ),
+            (
+                LLMService,
+                "_stream_openrouter",
+                lambda self, prompt, model, params, schema=None: fakes.llm_stream(
+                    prompt, model, params, schema
+                ),
+            ),
+            (
+                ShopifyService,
+                "query",
+                lambda self, *args, **kwargs: fakes.shopify_query(*args, **kwargs),
+            ),
+            (
+                GitHubService,
+                "_request",
+                lambda self, method, url, **kwargs: fakes.github_request(
+                    method, url, **kwargs
+                ),
+            ),
+            (
+                ValidationService,
+                "_run_command",
+                lambda self, *args: fakes.run_check(*args),
+            ),
+        ]
+        originals = [(cls, name, cls.__dict__[name]) for cls, name, _ in patches]
+        for cls, name, replacement in patches:
+            setattr(cls, name, replacement)
+        try:
+            yield self
+        finally:
+            for cls, name, original in originals:
+                setattr(cls, name, original)
@@ -0,0 +1,128 @@
+"""Import-time profile of the app entry point.
+
+    python -m benchmarks.import_profile --runs 5 --fast-start
+
+Imports app.app in fresh interpreters under `python -X importtime` and
+reports the median cold-start import time, the slowest top-level packages,
+which heavyweight SDKs were loaded, and the peak RSS after import.
+
+One JSON result per run is appended to .data/benchmarks/import_profile.jsonl
+(or --output) and printed, tagged with the current git commit.
+"""
+
+import argparse
+import datetime
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from benchmarks.pipeline import _git_commit
+
+HEAVY_MODULES = ["github", "httpx", "anthropic", "openai"]
+
+CHILD = (
+    "import resource, sys\n"
+    "import {target}\n"
+    "print(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)\n"
+    "print(' '.join(m for m in {heavy!r} if m in sys.modules))\n"
+)
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    """Maps module name to (self, cumulative) import time in microseconds."""
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def profile_once(target: str, fast_start: bool) -> dict:
+    env = dict(os.environ)
+    env["HYDROGEN_AGENT_FAST_START"] = "1" if fast_start else "0"
+    proc = subprocess.run(
+        [
+            sys.executable,
+            "-X",
+            "importtime",
+            "-c",
+            CHILD.format(target=target, heavy=HEAVY_MODULES),
+        ],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+    rss_kb, loaded = proc.stdout.splitlines()[-2:]
+    times = parse_importtime(proc.stderr)
+    packages: dict[str, int] = {}
+    for name, (self_us, _) in times.items():
+        top = name.split(".")[0]
+        packages[top] = packages.get(top, 0) + self_us
+    return {
+        "total_us": sum(self_us for self_us, _ in times.values()),
+        "target_us": times.get(target, (0, 0))[1],
+        "packages": packages,
+        "loaded": loaded.split(),
+        "rss_mb": int(rss_kb) / 1024,
+    }
+
+
+def run(args) -> dict:
+    runs = [profile_once(args.target, args.fast_start) for _ in range(args.runs)]
+    packages: dict[str, list[int]] = {}
+    for result in runs:
+        for name, us in result["packages"].items():
+            packages.setdefault(name, []).append(us)
+    slowest = sorted(
+        ((name, statistics.median(us)) for name, us in packages.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[: args.top]
+    return {
+        "benchmark": "import_profile",
+        "commit": _git_commit(),
+        "timestamp": datetime.datetime.now().isoformat(),
+        "config": vars(args),
+        "import_ms": round(statistics.median(r["target_us"] for r in runs) / 1000, 1),
+        "total_import_ms": round(
+            statistics.median(r["total_us"] for r in runs) / 1000, 1
+        ),
+        "max_rss_mb": round(statistics.median(r["rss_mb"] for r in runs), 2),
+        "heavy_modules_loaded": runs[-1]["loaded"],
+        "slowest_packages_ms": {name: round(us / 1000, 1) for name, us in slowest},
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--target", default="app.app", help="module to import")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument(
+        "--fast-start",
+        action="store_true",
+        help="set HYDROGEN_AGENT_FAST_START in the profiled interpreter",
+    )
+    parser.add_argument("--output", help="results file (JSON lines)")
+    args = parser.parse_args(argv)
+
+    output = args.output or os.path.join(
+        os.getcwd(), ".data", "benchmarks", "import_profile.jsonl"
+    )
+    result = run(args)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result) + "\n")
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
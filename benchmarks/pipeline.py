@@ -0,0 +1,336 @@
+"""End-to-end load test of the project pipeline against fake backends.
+
+    python -m benchmarks.pipeline --sessions 8 --projects 2 --llm-latency 0.05
+
+Each simulated session creates projects through
+AppState.add_project_and_start_spec_extraction and mirrors the job's
+events into its own AgentState, exactly as run_workflow does, measuring
+the state delta that would be sent to the browser after every event.
+Sessions belong to --users simulated users (tenants of the fair
+scheduler); a rejected submission is retried after --admission-backoff
+seconds, so --capacity and the quota flags can be tuned for a pod.
+
+One JSON result per run is appended to .data/benchmarks/pipeline.jsonl
+(or --output) and printed, tagged with the current git commit, so runs can
+be compared across commits. The app itself runs against a fresh temporary
+data directory unless --data-dir is given.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _distribution(values: list[float], digits: int = 4) -> dict:
+    from app.services.model_router import percentile
+
+    if not values:
+        return {"count": 0}
+    return {
+        "count": len(values),
+        "mean": round(sum(values) / len(values), digits),
+        "p50": round(percentile(values, 50), digits),
+        "p95": round(percentile(values, 95), digits),
+        "p99": round(percentile(values, 99), digits),
+        "max": round(max(values), digits),
+    }
+
+
+class Session:
+    """One simulated browser tab with its own root state."""
+
+    def __init__(self, index: int, tenant: str):
+        import reflex as rx
+
+        from app.states.agent_state import AgentState
+        from app.states.state import AppState
+
+        self.index = index
+        self.tenant = tenant
+        self.root = rx.State(_reflex_internal_init=True)
+        self.app = self.root.get_substate(AppState.get_full_name().split(".")[1:])
+        self.agent = self.root.get_substate(AgentState.get_full_name().split(".")[1:])
+        self.delta_sizes: list[int] = []
+        self.project_ids: list[str] = []
+
+    def flush_delta(self):
+        from reflex.utils.format import json_dumps
+
+        delta = self.root.get_delta()
+        if delta:
+            self.delta_sizes.append(len(json_dumps(delta)))
+        self.root._clean()
+
+    def create_project(self, number: int) -> str:
+        from app.states.state import AppState
+
+        handler = AppState.event_handlers["add_project_and_start_spec_extraction"]
+        form = {
+            "project_name": f"Bench Store {self.index}-{number}",
+            "store_description": "Outdoor apparel and accessories.",
+            "brand_guidelines": "Friendly, concise, sentence case. " * 20,
+            "shopify_domain": f"bench-{self.index}-{number}.myshopify.com",
+            "shopify_token": "bench-token",
+        }
+        list(handler.fn(self.app, form))
+        self.flush_delta()
+        self.project_ids.append(self.app.current_project_id)
+        return self.app.current_project_id
+
+
+async def run_session(
+    session: Session, projects: int, stage_times: dict, backoff: float
+) -> list:
+    from app.services.fair_scheduler import AdmissionError
+    from app.services.job_runner import JobRunner, JobStatus
+    from app.services.workflow_stages import AgentType, WorkflowStage
+
+    runner = JobRunner.shared()
+    results = []
+    for number in range(projects):
+        start = time.monotonic()
+        project_id = session.create_project(number)
+        rejections = 0
+        while True:
+            try:
+                job_id = runner.submit(
+                    project_id, {"extract_spec": True}, tenant=session.tenant
+                )
+                break
+            except AdmissionError:
+                rejections += 1
+                await asyncio.sleep(backoff)
+        agent = session.agent
+        agent.current_project_id = project_id
+        agent.current_workflow_stage = WorkflowStage.EXTRACTING_SPEC
+        agent.current_agent = AgentType.ORCHESTRATOR
+        agent.workflow_progress = 0.0
+        agent.agent_logs = []
+        agent.agent_outputs = {}
+        session.flush_delta()
+        stage_started: dict[str, float] = {}
+        first_stage = None
+        status = None
+        async for event in runner.watch(job_id):
+            message = event.get("message") or ""
+            if message.startswith("Starting stage: "):
+                stage_started[event["stage"]] = time.monotonic()
+                if first_stage is None:
+                    first_stage = time.monotonic() - start
+            elif message.startswith("Completed stage: "):
+                began = stage_started.pop(event["stage"], None)
+                if began is not None:
+                    stage_times.setdefault(event["stage"], []).append(
+                        time.monotonic() - began
+                    )
+            agent._apply_job_event(event)
+            session.flush_delta()
+            status = event["status"]
+        results.append(
+            {
+                "ok": status == JobStatus.COMPLETED.value,
+                "seconds": time.monotonic() - start,
+                "time_to_start": first_stage,
+                "rejections": rejections,
+                "tenant": session.tenant,
+            }
+        )
+    return results
+
+
+def _repair_summary(project_ids: list[str]) -> dict:
+    from app.services.job_runner import JobRunner
+
+    reports = [
+        (JobRunner.shared().queue.latest_outputs(project_id) or {}).get("repair")
+        for project_id in project_ids
+    ]
+    reports = [report for report in reports if report]
+    iterations = [i for report in reports for i in report["iterations"]]
+    statuses: dict[str, int] = {}
+    for report in reports:
+        statuses[report["status"]] = statuses.get(report["status"], 0) + 1
+    return {
+        "projects": len(reports),
+        "statuses": statuses,
+        "iterations": _distribution([float(len(r["iterations"])) for r in reports], 1),
+        "iteration_seconds": _distribution(
+            [i["repair_seconds"] + i["check_seconds"] for i in iterations]
+        ),
+        "tokens": sum(i["prompt_tokens"] + i["completion_tokens"] for i in iterations),
+    }
+
+
+async def publish_all(project_ids: list[str]) -> list[float]:
+    """Commits each completed build through the (fake) GitHub API."""
+    from app.services.artifact_store import ArtifactStore
+    from app.services.github_service import GitHubService
+
+    github = GitHubService("bench-token")
+    store = ArtifactStore.shared()
+    durations = []
+    for project_id in project_ids:
+        if store.manifest(project_id) is None:
+            continue
+        files = store.files(project_id)
+        start = time.monotonic()
+        await github.commit_tree(f"bench/{project_id}", "main", files, "Build")
+        durations.append(time.monotonic() - start)
+    return durations
+
+
+async def run(args) -> dict:
+    from app.services.component_library import ComponentLibrary
+    from app.services.fair_scheduler import FairScheduler
+    from app.services.job_runner import JobRunner
+    from app.services.llm_metrics import MetricsRecorder
+    from benchmarks.fakes import FakeBackends
+
+    fakes = FakeBackends(
+        seed=args.seed,
+        llm_latency=args.llm_latency,
+        llm_rate_limit_rate=args.llm_rate_limit_rate,
+        llm_failure_rate=args.llm_failure_rate,
+        shopify_latency=args.shopify_latency,
+        github_latency=args.github_latency,
+        check_latency=args.check_latency,
+        check_failure_rate=args.check_failure_rate,
+    )
+    runner = JobRunner.shared()
+    runner.workers = args.workers
+    runner.poll_interval = 0.05
+    runner.scheduler = FairScheduler(
+        args.capacity,
+        runner.scheduler.stage_classes,
+        tenant_quota=args.tenant_quota,
+        max_jobs_per_tenant=args.max_jobs_per_tenant,
+        max_active_jobs=args.workers,
+    )
+    stage_times: dict[str, list[float]] = {}
+    users = args.users or args.sessions
+    sessions = [Session(i, f"user-{i % users}") for i in range(args.sessions)]
+    tracemalloc.start()
+    start = time.monotonic()
+    with fakes.installed():
+        per_session = await asyncio.gather(
+            *(
+                run_session(s, args.projects, stage_times, args.admission_backoff)
+                for s in sessions
+            )
+        )
+        wall = time.monotonic() - start
+        publish = []
+        if args.publish:
+            publish = await publish_all([p for s in sessions for p in s.project_ids])
+    _, peak_traced = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    await runner.stop()
+    results = [r for session in per_session for r in session]
+    completed = sum(1 for r in results if r["ok"])
+    deltas = [size for s in sessions for size in s.delta_sizes]
+    usage = MetricsRecorder.shared().summary(["task_type"])
+    tenant_latency: dict[str, list[float]] = {}
+    for r in results:
+        tenant_latency.setdefault(r["tenant"], []).append(r["seconds"])
+    return {
+        "benchmark": "pipeline",
+        "commit": _git_commit(),
+        "timestamp": datetime.datetime.now().isoformat(),
+        "config": vars(args),
+        "projects": len(results),
+        "completed": completed,
+        "failed": len(results) - completed,
+        "wall_seconds": round(wall, 3),
+        "projects_per_hour": round(completed / wall * 3600, 1) if wall else 0.0,
+        "project_latency": _distribution([r["seconds"] for r in results]),
+        "stage_latency": {
+            stage: _distribution(times) for stage, times in sorted(stage_times.items())
+        },
+        "publish_latency": _distribution(publish),
+        "time_to_start": _distribution(
+            [r["time_to_start"] for r in results if r["time_to_start"] is not None]
+        ),
+        "tenant_mean_latency": _distribution(
+            [sum(times) / len(times) for times in tenant_latency.values()]
+        ),
+        "admission_rejections": sum(r["rejections"] for r in results),
+        "scheduler": runner.scheduler.stats(),
+        "state_delta_bytes": {
+            **_distribution([float(d) for d in deltas], 1),
+            "total": sum(deltas),
+        },
+        "peak_traced_memory_mb": round(peak_traced / 2**20, 2),
+        "max_rss_mb": round(
+            resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 2
+        ),
+        "backend_calls": fakes.calls,
+        "llm_usage": usage,
+        "component_library": ComponentLibrary.shared().get_stats(),
+        "repair": _repair_summary([p for s in sessions for p in s.project_ids]),
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sessions", type=int, default=4)
+    parser.add_argument("--projects", type=int, default=1, help="per session")
+    parser.add_argument("--users", type=int, help="tenants; one per session by default")
+    parser.add_argument(
+        "--workers", type=int, default=32, help="job workers and max active jobs"
+    )
+    parser.add_argument("--capacity", type=int, default=4, help="concurrent stages")
+    parser.add_argument("--tenant-quota", type=int, default=2)
+    parser.add_argument("--max-jobs-per-tenant", type=int, default=3)
+    parser.add_argument("--admission-backoff", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--llm-rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--llm-failure-rate", type=float, default=0.0)
+    parser.add_argument("--shopify-latency", type=float, default=0.02)
+    parser.add_argument("--github-latency", type=float, default=0.02)
+    parser.add_argument("--check-latency", type=float, default=0.05)
+    parser.add_argument("--check-failure-rate", type=float, default=0.0)
+    parser.add_argument("--publish", action="store_true")
+    parser.add_argument(
+        "--data-dir",
+        help="app data directory; a fresh temporary one by default",
+    )
+    parser.add_argument("--output", help="results file (JSON lines)")
+    args = parser.parse_args(argv)
+
+    os.environ["HYDROGEN_AGENT_DATA_DIR"] = args.data_dir or tempfile.mkdtemp(
+        prefix="hydrogen-bench-"
+    )
+    output = args.output or os.path.join(
+        os.getcwd(), ".data", "benchmarks", "pipeline.jsonl"
+    )
+    result = asyncio.run(run(args))
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result) + "\n")
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""Spec extraction retries and latency, whole-spec retries vs per-section.
+
+    python -m benchmarks.spec_extraction --trials 50 --spec-error-rate 0.1
+
+Extracts the store spec from a project brief against a fake small model
+that breaks each section with the given probability, three ways:
+
+- free: unconstrained output, the whole spec regenerated on any error
+- constrained: schema-constrained decoding, whole-spec regeneration
+- structured: LLMService.generate_structured, which validates sections as
+  they stream and re-prompts only the broken ones
+
+One JSON result per run is appended to .data/benchmarks/spec_extraction.jsonl
+(or --output) and printed, tagged with the current git commit.
+"""
+
+import argparse
+import asyncio
+import datetime
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.pipeline import _distribution, _git_commit
+
+MODES = ("free", "constrained", "structured")
+
+
+async def extract_whole(llm, prompt: str, schema: dict | None, fixed: dict, args):
+    """Regenerates the whole spec until it parses and validates."""
+    from app.services.llm_metrics import llm_context
+    from app.services.spec_schema import validate_spec
+
+    model = llm.router.rank(llm.candidates_for_task("spec_extraction"))[0]
+    with llm_context(task_type="spec_extraction"):
+        for _ in range(args.max_attempts):
+            stream = llm.generate_stream(prompt, model, schema)
+            text = "".join([delta async for delta in stream])
+            try:
+                value = json.loads(text)
+            except json.JSONDecodeError:
+                continue
+            if isinstance(value, dict) and not validate_spec({**fixed, **value}):
+                return True
+    return False
+
+
+async def trial(mode: str, fakes, args) -> dict:
+    from app.services.llm_service import LLMService
+    from app.services.prompt_builder import spec_prompt
+    from app.services.spec_schema import STORE_SPEC_SCHEMA, validate_spec
+    from app.services.structured_output import (
+        StructuredOutputError,
+        decoding_schema,
+        object_schema,
+    )
+    from app.services.workflow import FIXED_SPEC_SECTIONS
+    from app.states.state import build_store_spec
+
+    draft = build_store_spec(
+        {
+            "project_name": "Bench Store",
+            "shopify_domain": "bench.myshopify.com",
+            "store_description": "Outdoor apparel and accessories.",
+        }
+    )
+    fixed = {key: draft[key] for key in FIXED_SPEC_SECTIONS}
+    keys = [key for key in draft if key not in fixed]
+    prompt = spec_prompt("Outdoor apparel.", "Friendly.", {k: draft[k] for k in keys})
+    schema = object_schema(STORE_SPEC_SCHEMA, keys)
+    llm = LLMService.shared()
+    calls = fakes.calls["llm"]
+    start = time.monotonic()
+    if mode == "structured":
+        try:
+            await llm.generate_structured(
+                prompt,
+                schema,
+                "spec_extraction",
+                check=lambda value: validate_spec({**fixed, **value}),
+                max_rounds=args.max_attempts,
+            )
+            ok = True
+        except StructuredOutputError:
+            ok = False
+    else:
+        constrained = decoding_schema(schema) if mode == "constrained" else None
+        ok = await extract_whole(llm, prompt, constrained, fixed, args)
+    return {
+        "ok": ok,
+        "seconds": time.monotonic() - start,
+        "requests": fakes.calls["llm"] - calls,
+    }
+
+
+async def run(args) -> dict:
+    from app.services.llm_metrics import MetricsRecorder
+    from benchmarks.fakes import FakeBackends
+
+    fakes = FakeBackends(
+        seed=args.seed,
+        llm_latency=args.llm_latency,
+        spec_error_rate=args.spec_error_rate,
+        tokens_per_second=args.tokens_per_second,
+    )
+    modes = {}
+    with fakes.installed():
+        for mode in args.modes:
+            results = [await trial(mode, fakes, args) for _ in range(args.trials)]
+            ok = [r for r in results if r["ok"]]
+            modes[mode] = {
+                "success_rate": round(len(ok) / len(results), 4),
+                "latency": _distribution([r["seconds"] for r in ok]),
+                "requests": _distribution([float(r["requests"]) for r in results], 2),
+            }
+    return {
+        "benchmark": "spec_extraction",
+        "commit": _git_commit(),
+        "timestamp": datetime.datetime.now().isoformat(),
+        "config": vars(args),
+        "modes": modes,
+        "llm_usage": MetricsRecorder.shared().summary(["task_type"]),
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--trials", type=int, default=30)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--spec-error-rate", type=float, default=0.1)
+    parser.add_argument("--max-attempts", type=int, default=3)
+    parser.add_argument("--tokens-per-second", type=float, default=400.0)
+    parser.add_argument("--llm-latency", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="results file (JSON lines)")
+    args = parser.parse_args(argv)
+
+    os.environ["HYDROGEN_AGENT_DATA_DIR"] = tempfile.mkdtemp(prefix="hydrogen-bench-")
+    output = args.output or os.path.join(
+        os.getcwd(), ".data", "benchmarks", "spec_extraction.jsonl"
+    )
+    result = asyncio.run(run(args))
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "a", encoding="utf-8") as f:
+        f.write(json.dumps(result) + "\n")
+    json.dump(result, sys.stdout, indent=2)
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Micro-benchmark for store spec validation.
+
+    python -m benchmarks.spec_validation [--number N]
+
+Prints one JSON object with per-call timings for a valid spec and for a
+spec with errors in several sections.
+"""
+
+import argparse
+import copy
+import json
+import timeit
+
+from app.services.spec_schema import STORE_SPEC_SCHEMA, compile_schema, validate_spec
+from app.states.state import build_store_spec
+
+
+def broken_spec(spec: dict) -> dict:
+    spec = copy.deepcopy(spec)
+    spec["brand"]["colors"]["primary"] = "#EEEEEE"
+    spec["nav"][1]["href"] = "collections/all"
+    spec["i18n"]["defaultLocale"] = "fr"
+    del spec["seo"]
+    return spec
+
+
+def run(number: int) -> dict:
+    spec = build_store_spec(
+        {
+            "project_name": "Benchmark Store",
+            "shopify_domain": "benchmark.myshopify.com",
+            "store_description": "A store used to time spec validation.",
+        }
+    )
+    broken = broken_spec(spec)
+    results = {
+        "number": number,
+        "errors_reported": len(validate_spec(broken)),
+        "compile_us": timeit.timeit(
+            lambda: compile_schema(STORE_SPEC_SCHEMA), number=100
+        )
+        / 100
+        * 1e6,
+    }
+    for name, value in (("valid", spec), ("invalid", broken)):
+        best = min(timeit.repeat(lambda: validate_spec(value), number=number, repeat=5))
+        results[f"{name}_us"] = best / number * 1e6
+    return {k: round(v, 2) if isinstance(v, float) else v for k, v in results.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--number", type=int, default=2000)
+    print(json.dumps(run(parser.parse_args().number)))
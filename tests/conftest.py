@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# Stores resolve their paths under the data dir at import time, so point it
+# at a scratch directory before any app module is imported.
+os.environ["HYDROGEN_AGENT_DATA_DIR"] = tempfile.mkdtemp(prefix="hydrogen-tests-")
@@ -0,0 +1,92 @@
+"""A local HTTP server standing in for provider APIs in tests."""
+
+import contextlib
+import http.server
+import json
+import threading
+from collections.abc import Callable, Iterable, Iterator
+from typing import NamedTuple
+
+
+class Request(NamedTuple):
+    method: str
+    path: str
+    headers: dict[str, str]
+    body: bytes
+
+    def json(self):
+        return json.loads(self.body)
+
+
+class Response(NamedTuple):
+    status: int = 200
+    body: bytes | Iterable[bytes] = b""
+    headers: dict[str, str] = {}
+
+
+def json_response(value, status: int = 200) -> Response:
+    return Response(
+        status, json.dumps(value).encode(), {"Content-Type": "application/json"}
+    )
+
+
+def sse_response(events: Iterable[str]) -> Response:
+    """A text/event-stream body, sent one event per write."""
+    return Response(
+        200,
+        (f"data: {event}\n\n".encode() for event in events),
+        {"Content-Type": "text/event-stream"},
+    )
+
+
+class FakeServer:
+    def __init__(self, url: str):
+        self.url = url
+        self.requests: list[Request] = []
+
+
+@contextlib.contextmanager
+def serve(handle: Callable[[Request], Response]) -> Iterator[FakeServer]:
+    """Serves handle on a free localhost port for the duration.
+
+    Streamed bodies are written and flushed chunk by chunk, and the
+    connection is closed afterwards, so clients see them arrive as a stream.
+    """
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def _handle(self):
+            length = int(self.headers.get("Content-Length") or 0)
+            request = Request(
+                self.command, self.path, dict(self.headers), self.rfile.read(length)
+            )
+            server.requests.append(request)
+            response = handle(request)
+            self.send_response(response.status)
+            for name, value in response.headers.items():
+                self.send_header(name, value)
+            if isinstance(response.body, bytes):
+                self.send_header("Content-Length", str(len(response.body)))
+                self.end_headers()
+                self.wfile.write(response.body)
+                return
+            self.send_header("Connection", "close")
+            self.end_headers()
+            for chunk in response.body:
+                self.wfile.write(chunk)
+                self.wfile.flush()
+            self.close_connection = True
+
+        do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = _handle
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server = FakeServer(f"http://127.0.0.1:{httpd.server_address[1]}")
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
@@ -0,0 +1,32 @@
+from app.states.agent_state import summarize_outputs
+
+
+def test_job_outputs_are_reduced_before_syncing_to_the_browser():
+    outputs = {
+        "store_spec": {"brand": {"name": "Acme"}},
+        "previous_spec": {"brand": {"name": "Acme"}},
+        "extract_spec": False,
+        "brief": "A shop",
+        "store_data": {"collections": ["featured"] * 250},
+        "pipeline": {"started": 25, "completed": 25},
+        "planned_files": [{"path": "a.ts"}, {"path": "b.ts"}],
+        "regenerated_files": ["a.ts"],
+        "library_hits": [],
+        "llm_usage": [
+            {"stage": "Generating Code", "calls": 20, "cost_usd": 0.01},
+            {"stage": "Validating Code", "calls": 2, "cost_usd": 0.002},
+        ],
+        "validation": {"build": {"status": "success", "output": "x" * 5000}},
+        "repair": {"status": "passed", "remaining": ["error"] * 100},
+        "artifact_revision": 3,
+    }
+
+    assert summarize_outputs(outputs) == {
+        "planned_files": 2,
+        "regenerated_files": 1,
+        "library_hits": 0,
+        "llm_usage": {"calls": 22, "cost_usd": 0.012},
+        "validation": {"build": "success"},
+        "repair": {"status": "passed"},
+        "artifact_revision": 3,
+    }
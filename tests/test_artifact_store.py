@@ -0,0 +1,104 @@
+import io
+import threading
+
+from app.services.artifact_store import ArtifactStore
+from app.services.workflow import write_workspace
+
+
+def test_materialize_removes_files_a_revision_dropped(tmp_path):
+    store = ArtifactStore(str(tmp_path / "artifacts"))
+    workspace = tmp_path / "workspace"
+    first = store.save_revision("p1", {"app/a.ts": "a", "app/b.ts": "b"})
+    second = store.save_revision("p1", {"app/a.ts": "a2"})
+
+    store.materialize("p1", str(workspace), first["revision"])
+    (workspace / "package-lock.json").write_text("{}")
+    store.materialize("p1", str(workspace), second["revision"])
+
+    assert (workspace / "app" / "a.ts").read_text() == "a2"
+    assert not (workspace / "app" / "b.ts").exists()
+    assert (workspace / "package-lock.json").exists()
+
+    write_workspace(str(workspace), {"app/c.ts": "c"})
+    assert not (workspace / "app" / "a.ts").exists()
+
+
+def test_concurrent_savers_claim_distinct_revisions(tmp_path):
+    root = str(tmp_path / "artifacts")
+    barrier = threading.Barrier(8)
+
+    def save(worker: int):
+        # Separate instances share no lock, like separate processes.
+        store = ArtifactStore(root)
+        barrier.wait()
+        for i in range(5):
+            store.save_revision("p1", {"a.ts": f"{worker}:{i}"})
+
+    threads = [threading.Thread(target=save, args=(w,)) for w in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    store = ArtifactStore(root)
+    assert store.revisions("p1") == list(range(1, 41))
+    contents = {store.files("p1", r)["a.ts"] for r in store.revisions("p1")}
+    assert len(contents) == 40
+
+
+def test_exported_archives_import_as_a_new_revision(tmp_path):
+    store = ArtifactStore(str(tmp_path / "artifacts"))
+    files = {"app/a.ts": "a", "app/routes/b.tsx": "b" * 100_000}
+    store.save_revision("p1", files)
+
+    for fmt in ("tar.gz", "tar", "zip"):
+        archive = io.BytesIO()
+        store.export("p1", archive, fmt)
+        archive.seek(0)
+        manifest = store.import_archive(f"copy-{fmt}", archive, fmt)
+
+        assert dict(store.files(f"copy-{fmt}", manifest["revision"])) == files
+        assert manifest["meta"] == {"imported": True}
+
+
+def test_rollback_restores_an_older_revision_as_a_new_one(tmp_path):
+    store = ArtifactStore(str(tmp_path / "artifacts"))
+    first = store.save_revision("p1", {"a.ts": "a"})
+    store.save_revision("p1", {"a.ts": "a2", "b.ts": "b"})
+
+    restored = store.rollback("p1", first["revision"])
+
+    assert restored["revision"] == 3 and restored["parent"] == 2
+    assert dict(store.files("p1")) == {"a.ts": "a"}
+    assert restored["meta"] == {"rollback_to": 1}
+
+
+def test_garbage_collection_keeps_referenced_blobs(tmp_path):
+    store = ArtifactStore(str(tmp_path / "artifacts"))
+    kept = store.save_revision("p1", {"a.ts": "a"})
+    orphan = store.put("never saved")
+
+    assert store.collect_garbage() == 1
+    assert not store.has(orphan["hash"])
+    assert store.files("p1", kept["revision"])["a.ts"] == "a"
+
+
+def test_garbage_collection_waits_for_revisions_being_saved(tmp_path):
+    store = ArtifactStore(str(tmp_path / "artifacts"))
+    put = store.put
+    collectors = []
+
+    def put_then_collect(content):
+        entry = put(content)
+        collector = threading.Thread(target=store.collect_garbage)
+        collector.start()
+        collector.join(0.2)
+        collectors.append(collector)
+        return entry
+
+    store.put = put_then_collect
+    manifest = store.save_revision("p1", {"a.ts": "a"})
+    for collector in collectors:
+        collector.join()
+
+    assert store.files("p1", manifest["revision"])["a.ts"] == "a"
@@ -0,0 +1,53 @@
+import asyncio
+
+from app.services.codegen_scheduler import AdaptiveLimiter, CodegenScheduler
+
+
+def test_limiter_halves_on_rate_limits_and_recovers():
+    limiter = AdaptiveLimiter(4)
+
+    async def finish(rate_limited: bool = False):
+        await limiter.acquire()
+        await limiter.release(rate_limited)
+
+    async def main():
+        await finish(rate_limited=True)
+        assert limiter.limit == 2
+        await finish(rate_limited=True)
+        await finish(rate_limited=True)
+        assert limiter.limit == 1
+        for expected in (2, 3, 4):
+            for _ in range(limiter.limit):
+                await finish()
+            assert limiter.limit == expected
+        for _ in range(10):
+            await finish()
+        assert limiter.limit == 4
+
+    asyncio.run(main())
+
+
+def test_limiter_holds_callers_beyond_the_limit():
+    limiter = AdaptiveLimiter(2)
+
+    async def main():
+        await limiter.acquire()
+        await limiter.acquire()
+        waiting = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+        await limiter.release()
+        await asyncio.wait_for(waiting, 1)
+        assert limiter.active == 2
+
+    asyncio.run(main())
+
+
+def test_jobs_share_limiters_per_provider_and_model():
+    scheduler = CodegenScheduler.shared()
+
+    assert CodegenScheduler.shared() is scheduler
+    assert scheduler._limiter_for("gemma3:4b") is scheduler._limiter_for("gemma3:4b")
+    assert scheduler._limiter_for("gemma3:4b") is not scheduler._limiter_for(
+        "phi4:mini"
+    )
@@ -0,0 +1,46 @@
+from app.services.component_library import ComponentLibrary, parameterize
+
+HEADER = "app/components/Header.tsx"
+SECTIONS = ["brand.name", "brand.logo", "nav", "a11y"]
+
+
+def spec(name: str, nav_label: str = "Shop") -> dict:
+    return {
+        "brand": {"name": name, "logo": "https://cdn.example.com/logo.png"},
+        "nav": [{"label": nav_label, "href": "/collections/all"}],
+    }
+
+
+def header(name: str, extra: str = "") -> str:
+    return (
+        "export function Header() {\n"
+        f'  return <header><img src="https://cdn.example.com/logo.png" alt="{name}" />'
+        f"<h1>{name}</h1>{extra}</header>;\n"
+        "}\n"
+    )
+
+
+def test_brand_values_are_substituted_into_reused_components(tmp_path):
+    library = ComponentLibrary(str(tmp_path / "library.db"))
+
+    assert library.record(HEADER, SECTIONS, spec("Acme"), header("Acme"))
+    assert library.lookup(HEADER, SECTIONS, spec("Globex")) == header("Globex")
+
+
+def test_values_shared_with_other_spec_strings_are_not_stored(tmp_path):
+    library = ComponentLibrary(str(tmp_path / "library.db"))
+    content = header("Home", '<a href="/">Home</a>')
+
+    assert not library.record(HEADER, SECTIONS, spec("Home", "Home"), content)
+    assert library.lookup(HEADER, SECTIONS, spec("Globex", "Home")) is None
+
+
+def test_values_outside_whole_fields_are_not_parameterized():
+    css = "body { font-family: Inter, sans-serif; }\n"
+
+    assert (
+        parameterize(css, ["Inter"])
+        == "body { font-family: @@param0@@, sans-serif; }\n"
+    )
+    assert parameterize(css + "/* Inter-based spacing */\n", ["Inter"]) is None
+    assert parameterize("<p>Welcome home to Home</p>", ["Home"]) is None
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+from app.services.fair_scheduler import (
+    CHEAP,
+    EXPENSIVE,
+    AdmissionError,
+    FairScheduler,
+)
+
+STAGE_CLASSES = {"extract": CHEAP, "generate": EXPENSIVE}
+
+
+def grant_order(scheduler: FairScheduler, stages: list[tuple[str, str]]) -> list[str]:
+    """Queues stages behind a held slot and returns the order they run in."""
+    order: list[str] = []
+
+    async def run(name: str, tenant: str, stage: str):
+        async with scheduler.slot(tenant, stage):
+            order.append(name)
+
+    async def main():
+        release = asyncio.Event()
+
+        async def hold():
+            async with scheduler.slot("holder", "generate"):
+                await release.wait()
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        tasks = []
+        for name, stage in stages:
+            tasks.append(asyncio.create_task(run(name, name[0], stage)))
+            await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(holder, *tasks)
+
+    asyncio.run(main())
+    return order
+
+
+def test_tenants_take_turns_in_start_time_order():
+    scheduler = FairScheduler(capacity=1, stage_classes=STAGE_CLASSES)
+
+    order = grant_order(
+        scheduler,
+        [
+            ("a1", "generate"),
+            ("a2", "generate"),
+            ("a3", "generate"),
+            ("b1", "generate"),
+        ],
+    )
+
+    assert order == ["a1", "b1", "a2", "a3"]
+
+
+def test_cheap_stages_are_weighted_ahead_of_expensive_ones():
+    scheduler = FairScheduler(capacity=1, stage_classes=STAGE_CLASSES, class_limits={})
+
+    order = grant_order(
+        scheduler,
+        [
+            ("a-gen1", "generate"),
+            ("a-gen2", "generate"),
+            *((f"a-ext{i}", "extract") for i in range(1, 5)),
+        ],
+    )
+
+    assert order == ["a-gen1", "a-ext1", "a-ext2", "a-ext3", "a-ext4", "a-gen2"]
+
+
+def test_a_tenant_over_its_quota_waits_while_others_run():
+    scheduler = FairScheduler(capacity=4, tenant_quota=2, class_limits={})
+    running: list[str] = []
+
+    async def main():
+        release = asyncio.Event()
+
+        async def run(name: str):
+            async with scheduler.slot(name[0], "generate"):
+                running.append(name)
+                await release.wait()
+
+        tasks = [asyncio.create_task(run(name)) for name in ("a1", "a2", "a3", "b1")]
+        for _ in range(5):
+            await asyncio.sleep(0)
+        assert running == ["a1", "a2", "b1"]
+        assert scheduler.stats()["waiting"] == 1
+        release.set()
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert running[-1] == "a3"
+
+
+def test_jobs_are_refused_over_the_tenant_and_global_limits():
+    scheduler = FairScheduler(max_jobs_per_tenant=3, max_active_jobs=10)
+
+    scheduler.admit("a", tenant_jobs=2, active_jobs=9)
+    with pytest.raises(AdmissionError, match="3 builds"):
+        scheduler.admit("a", tenant_jobs=3, active_jobs=5)
+    with pytest.raises(AdmissionError, match="queue is full"):
+        scheduler.admit("b", tenant_jobs=0, active_jobs=10)
+    assert scheduler.rejected == 2
@@ -0,0 +1,127 @@
+import asyncio
+import hashlib
+import json
+import re
+
+from app.services.github_service import GitHubService, git_blob_sha
+from tests.fake_server import Request, Response, json_response, serve
+
+README = "# Store\n"
+
+
+class FakeGitHub:
+    """Just enough of the Git database API for commit_tree."""
+
+    def __init__(self):
+        self.blobs = {git_blob_sha(README): README}
+        self.trees = {"tree0": {"README.md": git_blob_sha(README)}}
+        self.commits = {"commit0": {"tree": "tree0", "parents": []}}
+        self.refs = {"main": "commit0"}
+
+    def _new_sha(self, value) -> str:
+        return hashlib.sha1(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+    def handle(self, request: Request) -> Response:
+        path = request.path.split("?")[0].removeprefix("/repos/acme/store/git")
+        if request.method == "GET" and (m := re.fullmatch(r"/ref/heads/(.+)", path)):
+            if m[1] not in self.refs:
+                return json_response({"message": "Not Found"}, 404)
+            return json_response({"object": {"sha": self.refs[m[1]]}})
+        if request.method == "GET" and (m := re.fullmatch(r"/commits/(\w+)", path)):
+            return json_response(
+                {"sha": m[1], "tree": {"sha": self.commits[m[1]]["tree"]}}
+            )
+        if request.method == "GET" and (m := re.fullmatch(r"/trees/(\w+)", path)):
+            entries = self.trees[m[1]]
+            return json_response(
+                {
+                    "tree": [
+                        {"path": p, "type": "blob", "sha": sha}
+                        for p, sha in entries.items()
+                    ]
+                }
+            )
+        body = request.json()
+        if path == "/blobs":
+            sha = git_blob_sha(body["content"])
+            self.blobs[sha] = body["content"]
+            return json_response({"sha": sha}, 201)
+        if path == "/trees":
+            entries = dict(self.trees[body["base_tree"]])
+            entries.update({e["path"]: e["sha"] for e in body["tree"]})
+            assert all(sha in self.blobs for sha in entries.values())
+            sha = self._new_sha(entries)
+            self.trees[sha] = entries
+            return json_response({"sha": sha}, 201)
+        if path == "/commits":
+            sha = self._new_sha(body)
+            self.commits[sha] = body
+            return json_response({"sha": sha}, 201)
+        if path == "/refs":
+            self.refs[body["ref"].removeprefix("refs/heads/")] = body["sha"]
+            return json_response({}, 201)
+        if m := re.fullmatch(r"/refs/heads/(.+)", path):
+            self.refs[m[1]] = body["sha"]
+            return json_response({})
+        return json_response({"message": "Not Found"}, 404)
+
+    def files(self, branch: str) -> dict[str, str]:
+        tree = self.trees[self.commits[self.refs[branch]]["tree"]]
+        return {path: self.blobs[sha] for path, sha in tree.items()}
+
+
+def commit(server_url: str, *args, **kwargs) -> str:
+    github = GitHubService("token", api_url=server_url)
+
+    async def main():
+        try:
+            return await github.commit_tree("acme/store", *args, **kwargs)
+        finally:
+            await github.aclose()
+
+    return asyncio.run(main())
+
+
+def blob_uploads(server) -> list[Request]:
+    return [r for r in server.requests if r.path.endswith("/git/blobs")]
+
+
+def test_commit_tree_uploads_each_distinct_blob_once():
+    github = FakeGitHub()
+    files = {
+        "README.md": README,
+        "app/components/index.ts": "export {};\n",
+        "app/routes/index.ts": "export {};\n",
+        "app/root.tsx": "export default function App() {}\n",
+    }
+
+    with serve(github.handle) as server:
+        sha = commit(server.url, "main", files, "Build store")
+
+    assert github.refs["main"] == sha
+    assert github.commits[sha]["parents"] == ["commit0"]
+    assert github.files("main") == files
+    uploaded = sorted(r.json()["content"] for r in blob_uploads(server))
+    assert uploaded == sorted(set(files.values()) - {README})
+
+
+def test_commit_tree_without_changes_returns_the_head():
+    github = FakeGitHub()
+
+    with serve(github.handle) as server:
+        sha = commit(server.url, "main", {"README.md": README}, "No-op")
+
+    assert sha == "commit0"
+    assert all(r.method == "GET" for r in server.requests)
+
+
+def test_commit_tree_creates_a_missing_branch_from_base():
+    github = FakeGitHub()
+
+    with serve(github.handle) as server:
+        sha = commit(
+            server.url, "preview", {"a.ts": "1\n"}, "Preview", base_branch="main"
+        )
+
+    assert github.refs == {"main": "commit0", "preview": sha}
+    assert github.files("preview") == {"README.md": README, "a.ts": "1\n"}
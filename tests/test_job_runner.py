@@ -0,0 +1,55 @@
+import asyncio
+
+from app.services.job_runner import JobQueue, JobRunner, JobStatus
+
+
+def test_watch_follows_a_job_run_by_another_process(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    runner = JobRunner([], queue=JobQueue(db_path))
+    other = JobQueue(db_path)
+    job_id = runner.queue.enqueue("project-1", {})
+
+    async def run_elsewhere():
+        job = other.claim(60.0)
+        await asyncio.sleep(0.1)
+        other.checkpoint(job["id"], "Generating Code", [], {})
+        await asyncio.sleep(0.1)
+        other.finish(job["id"], JobStatus.COMPLETED)
+
+    async def main():
+        worker = asyncio.create_task(run_elsewhere())
+        events = [event async for event in runner.watch(job_id, poll_interval=0.02)]
+        await worker
+        return events
+
+    events = asyncio.run(main())
+
+    assert [(e["stage"], e["status"]) for e in events] == [
+        ("Generating Code", "running"),
+        ("Generating Code", "completed"),
+    ]
+    assert not runner._listeners
+
+
+def test_follow_up_jobs_wait_for_the_active_one(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    runner = JobRunner([], queue=JobQueue(db_path))
+    other = JobQueue(db_path)
+    first = runner.queue.enqueue("project-1", {})
+    other.claim(60.0)
+
+    async def main():
+        follow_up = asyncio.create_task(
+            runner.submit_when_idle("project-1", lambda: {"seeded_after": True})
+        )
+        await asyncio.sleep(0.1)
+        assert not follow_up.done()
+        other.finish(first, JobStatus.COMPLETED)
+        job_id = await follow_up
+        await runner.stop()
+        return job_id
+
+    job_id = asyncio.run(main())
+
+    assert job_id != first
+    assert runner.queue.get(job_id)["outputs"]["seeded_after"] is True
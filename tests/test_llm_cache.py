@@ -0,0 +1,66 @@
+from app.services import llm_cache
+from app.services.llm_cache import LLMCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def time(self) -> float:
+        return self.now
+
+
+def make_cache(tmp_path, monkeypatch, **kwargs) -> tuple[LLMCache, Clock]:
+    clock = Clock()
+    monkeypatch.setattr(llm_cache, "time", clock)
+    return LLMCache(str(tmp_path / "cache.db"), **kwargs), clock
+
+
+def test_memory_tier_evicts_the_least_recently_used(tmp_path, monkeypatch):
+    cache, _ = make_cache(tmp_path, monkeypatch, max_memory_entries=2)
+    cache.set("a", "m", "A")
+    cache.set("b", "m", "B")
+    assert cache.get("a") == "A"
+    cache.set("c", "m", "C")
+
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+    assert cache.stats["memory_hits"] == 3
+    assert cache.get("b") == "B"
+    assert cache.stats["disk_hits"] == 1
+
+
+def test_disk_tier_evicts_by_batched_access_time(tmp_path, monkeypatch):
+    cache, clock = make_cache(
+        tmp_path, monkeypatch, max_memory_entries=0, max_disk_entries=2
+    )
+    cache.set("a", "m", "A")
+    clock.now += 1
+    cache.set("b", "m", "B")
+    clock.now += 1
+    assert cache.get("a") == "A"
+    clock.now += 1
+    cache.set("c", "m", "C")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "A" and cache.get("c") == "C"
+
+
+def test_entries_expire_after_the_ttl(tmp_path, monkeypatch):
+    cache, clock = make_cache(tmp_path, monkeypatch, ttl_seconds=60)
+    cache.set("a", "m", "A")
+    clock.now += 30
+    cache.set("b", "m", "B")
+    clock.now += 31
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "B"
+    cache.set("c", "m", "C")
+    rows = cache._db().execute("SELECT key FROM responses ORDER BY key").fetchall()
+    assert rows == [("b",), ("c",)]
+
+
+def test_empty_responses_are_not_cached(tmp_path, monkeypatch):
+    cache, _ = make_cache(tmp_path, monkeypatch)
+    cache.set("a", "m", "  \n")
+
+    assert cache.get("a") is None
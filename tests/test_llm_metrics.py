@@ -0,0 +1,33 @@
+import json
+
+from app.services.llm_metrics import MetricsRecorder, llm_context
+
+
+def test_trace_records_are_written_in_batches(tmp_path):
+    path = tmp_path / "calls.jsonl"
+    metrics = MetricsRecorder(trace_path=str(path), flush_interval=3600)
+    with llm_context(task_type="code_generation"):
+        for _ in range(3):
+            metrics.record("m", "openrouter", 10, 20, 0.5)
+
+    assert not path.exists()
+    metrics.flush()
+    lines = path.read_text().splitlines()
+    assert [json.loads(line)["task_type"] for line in lines] == ["code_generation"] * 3
+
+
+def test_trace_file_is_rotated_when_full(tmp_path):
+    path = tmp_path / "calls.jsonl"
+    metrics = MetricsRecorder(
+        trace_path=str(path), flush_interval=3600, max_trace_bytes=1, trace_backups=2
+    )
+    for _ in range(4):
+        metrics.record("m", "openrouter", 10, 20, 0.5)
+        metrics.flush()
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == [
+        "calls.jsonl",
+        "calls.jsonl.1",
+        "calls.jsonl.2",
+    ]
+    assert all(len(p.read_text().splitlines()) == 1 for p in tmp_path.iterdir())
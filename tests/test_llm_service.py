@@ -0,0 +1,236 @@
+import asyncio
+import contextlib
+import json
+import threading
+import time
+
+import httpx
+import pytest
+
+from app.services.llm_cache import LLMCache
+from app.services.llm_metrics import MetricsRecorder
+from app.services.llm_service import LLMService, batch_stream
+from app.services.model_router import ModelRouter
+from tests.fake_server import Response, json_response, serve, sse_response
+
+MODEL = "moonshotai/kimi-k2:free"
+
+
+def make_service(url: str, tmp_path) -> LLMService:
+    return LLMService(
+        "test-key",
+        openrouter_base_url=url,
+        cache=LLMCache(str(tmp_path / "cache.db")),
+        router=ModelRouter(),
+        metrics=MetricsRecorder(),
+    )
+
+
+def chat_chunk(content: str) -> str:
+    return json.dumps({"choices": [{"delta": {"content": content}}]})
+
+
+def test_generate_streams_partial_text_from_sse(tmp_path):
+    events = [chat_chunk("export "), chat_chunk("const x"), chat_chunk(" = 1;")]
+
+    with serve(lambda request: sse_response([*events, "[DONE]"])) as server:
+        llm = make_service(server.url, tmp_path)
+        partials = []
+
+        async def on_partial(text: str):
+            partials.append(text)
+
+        async def main():
+            try:
+                return await llm.generate("Write x.", MODEL, on_partial=on_partial)
+            finally:
+                await llm.aclose()
+
+        result = asyncio.run(main())
+
+    assert result == "export const x = 1;"
+    assert partials and partials[-1] == result
+    request = server.requests[0]
+    assert request.path == "/chat/completions"
+    assert request.headers["Authorization"] == "Bearer test-key"
+    assert request.json()["stream"] is True
+    (record,) = llm.metrics.records
+    assert record["ok"] and record["time_to_first_token"] is not None
+    assert llm.router.stats[MODEL].samples == 1
+
+
+def test_generate_without_on_partial_uses_one_completion(tmp_path):
+    completion = {"choices": [{"message": {"content": "done"}}]}
+
+    with serve(lambda request: json_response(completion)) as server:
+        llm = make_service(server.url, tmp_path)
+
+        async def main():
+            try:
+                return await llm.generate("Say done.", MODEL)
+            finally:
+                await llm.aclose()
+
+        assert asyncio.run(main()) == "done"
+
+    assert "stream" not in server.requests[0].json()
+
+
+def test_stream_error_is_recorded_as_failure(tmp_path):
+    with serve(lambda request: Response(429, b"slow down")) as server:
+        llm = make_service(server.url, tmp_path)
+
+        async def main():
+            try:
+                async for _ in llm.generate_stream("Hi.", MODEL):
+                    pass
+            finally:
+                await llm.aclose()
+
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(main())
+
+    (record,) = llm.metrics.records
+    assert not record["ok"]
+    assert llm.router.stats[MODEL].error_rate == 1.0
+
+
+def test_early_close_is_recorded_as_success(tmp_path):
+    events = [chat_chunk("a"), chat_chunk("b"), chat_chunk("c"), "[DONE]"]
+
+    with serve(lambda request: sse_response(events)) as server:
+        llm = make_service(server.url, tmp_path)
+
+        async def main():
+            try:
+                stream = llm.generate_stream("Hi.", MODEL)
+                async with contextlib.aclosing(stream):
+                    async for _ in stream:
+                        break
+            finally:
+                await llm.aclose()
+
+        asyncio.run(main())
+
+    (record,) = llm.metrics.records
+    assert record["ok"]
+
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "name": {"type": "string", "minLength": 1},
+        "count": {"type": "integer", "minimum": 0},
+    },
+}
+
+
+def completion_events(text: str) -> list[str]:
+    return [chat_chunk(text[i : i + 5]) for i in range(0, len(text), 5)] + ["[DONE]"]
+
+
+def prompt_of(request) -> str:
+    return request.json()["messages"][0]["content"]
+
+
+def test_structured_output_reprompts_only_the_invalid_section(tmp_path):
+    def handle(request):
+        if 'previous "name" section' in prompt_of(request):
+            return sse_response(completion_events('{"name": "Acme"}'))
+        return sse_response(completion_events('{"name": "", "count": 3}'))
+
+    with serve(handle) as server:
+        llm = make_service(server.url, tmp_path)
+        sections = []
+
+        async def on_section(key, value, ok):
+            sections.append((key, value, ok))
+
+        async def main():
+            try:
+                return await llm.generate_structured(
+                    "Describe the shop.",
+                    SCHEMA,
+                    "code_generation",
+                    on_section=on_section,
+                )
+            finally:
+                await llm.aclose()
+
+        value, report = asyncio.run(main())
+
+    assert value == {"name": "Acme", "count": 3}
+    assert report["rounds"] == 2 and report["requests"] == 2
+    assert report["reprompted_sections"] == ["name"]
+    assert sections == [("name", "", False), ("count", 3, True), ("name", "Acme", True)]
+    assert server.requests[1].json()["response_format"]["json_schema"]["schema"][
+        "required"
+    ] == ["name"]
+
+
+def test_an_http_error_cancels_the_other_structured_requests(tmp_path):
+    release = threading.Event()
+
+    def slow_count():
+        yield f"data: {chat_chunk('{')}\n\n".encode()
+        release.wait(10)
+
+    def handle(request):
+        prompt = prompt_of(request)
+        if 'previous "name" section' in prompt:
+            return Response(500, b"boom")
+        if "already done" in prompt:
+            return Response(200, slow_count(), {"Content-Type": "text/event-stream"})
+        return sse_response(completion_events('{"name": ""'))
+
+    with serve(handle) as server:
+        llm = make_service(server.url, tmp_path)
+
+        async def main():
+            try:
+                with pytest.raises(httpx.HTTPStatusError):
+                    await llm.generate_structured(
+                        "Describe the shop.", SCHEMA, "code_generation"
+                    )
+                return asyncio.all_tasks() - {asyncio.current_task()}
+            finally:
+                await llm.aclose()
+
+        start = time.monotonic()
+        try:
+            leftover = asyncio.run(main())
+        finally:
+            release.set()
+
+    assert not leftover
+    assert time.monotonic() - start < 5
+    assert len(server.requests) == 3
+
+
+def test_structured_output_needs_at_least_one_round(tmp_path):
+    llm = make_service("http://127.0.0.1:9", tmp_path)
+
+    with pytest.raises(ValueError):
+        asyncio.run(
+            llm.generate_structured("Hi.", SCHEMA, "code_generation", max_rounds=0)
+        )
+
+
+def test_batched_text_is_flushed_when_the_stream_stalls():
+    async def stalling():
+        yield "a"
+        yield "b"
+        await asyncio.sleep(0.3)
+        yield "c"
+
+    async def main():
+        start = time.monotonic()
+        return [
+            (text, time.monotonic() - start)
+            async for text in batch_stream(stalling(), interval=0.1)
+        ]
+
+    updates = asyncio.run(main())
+
+    assert [text for text, _ in updates] == ["a", "b", "c"]
+    assert updates[1][1] < 0.2
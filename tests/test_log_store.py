@@ -0,0 +1,39 @@
+import threading
+
+from app.services.log_store import LogStore
+
+
+def test_separate_stores_share_one_sequence(tmp_path):
+    stores = [LogStore(str(tmp_path)), LogStore(str(tmp_path))]
+
+    def append(store: LogStore, worker: int):
+        for i in range(25):
+            store.append("p1", "Orchestrator", f"{worker}:{i}")
+
+    threads = [
+        threading.Thread(target=append, args=(stores[worker % 2], worker))
+        for worker in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    entries, cursor = stores[0].page("p1", limit=1000)
+    assert cursor is None
+    assert [e["seq"] for e in entries] == list(range(100, 0, -1))
+    assert len({e["message"] for e in entries}) == 100
+
+
+def test_pages_follow_the_cursor(tmp_path):
+    store = LogStore(str(tmp_path))
+    for i in range(5):
+        store.append("p1", "Verifier", f"m{i}", severity="error" if i % 2 else "info")
+
+    first, cursor = store.page("p1", limit=2)
+    second, last = store.page("p1", before=cursor, limit=2)
+    errors, _ = store.page("p1", severity="error")
+
+    assert [e["message"] for e in first + second] == ["m4", "m3", "m2", "m1"]
+    assert last is not None
+    assert [e["message"] for e in errors] == ["m3", "m1"]
@@ -0,0 +1,52 @@
+import asyncio
+
+from app.services import model_router
+from app.services.model_router import ModelRouter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def failing_router(monkeypatch) -> tuple[ModelRouter, Clock]:
+    clock = Clock()
+    monkeypatch.setattr(model_router.time, "monotonic", clock)
+    router = ModelRouter(error_ttl=300.0, probe_interval=60.0)
+    for _ in range(3):
+        router.record("fast", 0.5, ok=True)
+        router.record("flaky", 0.1, ok=False)
+    return router, clock
+
+
+def test_unhealthy_model_is_probed_once_per_interval(monkeypatch):
+    router, clock = failing_router(monkeypatch)
+    assert router.rank(["flaky", "fast"]) == ["fast", "flaky"]
+
+    clock.now += 61
+    assert router.rank(["flaky", "fast"]) == ["flaky", "fast"]
+    assert router.rank(["flaky", "fast"]) == ["fast", "flaky"]
+
+    clock.now += 61
+    assert router.rank(["flaky", "fast"])[0] == "flaky"
+
+
+def test_failures_age_out_of_the_error_rate(monkeypatch):
+    router, clock = failing_router(monkeypatch)
+    assert not router.is_healthy("flaky")
+
+    clock.now += 301
+    assert router.stats["flaky"].error_rate == 0.0
+    assert router.is_healthy("flaky")
+
+
+def test_hedge_returns_the_backup_when_the_first_model_stalls():
+    async def call(model: str) -> str:
+        await asyncio.sleep(1.0 if model == "slow" else 0.01)
+        return model
+
+    router = ModelRouter()
+    assert asyncio.run(router.hedge(call, ["slow", "fast"], 0.05)) == "fast"
@@ -0,0 +1,125 @@
+import asyncio
+import json
+import logging
+
+from app.services import ollama_client
+from app.services.ollama_client import OllamaClient, warm_orchestrator_models
+from tests.fake_server import Request, Response, json_response, serve
+
+
+class FakeOllama:
+    """Stand-in for the Ollama HTTP API: /api/ps and /api/generate."""
+
+    def __init__(self, loaded: list[str] | None = None):
+        self.loaded = list(loaded or [])
+        self.calls: list[tuple[str, str]] = []
+
+    def handle(self, request: Request) -> Response:
+        if request.path == "/api/ps":
+            return json_response({"models": [{"name": m} for m in self.loaded]})
+        body = request.json()
+        model = body["model"]
+        if "prompt" not in body:
+            if body["keep_alive"] == 0:
+                self.calls.append(("unload", model))
+                self.loaded.remove(model)
+            else:
+                self.calls.append(("load", model))
+                self.loaded.append(model)
+            return json_response({"model": model, "done": True})
+        self.calls.append(("generate", model))
+        words = ["{", '"ok"', ":", "true", "}"]
+        if not body["stream"]:
+            return json_response({"response": "".join(words), "done": True})
+        return Response(
+            200,
+            (
+                json.dumps({"response": word, "done": i == len(words) - 1}).encode()
+                + b"\n"
+                for i, word in enumerate(words)
+            ),
+            {"Content-Type": "application/x-ndjson"},
+        )
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_stream_loads_the_model_then_yields_deltas():
+    ollama = FakeOllama()
+
+    with serve(ollama.handle) as server:
+        client = OllamaClient(server.url)
+
+        async def main():
+            try:
+                return [
+                    d async for d in client.stream("phi4:mini", "Hi", format="json")
+                ]
+            finally:
+                await client.aclose()
+
+        deltas = run(main())
+
+    assert "".join(deltas) == '{"ok":true}'
+    assert ollama.calls == [("load", "phi4:mini"), ("generate", "phi4:mini")]
+    assert server.requests[-1].json()["format"] == "json"
+    stats = client.stats()["phi4:mini"]
+    assert stats["loaded"] and stats["requests"] == 1 and stats["loads"] == 1
+
+
+def test_loading_another_model_unloads_the_idle_one():
+    ollama = FakeOllama(loaded=["gemma3:4b"])
+
+    with serve(ollama.handle) as server:
+        client = OllamaClient(server.url, max_loaded_models=1)
+
+        async def main():
+            try:
+                await client.sync_loaded()
+                return await client.generate("phi4:mini", "Hi")
+            finally:
+                await client.aclose()
+
+        assert run(main()) == '{"ok":true}'
+
+    assert ollama.calls == [
+        ("unload", "gemma3:4b"),
+        ("load", "phi4:mini"),
+        ("generate", "phi4:mini"),
+    ]
+    assert ollama.loaded == ["phi4:mini"]
+
+
+def test_both_orchestrator_models_stay_loaded_by_default():
+    ollama = FakeOllama()
+
+    with serve(ollama.handle) as server:
+        client = OllamaClient(server.url)
+
+        async def main():
+            try:
+                for model in ("phi4:mini", "gemma3:4b", "phi4:mini", "gemma3:4b"):
+                    await client.generate(model, "Hi")
+            finally:
+                await client.aclose()
+
+        run(main())
+
+    assert [call for call in ollama.calls if call[0] != "generate"] == [
+        ("load", "phi4:mini"),
+        ("load", "gemma3:4b"),
+    ]
+    assert sorted(ollama.loaded) == ["gemma3:4b", "phi4:mini"]
+
+
+def test_warm_up_logs_instead_of_failing_when_ollama_is_unavailable(
+    monkeypatch, caplog
+):
+    with serve(lambda request: Response(503, b"starting")) as server:
+        monkeypatch.setattr(OllamaClient, "_shared", OllamaClient(server.url))
+        with caplog.at_level(logging.WARNING, logger=ollama_client.__name__):
+            run(warm_orchestrator_models())
+
+    assert "Ollama warm-up skipped" in caplog.text
@@ -0,0 +1,49 @@
+from app.services.project_store import ProjectStore
+
+
+def project(project_id: str, created_at: str, status: str = "Draft") -> dict:
+    return {
+        "id": project_id,
+        "name": f"Store {project_id}",
+        "description": "A shop",
+        "brand_guidelines": "",
+        "shopify_domain": "acme.myshopify.com",
+        "shopify_token": "token",
+        "spec_json": "{}",
+        "status": status,
+        "created_at": created_at,
+    }
+
+
+def test_projects_are_created_read_updated_and_deleted(tmp_path):
+    store = ProjectStore(str(tmp_path / "projects.db"))
+    store.create(project("p1", "2025-01-01"))
+
+    assert store.get("p1") == project("p1", "2025-01-01")
+    store.update("p1", status="Ready for Review", id="p2", unknown="x")
+    assert store.get("p1")["status"] == "Ready for Review"
+    assert store.get("p2") is None
+    store.delete("p1")
+    assert store.get("p1") is None
+    assert store.count() == 0
+
+
+def test_summaries_are_paged_newest_first_and_filtered(tmp_path):
+    store = ProjectStore(str(tmp_path / "projects.db"))
+    for day in range(1, 6):
+        status = "Failed" if day % 2 else "Draft"
+        store.create(project(f"p{day}", f"2025-01-0{day}", status))
+
+    page = store.list_summaries(offset=1, limit=2)
+    assert [p["id"] for p in page] == ["p4", "p3"]
+    assert "spec_json" not in page[0] and "shopify_token" not in page[0]
+    assert [p["id"] for p in store.list_summaries(status="Draft")] == ["p4", "p2"]
+    assert store.count() == 5 and store.count("Failed") == 3
+
+
+def test_projects_persist_across_instances(tmp_path):
+    path = str(tmp_path / "projects.db")
+    ProjectStore(path).create(project("p1", "2025-01-01"))
+
+    assert ProjectStore(path).get("p1")["name"] == "Store p1"
+    assert ProjectStore.new_id() != ProjectStore.new_id()
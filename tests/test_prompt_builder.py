@@ -0,0 +1,38 @@
+from app.services.file_planner import HYDROGEN_FILES, slice_spec
+from app.services.prompt_builder import PromptBuilder
+from app.states.state import build_store_spec
+
+SPEC = build_store_spec({"project_name": "Acme", "shopify_domain": "acme.test"})
+BRIEF = "Acme sells outdoor gear.\r\nTrailing spaces here.   \n" * 200
+GUIDELINES = "Bold, bright and friendly."
+
+
+def prompts(builder: PromptBuilder) -> dict[str, bytes]:
+    data = {"collections": [f"c{i}" for i in range(500)], "currency": "EUR"}
+    return {
+        path: builder.file_prompt(
+            path, description, slice_spec(SPEC, sections), data
+        ).encode("utf-8")
+        for path, sections, description in HYDROGEN_FILES
+    }
+
+
+def test_every_file_prompt_shares_one_byte_stable_prefix():
+    builder = PromptBuilder(BRIEF, GUIDELINES)
+    prefix = builder.prefix.encode("utf-8")
+
+    first = prompts(builder)
+    again = prompts(PromptBuilder(BRIEF, GUIDELINES))
+
+    assert again == first
+    assert all(prompt.startswith(prefix) for prompt in first.values())
+    assert PromptBuilder(BRIEF, GUIDELINES).prefix.encode("utf-8") == prefix
+    assert b"File: " not in prefix and b"storeData" not in prefix
+    assert b"Brand guidelines:\nBold, bright and friendly." in prefix
+
+
+def test_the_prefix_changes_with_the_brief_and_guidelines():
+    builder = PromptBuilder(BRIEF, GUIDELINES)
+
+    assert PromptBuilder(BRIEF, "Calm.").prefix != builder.prefix
+    assert PromptBuilder("Acme sells bikes.", GUIDELINES).prefix != builder.prefix
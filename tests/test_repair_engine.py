@@ -0,0 +1,69 @@
+import asyncio
+
+from app.services.prompt_builder import PromptBuilder
+from app.services.repair_engine import RepairEngine
+from app.services.workflow import write_workspace
+
+PATH = "app/a.ts"
+
+
+class ScriptedLLM:
+    """Returns the scripted repairs in order."""
+
+    def __init__(self, repairs: list[str]):
+        self.repairs = list(repairs)
+
+    async def generate_for_task(self, prompt: str, task_type: str, **kwargs) -> str:
+        return self.repairs.pop(0)
+
+
+class CountingValidator:
+    """Fails the build with one diagnostic per "BAD" line in the file."""
+
+    async def run_checks(self, project_path: str) -> dict:
+        with open(f"{project_path}/{PATH}") as f:
+            bad = f.read().count("BAD")
+        output = "\n".join(f"error {i} in {PATH}" for i in range(bad))
+        return {"build": {"status": "failure" if bad else "success", "output": output}}
+
+
+def run(tmp_path, content: str, repairs: list[str]):
+    files = {PATH: content}
+    write_workspace(str(tmp_path), files)
+    validator = CountingValidator()
+    engine = RepairEngine(ScriptedLLM(repairs), PromptBuilder(), validator)
+
+    async def main():
+        results = await validator.run_checks(str(tmp_path))
+        return await engine.run(str(tmp_path), files, results, write_workspace)
+
+    return asyncio.run(main())
+
+
+def test_a_worse_last_round_is_rolled_back_to_the_best_one(tmp_path):
+    files, results, report = run(
+        tmp_path, "BAD\nBAD\n", ["BAD\nok\n", "BAD\nBAD\nBAD\n"]
+    )
+
+    assert report["status"] == "stalled"
+    assert report["restored_iteration"] == 1
+    assert files == {PATH: "BAD\nok\n"}
+    assert (tmp_path / PATH).read_text() == "BAD\nok\n"
+    assert results["build"]["output"] == f"error 0 in {PATH}"
+    assert report["remaining_count"] == 1
+
+
+def test_a_first_round_that_makes_things_worse_is_undone(tmp_path):
+    files, _, report = run(tmp_path, "BAD\n", ["BAD\nBAD\n"])
+
+    assert report["status"] == "stalled"
+    assert report["restored_iteration"] == 0
+    assert (tmp_path / PATH).read_text() == files[PATH] == "BAD\n"
+
+
+def test_passing_repairs_are_kept(tmp_path):
+    files, _, report = run(tmp_path, "BAD\n", ["ok\n"])
+
+    assert report["status"] == "passed"
+    assert report["restored_iteration"] is None
+    assert files == {PATH: "ok\n"}
@@ -0,0 +1,126 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from app.services.file_planner import plan_file
+from app.services.llm_metrics import estimate_tokens
+from app.services.prompt_builder import PromptBuilder
+from app.services.shopify_service import ShopifyService
+from tests.fake_server import Request, Response, json_response, serve
+
+SPEC = {
+    "brand": {"name": "Acme"},
+    "catalog": {
+        "collections": ["featured", "summer-sale"],
+        "search": {"enabled": True},
+    },
+    "seo": {"title": "Acme"},
+}
+
+
+def large_storefront(request: Request) -> Response:
+    """A Storefront GraphQL endpoint for a store with 250 of everything."""
+    assert request.path == "/api/2025-07/graphql.json"
+    assert request.headers["X-Shopify-Storefront-Access-Token"] == "token"
+    collections = [f"collection-number-{i:03d}" for i in range(248)]
+    return json_response(
+        {
+            "data": {
+                "shop": {
+                    "name": "Acme",
+                    "paymentSettings": {"currencyCode": "EUR", "countryCode": "DE"},
+                },
+                "localization": {"availableLanguages": [{"isoCode": "EN"}]},
+                "collections": {
+                    "nodes": [
+                        {"handle": handle, "title": handle}
+                        for handle in collections + ["summer-sale", "featured"]
+                    ]
+                },
+                "productTypes": {"nodes": [f"Product type {i}" for i in range(250)]},
+                "products": {
+                    "nodes": [{"vendor": f"Vendor company {i}"} for i in range(250)]
+                },
+            }
+        }
+    )
+
+
+def store_data(server_url: str) -> dict:
+    shopify = ShopifyService()
+
+    async def main():
+        try:
+            return await shopify.get_store_metadata(server_url, "token")
+        finally:
+            await shopify.aclose()
+
+    metadata = asyncio.run(main())
+    return {
+        key: metadata[key]
+        for key in ("collections", "productTypes", "vendors", "currency")
+    }
+
+
+def spec_of(prompt: str) -> dict:
+    return json.loads(prompt.split("Spec: ", 1)[1])
+
+
+def test_large_store_data_is_trimmed_to_the_prompt_budget():
+    with serve(large_storefront) as server:
+        data = store_data(server.url)
+    assert len(data["collections"]) == 250
+    brief = " ".join(f"Customers love product line {i}." for i in range(300))
+    prompts = PromptBuilder(brief, "Bold, bright and friendly.")
+
+    planned = plan_file(
+        "app/lib/fragments.ts", ["catalog"], "queries", SPEC, prompts, data
+    )
+
+    assert estimate_tokens(planned["prompt"]) <= prompts.token_budget
+    fitted = spec_of(planned["prompt"])["storeData"]
+    assert fitted["collections"][:2] == ["summer-sale", "featured"]
+    assert fitted["currency"] == "EUR"
+    assert fitted["omitted"]["vendors"] == 250 - len(fitted["vendors"])
+
+
+def test_small_store_data_is_passed_through_whole():
+    data = {"collections": ["featured"], "vendors": ["Acme"], "currency": "EUR"}
+
+    prompt = PromptBuilder().file_prompt("app/lib/fragments.ts", "queries", SPEC, data)
+
+    assert spec_of(prompt)["storeData"] == data
+
+
+def test_store_data_is_dropped_when_none_of_it_fits():
+    prompts = PromptBuilder(token_budget=70)
+    data = {"collections": ["featured"], "currency": "EUR"}
+
+    prompt = prompts.file_prompt("a.ts", "x", {"catalog": {}}, data)
+
+    assert "storeData" not in spec_of(prompt)
+
+
+def test_cached_metadata_is_not_served_for_another_token():
+    def storefront(request: Request) -> Response:
+        if request.headers["X-Shopify-Storefront-Access-Token"] != "token":
+            return Response(401, b"Unauthorized")
+        return large_storefront(request)
+
+    with serve(storefront) as server:
+        shopify = ShopifyService()
+
+        async def main():
+            try:
+                await shopify.get_store_metadata(server.url, "token")
+                with pytest.raises(httpx.HTTPStatusError):
+                    await shopify.get_store_metadata(server.url, "wrong")
+                await shopify.get_store_metadata(server.url, "token")
+            finally:
+                await shopify.aclose()
+
+        asyncio.run(main())
+
+    assert len(server.requests) == 2
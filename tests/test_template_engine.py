@@ -0,0 +1,45 @@
+import json
+
+import pytest
+
+from app.services.file_planner import HYDROGEN_FILES, slice_spec
+from app.services.hydrogen_templates import HYDROGEN_TEMPLATES
+from app.services.template_engine import CompiledTemplate, TemplateEngine, TemplateError
+from app.states.state import build_store_spec
+
+SPEC = build_store_spec({"project_name": "Acme Café", "shopify_domain": "acme.test"})
+SECTIONS = {path: sections for path, sections, _ in HYDROGEN_FILES}
+
+
+def render_all(spec: dict) -> dict[str, str]:
+    engine = TemplateEngine(HYDROGEN_TEMPLATES)
+    return {path: engine.render(path, spec) for path in HYDROGEN_TEMPLATES}
+
+
+def test_rendering_is_deterministic():
+    first = render_all(SPEC)
+
+    assert render_all(json.loads(json.dumps(SPEC))) == first
+    assert {path: TemplateEngine.shared().render(path, SPEC) for path in first} == first
+    assert '"name": "acme-caf"' in first["package.json"]
+    assert (
+        "${{ secrets.OXYGEN_DEPLOYMENT_TOKEN }}"
+        in first[".github/workflows/oxygen.yml"]
+    )
+
+
+def test_templates_only_read_the_sections_their_file_is_planned_from():
+    engine = TemplateEngine.shared()
+
+    for path in HYDROGEN_TEMPLATES:
+        assert engine.render(path, slice_spec(SPEC, SECTIONS[path])) == engine.render(
+            path, SPEC
+        ), path
+
+
+def test_missing_variables_are_reported():
+    template = CompiledTemplate("a.ts", "const {{ name }} = {{value}};")
+
+    assert template.render({"name": "x", "value": 1}) == "const x = 1;"
+    with pytest.raises(TemplateError, match=r"\['value'\]"):
+        template.render({"name": "x"})
@@ -0,0 +1,134 @@
+import asyncio
+import time
+
+from app.services import validation_service
+from app.services.validation_service import (
+    MAX_FORWARDED_LINES,
+    ValidationCache,
+    ValidationService,
+)
+from app.services.workflow import write_workspace
+
+
+def is_running(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().split(")")[-1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def test_failures_expire_but_successes_do_not(tmp_path):
+    cache = ValidationCache(str(tmp_path / "cache.db"), failure_ttl=0.05)
+    cache.set("build:a", {"status": "failure", "output": "flaky"})
+    cache.set("build:b", {"status": "success", "output": ""})
+    assert cache.get("build:a")["status"] == "failure"
+
+    time.sleep(0.1)
+    assert cache.get("build:a") is None
+    assert cache.get("build:b")["status"] == "success"
+
+
+def test_timeout_kills_the_whole_process_group(tmp_path):
+    validator = ValidationService(
+        ValidationCache(str(tmp_path / "cache.db")), timeouts={"build": 0.5}
+    )
+    command = ["sh", "-c", "sleep 30 & echo $! > child.pid; wait"]
+
+    result = asyncio.run(validator._run_command("build", command, str(tmp_path), None))
+
+    assert result["status"] == "timeout"
+    child = int((tmp_path / "child.pid").read_text())
+    deadline = time.monotonic() + 2
+    while is_running(child) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not is_running(child)
+
+
+def test_output_is_batched_and_capped(tmp_path):
+    validator = ValidationService(ValidationCache(str(tmp_path / "cache.db")))
+    command = ["sh", "-c", "for i in $(seq 1 500); do echo line $i; done"]
+    forwarded = []
+
+    async def on_output(check: str, text: str):
+        forwarded.append(text)
+
+    result = asyncio.run(
+        validator._run_command("build", command, str(tmp_path), on_output)
+    )
+
+    assert result["status"] == "success"
+    assert len(result["output"].splitlines()) == 500
+    assert len(forwarded) < 10
+    lines = "\n".join(forwarded[:-1]).splitlines()
+    assert lines == [f"line {i}" for i in range(1, MAX_FORWARDED_LINES + 1)]
+    assert forwarded[-1] == f"... {500 - MAX_FORWARDED_LINES} more lines"
+
+
+def test_write_workspace_removes_files_it_no_longer_generates(tmp_path):
+    (tmp_path / "package-lock.json").write_text("{}")
+    write_workspace(str(tmp_path), {"app/a.ts": "a", "app/b.ts": "b"})
+    write_workspace(str(tmp_path), {"app/a.ts": "a2"})
+
+    assert (tmp_path / "app" / "a.ts").read_text() == "a2"
+    assert not (tmp_path / "app" / "b.ts").exists()
+    assert (tmp_path / "package-lock.json").exists()
+
+
+def lint(validator: ValidationService, path) -> dict:
+    return asyncio.run(validator.run_checks(str(path), checks=["lint"]))["lint"]
+
+
+def test_a_crashed_lint_run_is_not_cached_as_clean(tmp_path, monkeypatch):
+    (tmp_path / "a.ts").write_text("export const a = 1;\n")
+    (tmp_path / "b.ts").write_text("export const b = 1;\n")
+    validator = ValidationService(ValidationCache(str(tmp_path / "cache.db")))
+    crash = ["sh", "-c", "echo 'Oops! Something went wrong: no config'; exit 2"]
+    monkeypatch.setitem(validation_service.CHECK_COMMANDS, "lint", crash)
+
+    for _ in range(2):
+        result = lint(validator, tmp_path)
+        assert result["status"] == "failure"
+        assert result["linted_files"] == ["a.ts", "b.ts"]
+
+    problem = "echo 'a.ts:1:14: Unexpected var [Error/no-var]'; echo 'note: 1'; exit 1"
+    monkeypatch.setitem(
+        validation_service.CHECK_COMMANDS, "lint", ["sh", "-c", problem]
+    )
+    assert lint(validator, tmp_path)["status"] == "failure"
+    assert lint(validator, tmp_path)["linted_files"] == ["a.ts"]
+
+
+def test_checks_are_skipped_when_dependencies_cannot_be_installed(
+    tmp_path, monkeypatch
+):
+    (tmp_path / "package.json").write_text("{}")
+    validator = ValidationService(ValidationCache(str(tmp_path / "cache.db")))
+    install = ["sh", "-c", "echo 'npm ERR! network unreachable'; exit 1"]
+    monkeypatch.setattr(validation_service, "INSTALL_COMMAND", install)
+
+    results = asyncio.run(validator.run_checks(str(tmp_path)))
+
+    assert {r["status"] for r in results.values()} == {"skipped"}
+    assert "network unreachable" in results["build"]["output"]
+
+
+def test_dependencies_are_installed_once_and_missing_tools_are_skipped(
+    tmp_path, monkeypatch
+):
+    (tmp_path / "package.json").write_text("{}")
+    validator = ValidationService(ValidationCache(str(tmp_path / "cache.db")))
+    install = ["sh", "-c", "echo run >> installs.log"]
+    monkeypatch.setattr(validation_service, "INSTALL_COMMAND", install)
+    missing = [
+        "sh",
+        "-c",
+        "echo 'npm ERR! could not determine executable to run'; exit 1",
+    ]
+    monkeypatch.setitem(validation_service.CHECK_COMMANDS, "test", missing)
+
+    for _ in range(2):
+        results = asyncio.run(validator.run_checks(str(tmp_path), checks=["test"]))
+        assert results["test"]["status"] == "skipped"
+
+    assert (tmp_path / "installs.log").read_text() == "run\n"
@@ -0,0 +1,126 @@
+import asyncio
+import copy
+from types import SimpleNamespace
+
+from app.services.codegen_scheduler import (
+    CodegenScheduler,
+    PlannedFile,
+    infer_dependencies,
+)
+from app.services.dataflow import DataflowExecutor
+from app.services.file_planner import HYDROGEN_FILES, file_entries
+from app.services.llm_service import LLMService
+from app.services.workflow import (
+    LIVE_PIPELINES,
+    plan_and_generate,
+    revise_spec,
+    spec_inputs,
+)
+from app.states.state import build_store_spec
+
+SPEC = {
+    "brand": {"name": "Acme", "colors": {"primary": "#112233"}},
+    "catalog": {"collections": ["featured"], "search": {"enabled": True}},
+    "nav": [{"label": "Shop", "href": "/collections/all"}],
+    "seo": {"title": "Acme"},
+}
+
+
+def test_revising_a_slice_only_redoes_the_files_reading_it():
+    entries = file_entries(SPEC)
+    runs: list[str] = []
+
+    async def main():
+        executor = DataflowExecutor()
+        release = asyncio.Event()
+        for path, sections, _ in entries:
+
+            async def run(values: dict, path=path):
+                runs.append(path)
+                await release.wait()
+                return path
+
+            executor.add_node(
+                f"file:{path}", run, [f"spec:{section}" for section in sections]
+            )
+        for key, value in spec_inputs(SPEC).items():
+            executor.set_input(key, value)
+        LIVE_PIPELINES["p1"] = executor
+        try:
+            task = asyncio.create_task(executor.run())
+            while len(runs) < len(entries):
+                await asyncio.sleep(0)
+            revised = copy.deepcopy(SPEC)
+            revised["catalog"]["search"]["enabled"] = False
+            assert revise_spec("p1", revised)
+            release.set()
+            await task
+        finally:
+            LIVE_PIPELINES.pop("p1")
+        return executor
+
+    executor = asyncio.run(main())
+
+    redone = [path for path in runs if runs.count(path) > 1]
+    assert set(redone) == {"app/lib/fragments.ts", "app/routes/search.tsx"}
+    assert executor.inputs["spec"]["catalog"]["search"]["enabled"] is False
+
+
+def test_files_only_wait_for_the_shared_modules_they_read():
+    graph = infer_dependencies(
+        [
+            PlannedFile(path=path, depends_on=[], sections=sections)
+            for path, sections, _ in HYDROGEN_FILES
+        ]
+    )
+    depends_on = {f["path"]: f["depends_on"] for f in graph}
+
+    assert depends_on["app/routes/search.tsx"] == ["app/lib/fragments.ts"]
+    assert depends_on["app/components/Footer.tsx"] == ["app/lib/nav.ts"]
+    assert depends_on["app/routes/about.tsx"] == []
+    assert depends_on["app/lib/fragments.ts"] == []
+
+
+def test_generation_starts_on_sections_before_extraction_finishes(monkeypatch):
+    draft = build_store_spec({"project_name": "Acme", "shopify_domain": "acme.test"})
+    generated: list[str] = []
+    order: list[str] = []
+
+    async def generate_structured(self, prompt, schema, task_type, **kwargs):
+        on_section = kwargs["on_section"]
+        for key in schema["properties"]:
+            if key != "catalog":
+                await on_section(key, draft[key], True)
+        while "app/routes/about.tsx" not in generated:
+            await asyncio.sleep(0.01)
+        order.append("catalog")
+        await on_section("catalog", draft["catalog"], True)
+        return {key: draft[key] for key in schema["properties"]}, {
+            "requests": 1,
+            "reprompted_sections": [],
+        }
+
+    async def generate_file(self, planned, task_type="", on_partial=None):
+        generated.append(planned["path"])
+        order.append(planned["path"])
+        return f"// {planned['path']}"
+
+    async def report(*args, **kwargs):
+        pass
+
+    monkeypatch.setattr(LLMService, "generate_structured", generate_structured)
+    monkeypatch.setattr(CodegenScheduler, "generate_file", generate_file)
+    ctx = SimpleNamespace(
+        project_id="streamed",
+        job_id="j1",
+        outputs={"store_spec": draft, "extract_spec": True, "brief": "A shop"},
+        report=report,
+    )
+
+    outputs = asyncio.run(plan_and_generate(ctx))
+
+    assert order.index("app/routes/about.tsx") < order.index("catalog")
+    assert order.index("catalog") < order.index("app/routes/search.tsx")
+    assert outputs["store_spec"] == draft
+    assert outputs["extract_spec"] is False
+    assert "app/lib/i18n.ts" not in {f["path"] for f in outputs["planned_files"]}